@@ -0,0 +1,138 @@
+"""
+Compara generate_inserts (colunas geradas com NumPy) com a versão anterior,
+que montava cada linha com random_value, numa tabela de 7 colunas com FK.
+
+    python -m benchmarks.bench_data_generator [linhas ...]
+
+Para cada tamanho: linhas por segundo de cada versão e, para referência,
+do formato multi_insert (generate_table_content).
+"""
+import sys
+import time
+import random
+import string
+from datetime import datetime, timedelta
+
+from helpers.dataGenerator import key_pool
+from helpers.helpers import generate_inserts, generate_table_content, parse_create_table
+
+TABLE = """CREATE TABLE `orders` (
+    `id` INT NOT NULL,
+    `user_id` INT NOT NULL,
+    `code` VARCHAR(12) NOT NULL,
+    `total` DECIMAL(10,2),
+    `quantity` INT,
+    `created_at` DATETIME,
+    `shipped_on` DATE,
+    PRIMARY KEY (`id`),
+    FOREIGN KEY (`user_id`) REFERENCES `users` (`id`)
+);"""
+
+SIZES = (10_000, 100_000)
+
+
+def legacy_key_pool(n: int) -> dict:
+    """Chaves como eram montadas antes do KeyPool: listas materializadas."""
+    return {
+        "INT": list(range(1, n + 1)),
+        "VARCHAR": [f"fk_value_{i}" for i in range(1, n + 1)],
+    }
+
+
+def random_value(col, fk_values: dict, index: int):
+    """Valor de uma célula no gerador linha a linha (cópia da versão original)."""
+    if col["auto_inc"]:
+        return None
+
+    if col["primary_key"]:
+        if col["type"] in ("INT", "BIGINT", "SMALLINT"):
+            return fk_values["INT"][index]
+
+        elif col["type"] in ("CHAR", "VARCHAR", "TEXT"):
+            return fk_values["VARCHAR"][index]
+
+    if col["foreign_key"]:
+        if col["type"] in ("INT", "BIGINT", "SMALLINT"):
+            return fk_values["INT"][random.randint(0, len(fk_values["INT"]) - 1)]
+
+        elif col["type"] in ("CHAR", "VARCHAR", "TEXT"):
+            return fk_values["VARCHAR"][random.randint(0, len(fk_values["INT"]) - 1)]
+
+    if col["type"] in ("INT", "BIGINT", "SMALLINT"):
+        return random.randint(1, 1000)
+
+    if col["type"] in ("DECIMAL", "NUMERIC", "FLOAT", "DOUBLE"):
+        return round(random.uniform(1, 9999), 2)
+
+    if col["type"] in ("CHAR", "VARCHAR", "TEXT"):
+        size = col["size"] if col["size"] else 10
+        size = min(size, 15)
+        return "".join(random.choices(string.ascii_letters, k=random.randint(3, size)))
+
+    if col["type"] in ("DATE",):
+        start = datetime(2000, 1, 1)
+        end = datetime(2025, 1, 1)
+        return (start + timedelta(days=random.randint(0, (end - start).days))).strftime(
+            "%Y-%m-%d"
+        )
+
+    if col["type"] in ("DATETIME", "TIMESTAMP"):
+        start = datetime(2000, 1, 1)
+        end = datetime(2025, 1, 1)
+        dt = start + timedelta(
+            seconds=random.randint(0, int((end - start).total_seconds()))
+        )
+        return dt.strftime("%Y-%m-%d %H:%M:%S")
+
+    return None
+
+
+def legacy_generate_inserts(creation_command: str, number_insertions: int, fk_values: dict) -> list:
+    """generate_inserts antes do NumPy (cópia da versão original)."""
+    table_name, columns = parse_create_table(creation_command)
+    inserts = []
+
+    for i in range(number_insertions):
+        values = []
+
+        for col in columns:
+            val = random_value(col, fk_values, i)
+            if val is None:
+                values.append("NULL" if not col["not_null"] else "'X'")
+            elif isinstance(val, str):
+                values.append(f"'{val}'")
+            else:
+                values.append(str(val))
+
+        col_names = [f"`{c['name']}`" for c in columns if not c["auto_inc"]]
+        val_list = [values[i] for i, c in enumerate(columns) if not c["auto_inc"]]
+        inserts.append(
+            f"INSERT INTO `{table_name}` ({', '.join(col_names)}) VALUES ({', '.join(val_list)});"
+        )
+
+    return inserts
+
+
+def rate(function, rows: int) -> float:
+    started = time.perf_counter()
+    result = function()
+    elapsed = time.perf_counter() - started
+    assert len(result) > 0
+    return rows / elapsed
+
+
+def main(sizes):
+    parse_create_table(TABLE)
+    print(f"{'linhas':>10}{'antigo/s':>14}{'novo/s':>14}{'multi/s':>14}{'ganho':>8}")
+    for rows in sizes:
+        old = rate(lambda: legacy_generate_inserts(TABLE, rows, legacy_key_pool(rows)), rows)
+        new = rate(lambda: generate_inserts(TABLE, rows, key_pool(rows), seed=1), rows)
+        multi = rate(
+            lambda: generate_table_content(TABLE, rows, seed=1, output_format="multi_insert")[1],
+            rows,
+        )
+        print(f"{rows:>10}{old:>14,.0f}{new:>14,.0f}{multi:>14,.0f}{new / old:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or SIZES)
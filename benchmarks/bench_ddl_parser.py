@@ -0,0 +1,222 @@
+"""
+Compara o parser de DDL por tokens (helpers.ddlParser, memoizado) com as
+versões anteriores, baseadas em regex, num schema de muitas tabelas.
+
+    python -m benchmarks.bench_ddl_parser [tabelas]
+
+Para cada operação: melhor tempo de REPEAT execuções da versão antiga, da
+nova com o cache vazio (fria) e da nova com o mesmo DDL já analisado
+(quente, o caso comum entre requisições).
+"""
+import re
+import sys
+import time
+from collections import defaultdict, deque
+
+from helpers import ddlParser, schemaPruner
+from helpers.helpers import order_create_tables, parse_create_table
+from helpers.schemaPruner import split_schema
+
+REPEAT = 7
+
+
+def legacy_parse_create_table(creation_command: str):
+    """parse_create_table antes do tokenizador (cópia da versão original)."""
+    table_name = re.search(r"CREATE TABLE\s+`?(\w+)`?", creation_command, re.IGNORECASE)
+    if not table_name:
+        raise ValueError("Não foi possível identificar o nome da tabela")
+    table_name = table_name.group(1)
+
+    cols_block = re.search(r"\((.*)\)", creation_command, re.DOTALL)
+    if not cols_block:
+        raise ValueError("Não foi possível encontrar a definição das colunas")
+    cols_block = cols_block.group(1)
+
+    columns = []
+    lines = [line.strip() for line in cols_block.split(",")]
+
+    column_pattern = re.compile(
+        r"`?(\w+)`?\s+([A-Z]+)(?:\((\d+)\))?([^,]*)", re.IGNORECASE
+    )
+
+    fk_columns = {}
+    pk_columns = set()
+
+    fk_pattern = re.compile(
+        r"FOREIGN KEY\s*\(`?(\w+)`?\)\s+REFERENCES\s+`?(\w+)`?\s*\(`?(\w+)`?\)",
+        re.IGNORECASE,
+    )
+    for line in lines:
+        fk_match = fk_pattern.search(line)
+        if fk_match:
+            fk_col, ref_table, ref_col = fk_match.groups()
+            fk_columns[fk_col] = (ref_table, ref_col)
+        pk_match = re.match(r"^PRIMARY KEY\s*\(`?(\w+)`?\)$", line, re.IGNORECASE)
+        if pk_match:
+            pk_columns.add(pk_match.group(1))
+
+    for line in lines:
+        if re.match(
+            r"^(PRIMARY|CONSTRAINT|UNIQUE|CHECK|KEY|FOREIGN)\b", line, re.IGNORECASE
+        ):
+            continue
+
+        m = column_pattern.match(line)
+        if m:
+            col_name, col_type, col_size, col_rest = m.groups()
+            columns.append(
+                {
+                    "name": col_name,
+                    "type": col_type.upper(),
+                    "size": int(col_size) if col_size else None,
+                    "not_null": "NOT NULL" in col_rest.upper(),
+                    "auto_inc": "AUTO_INCREMENT" in col_rest.upper(),
+                    "primary_key": "PRIMARY KEY" in col_rest.upper()
+                    or col_name in pk_columns,
+                    "foreign_key": col_name in fk_columns,
+                    "references": fk_columns.get(col_name),
+                }
+            )
+
+    return table_name, columns
+
+
+def legacy_parse_create_table_dependencies(create_table_sql):
+    table_match = re.search(
+        r"CREATE\s+TABLE\s+`?(\w+)`?", create_table_sql, re.IGNORECASE
+    )
+    if not table_match:
+        raise ValueError(
+            f"Não foi possível encontrar o nome da tabela em:\n{create_table_sql}"
+        )
+    table_name = table_match.group(1)
+
+    fks = re.findall(r"REFERENCES\s+`?(\w+)`?", create_table_sql, re.IGNORECASE)
+    return table_name, set(fks)
+
+
+def legacy_order_create_tables(create_tables_sql_list):
+    """order_create_tables antes do tokenizador (cópia da versão original)."""
+    dependencies = defaultdict(set)
+    dependents = defaultdict(set)
+    tables = set()
+
+    for sql in create_tables_sql_list:
+        table, deps = legacy_parse_create_table_dependencies(sql)
+        tables.add(table)
+        dependencies[table] = deps
+        for dep in deps:
+            dependents[dep].add(table)
+
+    indegree = {t: len(dependencies[t]) for t in tables}
+
+    queue = deque([t for t in tables if indegree[t] == 0])
+    ordered_tables = []
+
+    while queue:
+        t = queue.popleft()
+        ordered_tables.append(t)
+        for dep in dependents[t]:
+            indegree[dep] -= 1
+            if indegree[dep] == 0:
+                queue.append(dep)
+
+    if len(ordered_tables) != len(tables):
+        raise ValueError("Ciclo detectado nas dependências das tabelas.")
+
+    table_map = {
+        legacy_parse_create_table_dependencies(sql)[0]: sql for sql in create_tables_sql_list
+    }
+    return [table_map[t] for t in ordered_tables]
+
+
+_CREATE_TABLE = re.compile(
+    r"CREATE\s+TABLE\s+(?:IF\s+NOT\s+EXISTS\s+)?(?:[`\"\[]?\w+[`\"\]]?\.)?[`\"\[]?(\w+)",
+    re.IGNORECASE,
+)
+
+
+def legacy_split_schema(database_structure: str):
+    """Separação do DDL por tabela no podador de schema antes do tokenizador."""
+    matches = list(_CREATE_TABLE.finditer(database_structure))
+    if not matches:
+        return None
+    chunks = {}
+    for i, match in enumerate(matches):
+        end = matches[i + 1].start() if i + 1 < len(matches) else len(database_structure)
+        chunks[match.group(1)] = database_structure[match.start() : end]
+    references = {
+        name: set(schemaPruner._REFERENCES.findall(text)) for name, text in chunks.items()
+    }
+    return chunks.keys(), references
+
+
+def schema(tables: int) -> list:
+    """CREATE TABLE com 5 colunas, PRIMARY KEY em cláusula e até 2 FKs para tabelas anteriores."""
+    statements = []
+    for i in range(tables):
+        parents = [p for p in (i - 1, i // 2) if 0 <= p < i]
+        fk_columns = "".join(f"    `t{p}_id` INT NOT NULL,\n" for p in dict.fromkeys(parents))
+        fks = "".join(
+            f",\n    FOREIGN KEY (`t{p}_id`) REFERENCES `t{p}` (`id`)"
+            for p in dict.fromkeys(parents)
+        )
+        statements.append(
+            f"CREATE TABLE `t{i}` (\n"
+            "    `id` INT NOT NULL AUTO_INCREMENT,\n"
+            f"{fk_columns}"
+            "    `name` VARCHAR(80) NOT NULL,\n"
+            "    `price` DECIMAL(10,2),\n"
+            "    `created_at` DATETIME,\n"
+            f"    PRIMARY KEY (`id`){fks}\n"
+            ");"
+        )
+    return statements
+
+
+def clear_caches():
+    ddlParser._parse_table.cache_clear()
+    schemaPruner._split_ddl.cache_clear()
+
+
+def best(function, cold: bool = False) -> float:
+    timings = []
+    for _ in range(REPEAT):
+        if cold:
+            clear_caches()
+        started = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - started)
+    return min(timings) * 1000
+
+
+def main(tables: int):
+    statements = schema(tables)
+    text = "\n\n".join(statements)
+    operations = {
+        f"parse_create_table x{tables}": (
+            lambda: [legacy_parse_create_table(sql) for sql in statements],
+            lambda: [parse_create_table(sql) for sql in statements],
+        ),
+        "order_create_tables": (
+            lambda: legacy_order_create_tables(statements),
+            lambda: order_create_tables(statements),
+        ),
+        "split_schema": (
+            lambda: legacy_split_schema(text),
+            lambda: split_schema(text),
+        ),
+    }
+
+    print(f"{tables} tabelas, melhor de {REPEAT} execuções (ms)\n")
+    print(f"{'operação':<28}{'antigo':>10}{'novo frio':>12}{'novo quente':>14}")
+    for name, (legacy, current) in operations.items():
+        old = best(legacy)
+        cold = best(current, cold=True)
+        current()
+        warm = best(current)
+        print(f"{name:<28}{old:>10.2f}{cold:>12.2f}{warm:>14.2f}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1000)
@@ -0,0 +1,102 @@
+"""
+Compara a geração de dados numa thread com o pool de processos de
+services.generationPool, para escolher GENERATION_POOL_MIN_ROWS.
+
+    python -m benchmarks.bench_generation_pool [processos] [formato]
+
+Mede o tempo numa thread, no pool recém-criado (frio, com o spawn dos
+processos) e no pool já criado (quente), para várias linhas por tabela.
+Com os custos medidos (geração por linha, despacho por tabela e criação
+do pool) estima o ponto em que o pool compensa com N CPUs, o que permite
+escolher o padrão mesmo numa máquina com uma CPU só.
+"""
+import os
+import sys
+import math
+import time
+import asyncio
+import logging
+
+from loguru import logger
+
+from benchmarks.bench_ddl_parser import schema
+from helpers.helpers import schema_keys
+from services import generationPool
+
+TABLES = 8
+ROWS = (1_000, 10_000, 25_000, 50_000)
+CPUS = (2, 4, 8)
+
+
+async def elapsed(function, *args, **options) -> float:
+    started = time.perf_counter()
+    await function(*args, **options)
+    return time.perf_counter() - started
+
+
+async def serial(commands, rows, **options):
+    await asyncio.to_thread(generationPool._generate_serial, commands, rows, **options)
+
+
+async def cold_pool(commands, rows, **options):
+    await generationPool.shutdown()
+    await generationPool._generate_pool(commands, rows, **options)
+
+
+def break_even(per_row: float, overhead: float, cpus: int) -> int:
+    """Total de linhas a partir do qual o pool empata com a thread em cpus CPUs."""
+    parallel = 1 - math.ceil(TABLES / cpus) / TABLES
+    return int(overhead / (per_row * parallel))
+
+
+async def main(workers: int, output_format: str):
+    os.environ["GENERATION_WORKERS"] = str(workers)
+    logger.remove()
+    logging.disable(logging.CRITICAL)
+    commands = schema(TABLES)
+    options = {"seed": 42, "output_format": output_format, "keys": schema_keys(commands)}
+
+    # Custos fixos: criação do pool e despacho de uma tabela quase vazia.
+    spawn = await elapsed(cold_pool, commands, 1, **options)
+    dispatch = await elapsed(generationPool._generate_pool, commands, 1, **options) / TABLES
+    # Numa máquina com menos CPUs que processos os spawns se enfileiram; com
+    # um processo por CPU eles sobem juntos e custam o de um processo só.
+    spawn = (spawn - dispatch * TABLES) / math.ceil(workers / (os.cpu_count() or 1))
+
+    print(
+        f"{TABLES} tabelas, formato {output_format}, {workers} processos, "
+        f"{os.cpu_count()} CPUs\n"
+    )
+    print(f"{'linhas':>9}{'total':>10}{'thread ms':>12}{'pool frio ms':>14}{'pool quente ms':>16}")
+    per_row = []
+    for rows in ROWS:
+        threaded = await elapsed(serial, commands, rows, **options)
+        cold = await elapsed(cold_pool, commands, rows, **options)
+        warm = await elapsed(generationPool._generate_pool, commands, rows, **options)
+        per_row.append(threaded / (rows * TABLES))
+        print(
+            f"{rows:>9}{rows * TABLES:>10}{threaded * 1000:>12.0f}"
+            f"{cold * 1000:>14.0f}{warm * 1000:>16.0f}"
+        )
+    await generationPool.shutdown()
+
+    cost = min(per_row)
+    print(
+        f"\ngeração {cost * 1e6:.2f} us/linha, despacho {dispatch * 1000:.2f} ms/tabela, "
+        f"criação de um processo {spawn * 1000:.0f} ms"
+    )
+    print("\nestimativa com um processo por CPU: total de linhas a partir do qual o pool compensa")
+    print(f"{'CPUs':>6}{'pool frio':>12}{'pool quente':>14}")
+    for cpus in CPUS:
+        cold = break_even(cost, spawn + TABLES * dispatch, cpus)
+        warm = break_even(cost, TABLES * dispatch, cpus)
+        print(f"{cpus:>6}{cold:>12,}{warm:>14,}")
+
+
+if __name__ == "__main__":
+    asyncio.run(
+        main(
+            int(sys.argv[1]) if len(sys.argv) > 1 else 4,
+            sys.argv[2] if len(sys.argv) > 2 else "insert",
+        )
+    )
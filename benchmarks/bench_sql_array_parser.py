@@ -0,0 +1,125 @@
+"""
+Compara process_llm_output (parser incremental) com a versão anterior,
+baseada em regex, sobre um corpus de saídas malformadas de LLM.
+
+    python -m benchmarks.bench_sql_array_parser [statements por saída]
+
+Para cada caso: tempo médio por saída, quantos comandos cada versão
+recuperou e se a lista recuperada é exatamente a esperada.
+"""
+import ast
+import re
+import sys
+import json
+import time
+import logging
+
+from helpers.helpers import process_llm_output
+
+REPEAT = 200
+
+
+def legacy_process_llm_output(output: str):
+    """process_llm_output antes do parser incremental (cópia da versão original)."""
+    response_str = output.strip()
+
+    response_str = re.sub(r"```(?:json|python|sql)?\s*", "", response_str)
+    response_str = re.sub(r"```\s*", "", response_str)
+
+    response_str = response_str.replace('"', '"').replace('"', '"')
+    response_str = response_str.replace(""", "'").replace(""", "'")
+    response_str = re.sub(r"\\'", "'", response_str)
+
+    try:
+        return json.loads(response_str)
+    except Exception:
+        pass
+
+    try:
+        return ast.literal_eval(response_str)
+    except Exception:
+        pass
+
+    match = re.search(r"\[(.*)\]", response_str, re.DOTALL)
+    if match:
+        items = []
+        for item in match.group(1).split(","):
+            item = item.strip()
+            if (item.startswith('"') and item.endswith('"')) or (
+                item.startswith("'") and item.endswith("'")
+            ):
+                item = item[1:-1]
+            if item:
+                items.append(item)
+        return items
+
+    matches = re.findall(r'["\']([^"\']*)["\']', response_str)
+    if matches:
+        return matches
+    raise ValueError("Falha ao processar a saída do LLM")
+
+
+def statements(n: int) -> list:
+    kinds = [
+        "CREATE INDEX idx_orders_user_{i} ON orders (user_id, created_at);",
+        "SELECT o.id, u.email FROM orders o JOIN users u ON u.id = o.user_id WHERE o.total > {i};",
+        "ALTER TABLE orders ADD INDEX idx_total_{i} (total);",
+    ]
+    return [kinds[i % len(kinds)].format(i=i) for i in range(n)]
+
+
+def corpus(n: int) -> dict:
+    """{caso: (saída do LLM, comandos esperados)}."""
+    sql = statements(n)
+    identifiers = [s.replace("orders", '"orders"') for s in sql]
+    quoted = ", ".join(json.dumps(s) for s in sql)
+    return {
+        "json válido": (json.dumps(sql), sql),
+        "cerca markdown + texto": (
+            f"Aqui estão os comandos:\n```json\n[{quoted}]\n```\nEspero ter ajudado.",
+            sql,
+        ),
+        "vírgula sobrando": (f"[{quoted},]", sql),
+        "aspas tipográficas": ("[" + ", ".join(f"“{s}”" for s in sql) + "]", sql),
+        "aspas simples (Python)": (
+            "[" + ", ".join("'" + s.replace("'", "\\'") + "'" for s in sql) + "]",
+            sql,
+        ),
+        "vírgulas faltando": ("[" + "\n".join(json.dumps(s) for s in sql) + "]", sql),
+        "aspas duplas sem escape": (
+            "[" + ", ".join(f'"{s}"' for s in identifiers) + "]",
+            identifiers,
+        ),
+        "itens sem aspas": ("[" + "\n".join(sql) + "]", sql),
+    }
+
+
+def measure(function, text: str, expected: list):
+    try:
+        result = function(text)
+    except Exception:
+        result = None
+    started = time.perf_counter()
+    for _ in range(REPEAT):
+        try:
+            function(text)
+        except Exception:
+            pass
+    elapsed = (time.perf_counter() - started) / REPEAT * 1000
+    if not isinstance(result, list):
+        return elapsed, "erro"
+    return elapsed, f"{len(result)} {'ok' if result == expected else 'x'}"
+
+
+def main(n: int):
+    logging.disable(logging.CRITICAL)
+    print(f"{n} comandos por saída, média de {REPEAT} execuções\n")
+    print(f"{'caso':<26}{'antigo ms':>10}{'antigo':>10}{'novo ms':>10}{'novo':>10}")
+    for name, (text, expected) in corpus(n).items():
+        old_ms, old_result = measure(legacy_process_llm_output, text, expected)
+        new_ms, new_result = measure(process_llm_output, text, expected)
+        print(f"{name:<26}{old_ms:>10.3f}{old_result:>10}{new_ms:>10.3f}{new_result:>10}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200)
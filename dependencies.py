@@ -5,6 +5,8 @@ from fastapi import Depends, HTTPException, Security
 from fastapi.security import APIKeyHeader
 from starlette.status import HTTP_403_FORBIDDEN
 
+from services.scheduler import set_priority
+
 
 load_dotenv()
 
@@ -16,4 +18,13 @@ async def get_api_key(X_API_Key: str = Security(api_key_header)):
     else:
         raise HTTPException(
             status_code=HTTP_403_FORBIDDEN, detail=f"Could not validate API KEY"
-        )
\ No newline at end of file
+        )
+
+
+def with_priority(level: str):
+    """Dependência que define a classe de prioridade das chamadas ao LLM da requisição."""
+
+    async def set_request_priority():
+        set_priority(level)
+
+    return set_request_priority
@@ -0,0 +1,426 @@
+import numpy as np
+
+_INT_TYPES = ("INT", "BIGINT", "SMALLINT")
+_DECIMAL_TYPES = ("DECIMAL", "NUMERIC", "FLOAT", "DOUBLE")
+_STRING_TYPES = ("CHAR", "VARCHAR", "TEXT")
+_DATE_TYPES = ("DATE",)
+_DATETIME_TYPES = ("DATETIME", "TIMESTAMP")
+
+_ALPHABET = np.frombuffer(
+    b"abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ", dtype=np.uint8
+)
+_TWO_DIGITS = np.array([f"{i:02d}" for i in range(100)])
+_START = np.datetime64("2000-01-01")
+_END = np.datetime64("2025-01-01")
+
+
+class KeyPool:
+    """
+    Valores de chave 1..n (INT) e fk_value_0..n-1 (VARCHAR) para PKs e FKs,
+    calculados a partir do índice, sem materializar a lista inteira.
+    Indexar por "INT"/"VARCHAR" devolve os arrays completos, como o dict antigo.
+    """
+
+    def __init__(self, size: int):
+        self.size = size
+
+    def values(self, kind: str, index: np.ndarray) -> np.ndarray:
+        if kind == "INT":
+            return index + 1
+        return np.char.add("fk_value_", index.astype(str))
+
+    def __getitem__(self, kind: str) -> np.ndarray:
+        return self.values(kind, np.arange(self.size))
+
+
+def key_pool(n: int) -> KeyPool:
+    return KeyPool(n)
+
+
+def _pool_size(fk_values, kind: str) -> int:
+    return fk_values.size if isinstance(fk_values, KeyPool) else len(fk_values[kind])
+
+
+def _keys(fk_values, kind: str, index: np.ndarray) -> np.ndarray:
+    if isinstance(fk_values, KeyPool):
+        return fk_values.values(kind, index)
+    return np.asarray(fk_values[kind])[index]
+
+
+def random_strings(rng: np.random.Generator, n: int, min_len: int, max_len: int) -> np.ndarray:
+    """
+    Gera n strings de letras com tamanho entre min_len e max_len de uma vez:
+    uma matriz de bytes aleatórios cujo excedente é zerado (o numpy descarta
+    os zeros finais ao ler como bytes).
+    """
+    min_len = min(min_len, max_len)
+    matrix = _ALPHABET[rng.integers(0, len(_ALPHABET), size=(n, max_len))]
+    lengths = rng.integers(min_len, max_len + 1, size=n)
+    matrix[np.arange(max_len) >= lengths[:, None]] = 0
+    return matrix.view(f"S{max_len}").ravel().astype(str)
+
+
+def _pick(rng: np.random.Generator, fk_values, kind: str, n: int, bound: int = None):
+    size = _pool_size(fk_values, kind)
+    bound = size if bound is None else min(bound, size)
+    return _keys(fk_values, kind, rng.integers(0, bound, size=n))
+
+
+def key_kind(col: dict):
+    """Tipo de chave do KeyPool que a coluna recebe, se for uma chave gerada."""
+    if col["auto_inc"]:
+        return "INT"
+    if col["primary_key"]:
+        if col["type"] in _INT_TYPES:
+            return "INT"
+        if col["type"] in _STRING_TYPES:
+            return "VARCHAR"
+    return None
+
+
+class ColumnSampler:
+    """
+    Sorteia índices em um domínio de size valores segundo a distribuição do
+    perfil: uniform, zipf (peso 1/k^zipf_s) ou hot_key (hot_weight das
+    linhas caem em hot_fraction do domínio). Os valores "quentes" são
+    escolhidos ao acaso uma única vez, então são os mesmos em todos os blocos.
+    """
+
+    def __init__(self, size: int, profile: dict, rng: np.random.Generator, population: int = None):
+        self.size = size
+        self.distribution = profile.get("distribution") or "uniform"
+        self.hot_weight = profile.get("hot_weight", 0.8)
+        self.hot = max(1, round(size * profile.get("hot_fraction", 0.01)))
+        self.cdf = None
+        if self.distribution == "zipf":
+            weights = np.arange(1, size + 1, dtype=float) ** -profile.get("zipf_s", 1.1)
+            self.cdf = np.cumsum(weights / weights.sum())
+        # Domínio dentro de uma população maior (ex.: chaves do pai) ou permutação dele.
+        population = population or size
+        self.order = None
+        if population > size:
+            self.order = rng.choice(population, size, replace=False)
+        elif self.distribution != "uniform":
+            self.order = rng.permutation(size)
+
+    def sample(self, rng: np.random.Generator, n: int) -> np.ndarray:
+        if self.distribution == "zipf":
+            ranks = np.minimum(np.searchsorted(self.cdf, rng.random(n)), self.size - 1)
+        elif self.distribution == "hot_key" and self.size > self.hot:
+            ranks = np.where(
+                rng.random(n) < self.hot_weight,
+                rng.integers(0, self.hot, size=n),
+                rng.integers(self.hot, self.size, size=n),
+            )
+        else:
+            ranks = rng.integers(0, self.size, size=n)
+        return ranks if self.order is None else self.order[ranks]
+
+
+def _domain(col: dict, size: int, fk_values, rng: np.random.Generator):
+    if col["type"] in _INT_TYPES:
+        # Inteiros distintos, para que a cardinalidade pedida seja a real.
+        values = rng.choice(max(1000, size), size, replace=False) + 1
+        return values.astype(str), False
+    return generate_column(col, size, fk_values, rng)
+
+
+def plan_columns(
+    columns: list,
+    n: int,
+    fk_values,
+    rng: np.random.Generator,
+    profiles: dict = None,
+    references: dict = None,
+) -> dict:
+    """
+    Prepara as colunas com perfil ou chave estrangeira: {nome: plano}.
+    FKs sorteiam entre as chaves que a tabela pai gerou (references dá o
+    tipo de chave do pai); colunas com distribuição ou cardinalidade
+    sorteiam em um domínio fixo gerado aqui; null_ratio marca linhas nulas.
+    """
+    profiles = profiles or {}
+    references = references or {}
+    plans = {}
+    for col in columns:
+        if col["auto_inc"] or col["primary_key"]:
+            continue
+        profile = profiles.get(col["name"]) or {}
+        plan = {"null_ratio": 0.0 if col["not_null"] else profile.get("null_ratio") or 0.0}
+
+        kind = None
+        if col["foreign_key"]:
+            kind = references.get(col["name"])
+            if kind is None and col["type"] in _INT_TYPES:
+                kind = "INT"
+            elif kind is None and col["type"] in _STRING_TYPES:
+                kind = "VARCHAR"
+
+        skewed = profile.get("distribution", "uniform") != "uniform" or profile.get("cardinality")
+        if kind is not None:
+            keys = _pool_size(fk_values, "INT")
+            size = min(profile.get("cardinality") or keys, keys)
+            plan["key"] = kind
+            plan["sampler"] = ColumnSampler(size, profile, rng, population=keys)
+        elif skewed:
+            domain = _domain(col, profile.get("cardinality") or n, fk_values, rng)
+            if domain is not None:
+                plan["domain"] = domain
+                plan["sampler"] = ColumnSampler(len(domain[0]), profile, rng)
+        elif not plan["null_ratio"]:
+            continue
+        plans[col["name"]] = plan
+    return plans
+
+
+def _planned_column(col: dict, plan: dict, n: int, fk_values, rng: np.random.Generator):
+    if "key" in plan:
+        values = _keys(fk_values, plan["key"], plan["sampler"].sample(rng, n)).astype(str)
+        return values, plan["key"] == "VARCHAR" or col["type"] in _STRING_TYPES
+    if "domain" in plan:
+        values, text = plan["domain"]
+        return values[plan["sampler"].sample(rng, n)], text
+    return None
+
+
+def generate_column(
+    col: dict, n: int, fk_values, rng: np.random.Generator, start: int = 0
+):
+    """
+    Gera a coluna inteira de uma vez, seguindo as mesmas regras do antigo
+    random_value (hoje em benchmarks/bench_data_generator.py). start é o índice da primeira linha, para gerar a
+    tabela em blocos. Retorna (valores como strings, se é texto) ou None
+    para colunas sem gerador (auto incremento ou tipo desconhecido).
+    """
+    col_type = col["type"]
+
+    if col["auto_inc"]:
+        return None
+
+    if col["primary_key"]:
+        rows = np.arange(start, start + n)
+        if col_type in _INT_TYPES:
+            return _keys(fk_values, "INT", rows).astype(str), False
+        if col_type in _STRING_TYPES:
+            return _keys(fk_values, "VARCHAR", rows).astype(str), True
+
+    if col["foreign_key"]:
+        if col_type in _INT_TYPES:
+            return _pick(rng, fk_values, "INT", n).astype(str), False
+        if col_type in _STRING_TYPES:
+            bound = _pool_size(fk_values, "INT")
+            return _pick(rng, fk_values, "VARCHAR", n, bound).astype(str), True
+
+    if col_type in _INT_TYPES:
+        return rng.integers(1, 1001, size=n).astype(str), False
+
+    if col_type in _DECIMAL_TYPES:
+        cents = rng.integers(100, 999901, size=n)
+        whole = np.char.add((cents // 100).astype(str), ".")
+        return np.char.add(whole, _TWO_DIGITS[cents % 100]), False
+
+    if col_type in _STRING_TYPES:
+        size = min(col["size"] or 10, 15)
+        return random_strings(rng, n, 3, size), True
+
+    if col_type in _DATE_TYPES:
+        days = rng.integers(0, (_END - _START).astype(int) + 1, size=n)
+        return np.datetime_as_string(_START + days, unit="D"), True
+
+    if col_type in _DATETIME_TYPES:
+        span = (_END - _START).astype("timedelta64[s]").astype(int)
+        seconds = rng.integers(0, span + 1, size=n)
+        stamps = np.datetime_as_string(_START.astype("datetime64[s]") + seconds, unit="s")
+        return np.char.replace(stamps, "T", " "), True
+
+    return None
+
+
+def generate_table(
+    columns: list, n: int, fk_values, seed=None, start: int = 0, rng=None, plans=None
+) -> dict:
+    """
+    Gera os valores de todas as colunas inseridas (sem auto incremento),
+    coluna a coluna: {nome: {"values", "text", "nulls"}}. Colunas sem
+    gerador viram NULL, ou 'X' se NOT NULL. plans vem de plan_columns.
+    """
+    rng = rng or np.random.default_rng(seed)
+    plans = plans or {}
+    data = {}
+    for col in columns:
+        if col["auto_inc"]:
+            continue
+        plan = plans.get(col["name"])
+        generated = None
+        if plan is not None:
+            generated = _planned_column(col, plan, n, fk_values, rng)
+        if generated is None:
+            generated = generate_column(col, n, fk_values, rng, start)
+        if generated is not None:
+            values, text = generated
+            nulls = None
+        elif col["not_null"]:
+            values, text, nulls = np.full(n, "X"), True, None
+        else:
+            values, text, nulls = np.full(n, ""), False, np.ones(n, dtype=bool)
+        if plan is not None and plan["null_ratio"] and nulls is None:
+            nulls = rng.random(n) < plan["null_ratio"]
+        data[col["name"]] = {"values": values, "text": text, "nulls": nulls}
+    return data
+
+
+def _escape(values: np.ndarray, replacements) -> np.ndarray:
+    for old, new in replacements:
+        if np.any(np.char.find(values, old) >= 0):
+            values = np.char.replace(values, old, new)
+    return values
+
+
+def _render(column: dict, text_format, null: str, replacements) -> np.ndarray:
+    values = column["values"]
+    if column["text"]:
+        values = text_format(_escape(values, replacements))
+    if column["nulls"] is not None:
+        values = np.where(column["nulls"], null, values)
+    return values
+
+
+def _sql_literal(values: np.ndarray) -> np.ndarray:
+    return np.char.add(np.char.add("'", values), "'")
+
+
+def _csv_field(values: np.ndarray) -> np.ndarray:
+    return np.char.add(np.char.add('"', values), '"')
+
+
+# Escapes de literais no dialeto MySQL (o mesmo das crases nos identificadores).
+_SQL_ESCAPES = (("\\", "\\\\"), ("'", "''"))
+_CSV_ESCAPES = (('"', '""'),)
+_COPY_ESCAPES = (("\\", "\\\\"), ("\t", "\\t"), ("\n", "\\n"), ("\r", "\\r"))
+
+
+def _sql_rows(data: dict) -> list:
+    columns = [
+        _render(column, _sql_literal, "NULL", _SQL_ESCAPES).tolist()
+        for column in data.values()
+    ]
+    return [", ".join(row) for row in zip(*columns)]
+
+
+def _insert_prefix(table_name: str, data: dict) -> str:
+    col_names = ", ".join(f"`{name}`" for name in data)
+    return f"INSERT INTO `{table_name}` ({col_names}) VALUES "
+
+
+def render_inserts(table_name: str, data: dict, n: int) -> list:
+    """Monta um INSERT por linha a partir das colunas já geradas."""
+    prefix = _insert_prefix(table_name, data)
+    if not data:
+        return [prefix + "();"] * n
+    return [f"{prefix}({row});" for row in _sql_rows(data)]
+
+
+def render_multirow_inserts(
+    table_name: str, data: dict, n: int, rows_per_statement: int
+) -> list:
+    """Agrupa rows_per_statement linhas em cada INSERT ... VALUES (...), (...)."""
+    prefix = _insert_prefix(table_name, data)
+    rows = _sql_rows(data) if data else ["" for _ in range(n)]
+    return [
+        prefix + ", ".join(f"({row})" for row in rows[i : i + rows_per_statement]) + ";"
+        for i in range(0, n, rows_per_statement)
+    ]
+
+
+def render_csv(data: dict, header: bool = True) -> str:
+    """
+    CSV com texto sempre entre aspas ("" para aspas internas) e NULL sem
+    aspas, compatível com LOAD DATA e COPY ... (FORMAT csv, NULL 'NULL').
+    """
+    columns = [
+        _render(column, _csv_field, "NULL", _CSV_ESCAPES).tolist()
+        for column in data.values()
+    ]
+    lines = [",".join(f'"{name}"' for name in data)] if header else []
+    lines.extend(",".join(row) for row in zip(*columns))
+    return "\n".join(lines) + "\n" if lines else ""
+
+
+def render_copy_rows(data: dict) -> str:
+    """Linhas no formato texto do COPY do PostgreSQL (tab, \\N para NULL)."""
+    columns = [
+        _render(column, lambda values: values, "\\N", _COPY_ESCAPES).tolist()
+        for column in data.values()
+    ]
+    return "".join("\t".join(row) + "\n" for row in zip(*columns))
+
+
+def load_commands(table_name: str, names: list) -> dict:
+    """Comandos para carregar o CSV gerado por render_csv."""
+    mysql_cols = ", ".join(f"`{name}`" for name in names)
+    pg_cols = ", ".join(f'"{name}"' for name in names)
+    return {
+        "mysql": (
+            f"LOAD DATA LOCAL INFILE '{table_name}.csv' INTO TABLE `{table_name}` "
+            "FIELDS TERMINATED BY ',' OPTIONALLY ENCLOSED BY '\"' ESCAPED BY '' "
+            f"LINES TERMINATED BY '\\n' IGNORE 1 LINES ({mysql_cols});"
+        ),
+        "postgres": (
+            f'COPY "{table_name}" ({pg_cols}) FROM STDIN '
+            "WITH (FORMAT csv, HEADER true, NULL 'NULL');"
+        ),
+    }
+
+
+def copy_header(table_name: str, names: list) -> str:
+    pg_cols = ", ".join(f'"{name}"' for name in names)
+    return f'COPY "{table_name}" ({pg_cols}) FROM stdin;\n'
+
+
+OUTPUT_FORMATS = ("insert", "multi_insert", "csv", "copy")
+
+
+def render_chunk(
+    output_format: str,
+    table_name: str,
+    data: dict,
+    rows: int,
+    first: bool,
+    last: bool,
+    rows_per_statement: int = 1000,
+):
+    """
+    Renderiza um bloco de linhas no formato pedido: lista de comandos para
+    insert/multi_insert, texto para csv (cabeçalho só no primeiro bloco) e
+    copy (COPY ... FROM stdin no início e \\. no fim).
+    """
+    if output_format == "insert":
+        return render_inserts(table_name, data, rows)
+    if output_format == "multi_insert":
+        return render_multirow_inserts(table_name, data, rows, rows_per_statement)
+    if output_format == "csv":
+        return render_csv(data, header=first)
+    if output_format == "copy":
+        content = copy_header(table_name, list(data)) if first else ""
+        content += render_copy_rows(data)
+        return content + ("\\.\n" if last else "")
+    raise ValueError(f"Formato desconhecido: {output_format}")
+
+
+def iter_table_chunks(
+    columns: list,
+    n: int,
+    fk_values,
+    chunk_size: int,
+    seed=None,
+    profiles: dict = None,
+    references: dict = None,
+):
+    """Gera a tabela em blocos de chunk_size linhas: (início, linhas, dados)."""
+    rng = np.random.default_rng(seed)
+    plans = plan_columns(columns, n, fk_values, rng, profiles, references)
+    for start in range(0, n, chunk_size):
+        rows = min(chunk_size, n - start)
+        yield start, rows, generate_table(
+            columns, rows, fk_values, start=start, rng=rng, plans=plans
+        )
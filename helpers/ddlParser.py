@@ -0,0 +1,585 @@
+import os
+import re
+import functools
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+# Sinônimos de tipos normalizados para os nomes usados pelo gerador de dados.
+_TYPE_ALIASES = {
+    "INTEGER": "INT",
+    "CHARACTER VARYING": "VARCHAR",
+    "CHARACTER": "CHAR",
+    "DOUBLE PRECISION": "DOUBLE",
+    "REAL": "FLOAT",
+    "BOOL": "BOOLEAN",
+    "TIMESTAMPTZ": "TIMESTAMP",
+    "SERIAL": "INT",
+    "BIGSERIAL": "BIGINT",
+    "SMALLSERIAL": "SMALLINT",
+}
+_SERIAL_TYPES = ("SERIAL", "BIGSERIAL", "SMALLSERIAL")
+_TYPE_CONTINUATIONS = ("VARYING", "PRECISION")
+_TABLE_MODIFIERS = ("OR", "REPLACE", "TEMPORARY", "TEMP", "GLOBAL", "LOCAL", "UNLOGGED")
+_INDEX_WORDS = ("KEY", "INDEX")
+
+# Um único findall separa o DDL em tokens; comentários são descartados depois.
+_TOKEN = re.compile(
+    r"""--[^\n]*|/\*.*?\*/|'(?:[^'\\]|\\.|'')*'|"(?:[^"]|"")*"|`[^`]*`|\[[^\]]*\]"""
+    r"|\d+(?:\.\d+)?|\w+|\S",
+    re.DOTALL,
+)
+# Para separar comandos basta ver ';', parênteses e CREATE fora de strings.
+_STATEMENT_TOKEN = re.compile(
+    r"""--[^\n]*|/\*.*?\*/|'(?:[^'\\]|\\.|'')*'|"(?:[^"]|"")*"|`[^`]*`"""
+    r"|[();]|\bCREATE\b",
+    re.DOTALL | re.IGNORECASE,
+)
+_CREATE_TABLE = re.compile(
+    r"(?:\s|--[^\n]*|/\*.*?\*/)*CREATE\s+"
+    r"(?:(?:OR\s+REPLACE|TEMPORARY|TEMP|GLOBAL|LOCAL|UNLOGGED)\s+)*TABLE\b",
+    re.DOTALL | re.IGNORECASE,
+)
+_NON_SPACE = re.compile(r"\S")
+_END = (None, "")
+
+
+@dataclass(frozen=True)
+class Column:
+    name: str
+    type: str
+    size: Optional[int] = None
+    scale: Optional[int] = None
+    args: Tuple[str, ...] = ()
+    unsigned: bool = False
+    not_null: bool = False
+    auto_inc: bool = False
+    primary_key: bool = False
+    unique: bool = False
+    default: Optional[str] = None
+
+
+@dataclass(frozen=True)
+class ForeignKey:
+    columns: Tuple[str, ...]
+    ref_table: str
+    ref_columns: Tuple[str, ...]
+    name: Optional[str] = None
+
+
+@dataclass(frozen=True)
+class Index:
+    columns: Tuple[str, ...]
+    unique: bool = False
+    name: Optional[str] = None
+
+
+@dataclass(frozen=True)
+class Table:
+    name: str
+    columns: Tuple[Column, ...]
+    primary_key: Tuple[str, ...] = ()
+    foreign_keys: Tuple[ForeignKey, ...] = ()
+    indexes: Tuple[Index, ...] = ()
+    schema: Optional[str] = None
+
+    @property
+    def dependencies(self) -> set:
+        """Tabelas referenciadas por chaves estrangeiras (sem a própria)."""
+        return {fk.ref_table for fk in self.foreign_keys if fk.ref_table != self.name}
+
+    def column(self, name: str) -> Optional[Column]:
+        return next((col for col in self.columns if col.name == name), None)
+
+    def references(self, column: str):
+        """(tabela, coluna) referenciada pela coluna, inclusive em FKs compostas."""
+        for fk in self.foreign_keys:
+            if column in fk.columns and len(fk.ref_columns) == len(fk.columns):
+                return fk.ref_table, fk.ref_columns[fk.columns.index(column)]
+            if column in fk.columns and not fk.ref_columns:
+                return fk.ref_table, column
+        return None
+
+    def column_dicts(self) -> list:
+        """Colunas no formato de dicionário usado por helpers.dataGenerator."""
+        return [
+            {
+                "name": col.name,
+                "type": col.type,
+                "size": col.size,
+                "scale": col.scale,
+                "not_null": col.not_null,
+                "auto_inc": col.auto_inc,
+                "primary_key": col.primary_key,
+                "unique": col.unique,
+                "foreign_key": self.references(col.name) is not None,
+                "references": self.references(col.name),
+            }
+            for col in self.columns
+        ]
+
+
+def _identifier(text: str) -> str:
+    if text[:1] in "`\"[" and len(text) > 1:
+        return text[1:-1]
+    return text
+
+
+def _kind(first: str) -> str:
+    if first == "'":
+        return "string"
+    if first in "`\"[":
+        return "quoted"
+    if first.isdigit():
+        return "number"
+    if first.isalpha() or first == "_":
+        return "word"
+    return "other"
+
+
+# Tipo do token pelo primeiro caractere; "-" e "/" ficam de fora por
+# também iniciarem comentários.
+_KINDS = {chr(c): _kind(chr(c)) for c in range(33, 127) if chr(c) not in "-/"}
+
+
+def _tokens(sql: str) -> list:
+    tokens = []
+    for token in _TOKEN.findall(sql):
+        kind = _KINDS.get(token[0])
+        if kind is None:
+            if token.startswith(("--", "/*")):
+                continue
+            kind = _kind(token[0])
+        tokens.append((kind, token))
+    return tokens
+
+
+class _Parser:
+    def __init__(self, tokens: list):
+        self.tokens = tokens
+        self.pos = 0
+
+    def peek(self, offset: int = 0):
+        try:
+            return self.tokens[self.pos + offset]
+        except IndexError:
+            return _END
+
+    def word(self, offset: int = 0) -> str:
+        kind, text = self.peek(offset)
+        return text.upper() if kind == "word" else ""
+
+    def next(self):
+        token = self.peek()
+        self.pos += 1
+        return token
+
+    def accept(self, *words) -> bool:
+        if self.word() in words:
+            self.pos += 1
+            return True
+        return False
+
+    def at_end(self) -> bool:
+        return self.pos >= len(self.tokens)
+
+    def group(self) -> list:
+        """Consome um grupo entre parênteses e retorna os tokens de dentro."""
+        tokens, start = self.tokens, self.pos
+        if self.peek()[1] != "(":
+            return []
+        depth = 0
+        for index in range(start, len(tokens)):
+            text = tokens[index][1]
+            if text == "(":
+                depth += 1
+            elif text == ")":
+                depth -= 1
+                if depth == 0:
+                    self.pos = index + 1
+                    return tokens[start + 1 : index]
+        raise ValueError("Não foi possível encontrar a definição das colunas")
+
+    def qualified_name(self):
+        kind, text = self.next()
+        if kind not in ("word", "quoted"):
+            raise ValueError("Não foi possível identificar o nome da tabela")
+        schema, name = None, _identifier(text)
+        if self.peek()[1] == "." and self.peek(1)[0] in ("word", "quoted"):
+            self.pos += 1
+            schema, name = name, _identifier(self.next()[1])
+        return schema, name
+
+
+def _split_top_level(tokens: list) -> list:
+    parts, current, depth = [], [], 0
+    for token in tokens:
+        text = token[1]
+        if text == "(":
+            depth += 1
+        elif text == ")":
+            depth -= 1
+        elif text == "," and depth == 0:
+            parts.append(current)
+            current = []
+            continue
+        current.append(token)
+    if current:
+        parts.append(current)
+    return parts
+
+
+def _column_list(tokens: list) -> tuple:
+    # Aceita prefixos de tamanho e ordenação: (nome(10) DESC, id).
+    names = []
+    for part in _split_top_level(tokens):
+        if part and part[0][0] in ("word", "quoted"):
+            names.append(_identifier(part[0][1]))
+    return tuple(names)
+
+
+def _is_index_element(parser: _Parser) -> bool:
+    # "KEY nome (colunas)" x uma coluna chamada key: "key VARCHAR(10)".
+    offset = 1
+    if parser.peek(offset)[1] != "(":
+        offset += 1
+    if parser.peek(offset)[1] != "(":
+        return False
+    return parser.peek(offset + 1)[0] in ("word", "quoted")
+
+
+def _optional_name(parser: _Parser):
+    if parser.peek()[0] in ("word", "quoted") and parser.word() != "USING":
+        return _identifier(parser.next()[1])
+    return None
+
+
+def _references(parser: _Parser):
+    _, ref_table = parser.qualified_name()
+    return ref_table, _column_list(parser.group())
+
+
+def _column_type(parser: _Parser) -> dict:
+    kind, text = parser.next()
+    words = [text.upper()]
+    while parser.word() in _TYPE_CONTINUATIONS:
+        words.append(parser.next()[1].upper())
+    raw = " ".join(words)
+    info = {"type": _TYPE_ALIASES.get(raw, raw), "auto_inc": raw in _SERIAL_TYPES}
+
+    args = [
+        "".join(token[1] for token in part) for part in _split_top_level(parser.group())
+    ]
+    numbers = [int(arg) for arg in args if arg.isdigit()]
+    info["args"] = tuple(args)
+    info["size"] = numbers[0] if numbers else None
+    info["scale"] = numbers[1] if len(numbers) > 1 else None
+
+    if info["type"] in ("TIMESTAMP", "TIME") and parser.word() in ("WITH", "WITHOUT"):
+        parser.pos += 1
+        parser.accept("TIME")
+        parser.accept("ZONE")
+    return info
+
+
+def _default(parser: _Parser) -> str:
+    kind, text = parser.next()
+    if text in ("-", "+"):
+        text += parser.next()[1]
+    elif text == "(":
+        parser.pos -= 1
+        text = "(" + " ".join(token[1] for token in parser.group()) + ")"
+    elif kind == "word" and parser.peek()[1] == "(":
+        text += "(" + " ".join(token[1] for token in parser.group()) + ")"
+    return text
+
+
+def _column(parser: _Parser, table: dict):
+    name = _identifier(parser.next()[1])
+    column = {"name": name, **_column_type(parser)}
+    while not parser.at_end():
+        word = parser.word()
+        if parser.accept("NOT"):
+            if parser.accept("NULL"):
+                column["not_null"] = True
+        elif parser.accept("UNSIGNED"):
+            column["unsigned"] = True
+        elif parser.accept("AUTO_INCREMENT", "AUTOINCREMENT", "IDENTITY"):
+            column["auto_inc"] = True
+            parser.group()
+        elif parser.accept("GENERATED"):
+            parser.accept("ALWAYS")
+            if parser.accept("BY"):
+                parser.accept("DEFAULT")
+            parser.accept("AS")
+            if parser.accept("IDENTITY"):
+                column["auto_inc"] = True
+            parser.group()
+        elif parser.accept("PRIMARY"):
+            parser.accept("KEY")
+            column["primary_key"] = True
+        elif parser.accept("UNIQUE"):
+            parser.accept("KEY")
+            column["unique"] = True
+        elif parser.accept("DEFAULT"):
+            column["default"] = _default(parser)
+        elif parser.accept("REFERENCES"):
+            ref_table, ref_columns = _references(parser)
+            table["foreign_keys"].append(
+                ForeignKey((name,), ref_table, ref_columns or (name,))
+            )
+        elif word in ("COMMENT", "COLLATE", "CHARSET"):
+            parser.pos += 2
+        elif parser.accept("CHARACTER"):
+            parser.accept("SET")
+            parser.pos += 1
+        elif parser.accept("ON"):
+            parser.pos += 2
+        else:
+            parser.next()
+            parser.group()
+    table["columns"].append(column)
+
+
+def _element(parser: _Parser, table: dict):
+    name = None
+    if parser.accept("CONSTRAINT"):
+        if parser.word() not in ("PRIMARY", "FOREIGN", "UNIQUE", "CHECK"):
+            name = _identifier(parser.next()[1])
+
+    word = parser.word()
+    if word == "PRIMARY" and parser.word(1) == "KEY":
+        parser.pos += 2
+        table["primary_key"] = _column_list(parser.group())
+    elif word == "FOREIGN" and parser.word(1) == "KEY":
+        parser.pos += 2
+        name = _optional_name(parser) or name
+        columns = _column_list(parser.group())
+        if parser.accept("REFERENCES"):
+            ref_table, ref_columns = _references(parser)
+            table["foreign_keys"].append(
+                ForeignKey(columns, ref_table, ref_columns or columns, name)
+            )
+    elif word in ("UNIQUE", "FULLTEXT", "SPATIAL") or (
+        word in _INDEX_WORDS and _is_index_element(parser)
+    ):
+        parser.pos += 1
+        parser.accept(*_INDEX_WORDS)
+        index_name = _optional_name(parser) or name
+        if parser.accept("USING"):
+            parser.next()
+        columns = _column_list(parser.group())
+        table["indexes"].append(Index(columns, word == "UNIQUE", index_name))
+    elif word in ("CHECK", "EXCLUDE", "LIKE", "PERIOD"):
+        return
+    elif parser.peek()[0] in ("word", "quoted"):
+        _column(parser, table)
+
+
+def _table_header(parser: _Parser):
+    """Avança até o "(" das colunas e retorna (schema, nome, índice do nome)."""
+    while not parser.at_end():
+        if parser.accept("CREATE"):
+            while parser.accept(*_TABLE_MODIFIERS):
+                pass
+            if parser.accept("TABLE"):
+                break
+        else:
+            parser.next()
+    else:
+        raise ValueError("Não foi possível identificar o nome da tabela")
+
+    if parser.accept("IF"):
+        parser.accept("NOT")
+        parser.accept("EXISTS")
+    name_index = parser.pos
+    schema, name = parser.qualified_name()
+
+    if parser.peek()[1] != "(":
+        raise ValueError("Não foi possível encontrar a definição das colunas")
+    return schema, name, name_index
+
+
+@functools.lru_cache(maxsize=int(os.getenv("DDL_PARSER_CACHE_SIZE", 4096)))
+def _parse_table(statement: str) -> Table:
+    parser = _Parser(_tokens(statement))
+    schema, name, _ = _table_header(parser)
+    table = {"columns": [], "primary_key": (), "foreign_keys": [], "indexes": []}
+    for tokens in _split_top_level(parser.group()):
+        _element(_Parser(tokens), table)
+
+    primary_key = table["primary_key"] or tuple(
+        col["name"] for col in table["columns"] if col.get("primary_key")
+    )
+    columns = tuple(
+        Column(
+            **{
+                **col,
+                "primary_key": col["name"] in primary_key,
+                "not_null": col.get("not_null", False) or col["name"] in primary_key,
+            }
+        )
+        for col in table["columns"]
+    )
+    return Table(
+        name=name,
+        columns=columns,
+        primary_key=primary_key,
+        foreign_keys=tuple(table["foreign_keys"]),
+        indexes=tuple(table["indexes"]),
+        schema=schema,
+    )
+
+
+def parse_table(statement: str) -> Table:
+    """
+    Analisa um CREATE TABLE (MySQL, PostgreSQL ou SQLite) e retorna o modelo
+    da tabela. O resultado é memoizado por comando, então os endpoints que
+    recebem o mesmo DDL não o analisam de novo.
+    """
+    return _parse_table(statement.strip().rstrip(";").rstrip())
+
+
+_FK_ACTIONS = {"SET": 2, "NO": 2}
+
+
+def _clause_end(parser: _Parser) -> int:
+    """Fim de um REFERENCES t (colunas) [ON DELETE/UPDATE ação] [MATCH ...]."""
+    parser.qualified_name()
+    parser.group()
+    while True:
+        if parser.word() == "ON" and parser.word(1) in ("DELETE", "UPDATE"):
+            parser.pos += 2
+            parser.pos += _FK_ACTIONS.get(parser.word(), 1)
+        elif parser.accept("MATCH"):
+            parser.next()
+        else:
+            return parser.pos
+
+
+def defer_foreign_keys(statement: str, ref_tables: set):
+    """
+    Remove do CREATE TABLE as chaves estrangeiras para ref_tables (de
+    tabela ou inline na coluna) e retorna (comando sem elas, [ALTER TABLE
+    ... ADD ...]) para criá-las depois, quando as tabelas já existirem.
+    O texto das restrições é mantido como veio, no dialeto original.
+    """
+    positioned = [
+        (match.start(), match.end())
+        for match in _TOKEN.finditer(statement)
+        if not match.group().startswith(("--", "/*"))
+    ]
+    tokens = _tokens(statement)
+    parser = _Parser(tokens)
+    _, _, name_index = _table_header(parser)
+    table_name = statement[positioned[name_index][0] : positioned[parser.pos - 1][1]]
+
+    def text(first: int, last: int) -> str:
+        return statement[positioned[first][0] : positioned[last][1]]
+
+    # Elementos do corpo: intervalos de índices de tokens entre vírgulas de topo.
+    open_index = parser.pos
+    parser.group()
+    elements, start, depth = [], open_index + 1, 0
+    for index in range(open_index + 1, parser.pos - 1):
+        token = tokens[index][1]
+        if token == "(":
+            depth += 1
+        elif token == ")":
+            depth -= 1
+        elif token == "," and depth == 0:
+            elements.append((start, index))
+            start = index + 1
+    elements.append((start, parser.pos - 1))
+
+    removals, alters = [], []
+    for position, (first, end) in enumerate(elements):
+        if first >= end:
+            continue
+        found = {"columns": [], "primary_key": (), "foreign_keys": [], "indexes": []}
+        _element(_Parser(tokens[first:end]), found)
+        deferred = [fk for fk in found["foreign_keys"] if fk.ref_table in ref_tables]
+        if not deferred:
+            continue
+        if not found["columns"]:
+            # FOREIGN KEY de tabela: sai o elemento inteiro, com uma vírgula vizinha.
+            alters.append(f"ALTER TABLE {table_name} ADD {text(first, end - 1)};")
+            if position > 0:
+                removals.append((positioned[first - 1][0], positioned[end - 1][1]))
+            else:
+                removals.append((positioned[first][0], positioned[end + 1][0]))
+            continue
+        # REFERENCES na definição da coluna: sai só a cláusula.
+        column = _Parser(tokens[first:end])
+        while not column.at_end():
+            if column.word() != "REFERENCES":
+                column.next()
+                continue
+            ref_first = first + column.pos
+            column.pos += 1
+            ref_end = first + _clause_end(column)
+            alters.append(
+                f"ALTER TABLE {table_name} ADD FOREIGN KEY ({text(first, first)}) "
+                f"{text(ref_first, ref_end - 1)};"
+            )
+            removals.append((positioned[ref_first - 1][1], positioned[ref_end - 1][1]))
+
+    for start, end in sorted(removals, reverse=True):
+        statement = statement[:start] + statement[end:]
+    return statement, alters
+
+
+def iter_statements(sql: str):
+    """
+    Separa um texto SQL em comandos: (início, fim, comando). Quebra nos ';'
+    de topo e também em um CREATE fora de parênteses, já que o DDL que
+    chega dos LLMs muitas vezes vem sem ';' entre as tabelas.
+    """
+    start, boundary, depth = None, 0, 0
+    for match in _STATEMENT_TOKEN.finditer(sql):
+        text = match.group()
+        if text == "(":
+            if start is None:
+                start, depth = _first_char(sql, boundary), 0
+            depth += 1
+        elif text == ")":
+            if depth:
+                depth -= 1
+        elif text == ";":
+            if start is None:
+                start, depth = _first_char(sql, boundary), 0
+            if depth == 0:
+                yield start, match.end(), sql[start : match.end()]
+                start, boundary = None, match.end()
+        elif text[0] in "Cc":
+            if start is not None and depth == 0:
+                yield start, match.start(), sql[start : match.start()].rstrip()
+                start = None
+            if start is None:
+                start, depth = match.start(), 0
+    if start is None and sql[boundary:].strip():
+        start = _first_char(sql, boundary)
+    if start is not None:
+        yield start, len(sql), sql[start:].rstrip()
+
+
+def _first_char(sql: str, position: int) -> int:
+    match = _NON_SPACE.search(sql, position)
+    return match.start() if match else position
+
+
+def is_create_table(statement: str) -> bool:
+    return _CREATE_TABLE.match(statement) is not None
+
+
+def parse_schema(sql: str) -> list:
+    """Modelos de todas as tabelas de um texto com vários CREATE TABLE."""
+    return [
+        parse_table(statement)
+        for _, _, statement in iter_statements(sql)
+        if is_create_table(statement)
+    ]
+
+
+def cache_info() -> dict:
+    info = _parse_table.cache_info()
+    return {"hits": info.hits, "misses": info.misses, "size": info.currsize}
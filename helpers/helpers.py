@@ -1,239 +1,389 @@
-import ast
-import re
-import random
-import string
-from datetime import datetime, timedelta
-from collections import defaultdict, deque
+from collections import defaultdict
 
 import json
 import logging
 
+from helpers.dataGenerator import (
+    generate_table,
+    iter_table_chunks,
+    key_kind,
+    key_pool,
+    render_chunk,
+    render_inserts,
+)
+from helpers.ddlParser import defer_foreign_keys, is_create_table, parse_table
+from helpers.sqlArrayParser import SqlArrayParser
+
 logger = logging.getLogger(__name__)
 
 
 def process_llm_output(output: str):
     """
-    Processa a saída do LLM de forma simples e robusta.
-    Tenta diferentes métodos até conseguir fazer o parsing.
+    Extrai a lista de comandos SQL da resposta do LLM.
+    Usa o parser tolerante de helpers.sqlArrayParser, que corrige cercas de
+    markdown, aspas tipográficas e vírgulas em uma única passada.
     """
-    response_str = output.strip()
-
-    response_str = re.sub(r"```(?:json|python|sql)?\s*", "", response_str)
-    response_str = re.sub(r"```\s*", "", response_str)
-
-    response_str = response_str.replace('"', '"').replace('"', '"')
-    response_str = response_str.replace(""", "'").replace(""", "'")
-    response_str = re.sub(r"\\'", "'", response_str)
-
     try:
-        return json.loads(response_str)
-    except Exception as _:
+        # Caminho rápido para a resposta que já vem como JSON válido.
+        parsed = json.loads(output)
+        if isinstance(parsed, list) and parsed and all(isinstance(item, str) for item in parsed):
+            return parsed
+    except ValueError:
         pass
 
-    try:
-        return ast.literal_eval(response_str)
-    except Exception as _:
-        pass
+    # Lista vazia, só texto ou lista truncada contam como falha, para que a
+    # resposta seja gerada de novo e nunca chegue vazia ao cache.
+    parser = SqlArrayParser()
+    statements = parser.feed(output) + parser.close()
+    if statements and not parser.truncated:
+        return statements
 
-    try:
-        match = re.search(r"\[(.*)\]", response_str, re.DOTALL)
-        if match:
-            list_content = match.group(1)
-            items = []
-
-            for item in list_content.split(","):
-                item = item.strip()
-                if (item.startswith('"') and item.endswith('"')) or (
-                    item.startswith("'") and item.endswith("'")
-                ):
-                    item = item[1:-1]
-                if item:
-                    items.append(item)
-            return items
-
-        pattern = r'["\']([^"\']*)["\']'
-        matches = re.findall(pattern, response_str)
-        if matches:
-            return matches
-
-    except Exception as e:
-        logger.debug(f"Extração manual falhou: {e}")
-
-    logger.error(f"Não foi possível processar: {repr(response_str[:100])}")
+    logger.error(f"Não foi possível processar: {repr(output.strip()[:100])}")
     raise ValueError(f"Falha ao processar a saída do LLM: {output[:50]}...")
 
 
 def parse_create_table(creation_command: str):
-    table_name = re.search(r"CREATE TABLE\s+`?(\w+)`?", creation_command, re.IGNORECASE)
-    if not table_name:
-        raise ValueError("Não foi possível identificar o nome da tabela")
-    table_name = table_name.group(1)
-
-    cols_block = re.search(r"\((.*)\)", creation_command, re.DOTALL)
-    if not cols_block:
-        raise ValueError("Não foi possível encontrar a definição das colunas")
-    cols_block = cols_block.group(1)
-
-    columns = []
-    lines = [line.strip() for line in cols_block.split(",")]
-
-    column_pattern = re.compile(
-        r"`?(\w+)`?\s+([A-Z]+)(?:\((\d+)\))?([^,]*)", re.IGNORECASE
-    )
-
-    fk_columns = set()
-
-    fk_pattern = re.compile(
-        r"FOREIGN KEY\s*\(`?(\w+)`?\)\s+REFERENCES\s+`?(\w+)`?\s*\(`?(\w+)`?\)",
-        re.IGNORECASE,
-    )
-    for line in lines:
-        fk_match = fk_pattern.search(line)
-        if fk_match:
-            fk_col, ref_table, ref_col = fk_match.groups()
-            fk_columns.add(fk_col)
-
-    for line in lines:
-        if re.match(
-            r"^(PRIMARY|CONSTRAINT|UNIQUE|CHECK|KEY|FOREIGN)\b", line, re.IGNORECASE
-        ):
-            continue
+    """
+    Nome da tabela e colunas (dicionários de helpers.dataGenerator) de um
+    CREATE TABLE, a partir do modelo memoizado de helpers.ddlParser.
+    """
+    table = parse_table(creation_command)
+    return table.name, table.column_dicts()
 
-        m = column_pattern.match(line)
-        if m:
-            col_name, col_type, col_size, col_rest = m.groups()
-            columns.append(
-                {
-                    "name": col_name,
-                    "type": col_type.upper(),
-                    "size": int(col_size) if col_size else None,
-                    "not_null": "NOT NULL" in col_rest.upper(),
-                    "auto_inc": "AUTO_INCREMENT" in col_rest.upper(),
-                    "primary_key": "PRIMARY KEY" in col_rest.upper(),
-                    "foreign_key": col_name in fk_columns,
-                }
-            )
 
-    return table_name, columns
+def generate_inserts(
+    creation_command: str, number_insertions: int, fk_values: dict, seed=None
+) -> list:
+    """
+    Gera number_insertions comandos INSERT para a tabela. Os valores são
+    produzidos coluna a coluna com NumPy (helpers.dataGenerator) e o SQL só
+    é montado no final.
+    """
+    table_name, columns = parse_create_table(creation_command)
+    data = generate_table(columns, number_insertions, fk_values, seed)
+    return render_inserts(table_name, data, number_insertions)
 
 
-def random_value(col, fk_values: dict, index: int):
-    if col["auto_inc"]:
-        return None
+def table_seed(seed, position: int):
+    """Semente própria de cada tabela, derivada da semente da requisição."""
+    return None if seed is None else [seed, position]
 
-    if col["primary_key"]:
-        if col["type"] in ("INT", "BIGINT", "SMALLINT"):
-            return fk_values["INT"][index]
 
-        elif col["type"] in ("CHAR", "VARCHAR", "TEXT"):
-            return fk_values["VARCHAR"][index]
+def schema_keys(creation_commands: list) -> dict:
+    """
+    Tipo de chave ("INT"/"VARCHAR" do KeyPool) de cada coluna que é gerada
+    como chave, em {"tabela.coluna": tipo}. Como as chaves dependem só da
+    posição da linha, as FKs dos filhos podem sorteá-las sem esperar a
+    geração da tabela pai (inclusive em outro processo).
+    """
+    keys = {}
+    for creation_command in creation_commands:
+        table_name, columns = parse_create_table(creation_command)
+        for col in columns:
+            kind = key_kind(col)
+            if kind is not None:
+                keys[f"{table_name}.{col['name']}"] = kind
+    return keys
 
-    if col["foreign_key"]:
-        if col["type"] in ("INT", "BIGINT", "SMALLINT"):
-            return fk_values["INT"][random.randint(0, len(fk_values["INT"]) - 1)]
 
-        elif col["type"] in ("CHAR", "VARCHAR", "TEXT"):
-            return fk_values["VARCHAR"][random.randint(0, len(fk_values["INT"]) - 1)]
+def _table_references(table_name: str, columns: list, keys: dict) -> dict:
+    references = {}
+    for col in columns:
+        if not col.get("references"):
+            continue
+        ref_table, ref_col = col["references"]
+        kind = keys.get(f"{ref_table}.{ref_col}")
+        if kind is None:
+            logger.debug(
+                f"{table_name}.{col['name']} referencia {ref_table}.{ref_col}, "
+                "que não é uma chave gerada; usando o pool padrão."
+            )
+            continue
+        references[col["name"]] = kind
+    return references
 
-    if col["type"] in ("INT", "BIGINT", "SMALLINT"):
-        return random.randint(1, 1000)
 
-    if col["type"] in ("DECIMAL", "NUMERIC", "FLOAT", "DOUBLE"):
-        return round(random.uniform(1, 9999), 2)
+def _table_profiles(profiles: dict, table_name: str) -> dict:
+    """Filtra os perfis {"tabela.coluna": perfil} de uma tabela: {coluna: perfil}."""
+    prefix = f"{table_name}."
+    return {
+        key[len(prefix):]: profile
+        for key, profile in (profiles or {}).items()
+        if key.startswith(prefix)
+    }
 
-    if col["type"] in ("CHAR", "VARCHAR", "TEXT"):
-        size = col["size"] if col["size"] else 10
-        size = min(size, 15)
-        return "".join(random.choices(string.ascii_letters, k=random.randint(3, size)))
 
-    if col["type"] in ("DATE",):
-        start = datetime(2000, 1, 1)
-        end = datetime(2025, 1, 1)
-        return (start + timedelta(days=random.randint(0, (end - start).days))).strftime(
-            "%Y-%m-%d"
+def iter_table_data(
+    creation_command: str,
+    number_insertions: int,
+    fk_values,
+    chunk_size: int = 10000,
+    seed=None,
+    profiles: dict = None,
+    keys: dict = None,
+):
+    """
+    Produz (tabela, início, linhas, dados) para os blocos de uma tabela, com
+    os dados ainda em colunas (helpers.dataGenerator.generate_table).
+    profiles são os perfis de coluna {"tabela.coluna": perfil} e keys o
+    resultado de schema_keys, para que as FKs apontem para chaves do pai.
+    """
+    table_name, columns = parse_create_table(creation_command)
+    chunks = iter_table_chunks(
+        columns,
+        number_insertions,
+        fk_values,
+        chunk_size,
+        seed,
+        profiles=_table_profiles(profiles, table_name),
+        references=_table_references(table_name, columns, keys or {}),
+    )
+    for start, rows, data in chunks:
+        yield table_name, start, rows, data
+
+
+def iter_table_population(
+    creation_command: str,
+    number_insertions: int,
+    fk_values,
+    chunk_size: int = 10000,
+    seed=None,
+    output_format: str = "insert",
+    rows_per_statement: int = 1000,
+    profiles: dict = None,
+    keys: dict = None,
+):
+    """Produz (tabela, bloco, conteúdo) para os blocos de uma única tabela."""
+    chunks = iter_table_data(
+        creation_command, number_insertions, fk_values, chunk_size, seed, profiles, keys
+    )
+    for index, (table_name, start, rows, data) in enumerate(chunks):
+        content = render_chunk(
+            output_format,
+            table_name,
+            data,
+            rows,
+            first=index == 0,
+            last=start + rows >= number_insertions,
+            rows_per_statement=rows_per_statement,
         )
-
-    if col["type"] in ("DATETIME", "TIMESTAMP"):
-        start = datetime(2000, 1, 1)
-        end = datetime(2025, 1, 1)
-        dt = start + timedelta(
-            seconds=random.randint(0, int((end - start).total_seconds()))
+        yield table_name, index, content
+
+
+def iter_population(
+    creation_commands: list,
+    number_insertions: int,
+    chunk_size: int = 10000,
+    seed=None,
+    output_format: str = "insert",
+    rows_per_statement: int = 1000,
+    profiles: dict = None,
+):
+    """
+    Produz (tabela, bloco, conteúdo) para cada bloco de chunk_size linhas de
+    cada tabela, no formato de helpers.dataGenerator.render_chunk. Só um
+    bloco fica em memória por vez.
+    """
+    fk_values = key_pool(number_insertions)
+    keys = schema_keys(creation_commands)
+    for position, creation_command in enumerate(creation_commands):
+        yield from iter_table_population(
+            creation_command,
+            number_insertions,
+            fk_values,
+            chunk_size,
+            table_seed(seed, position),
+            output_format,
+            rows_per_statement,
+            profiles,
+            keys,
         )
-        return dt.strftime("%Y-%m-%d %H:%M:%S")
-
-    return None
 
 
-def generate_inserts(
-    creation_command: str, number_insertions: int, fk_values: dict
-) -> list:
-    table_name, columns = parse_create_table(creation_command)
-    inserts = []
-
-    for i in range(number_insertions):
-        values = []
-
-        for col in columns:
-            val = random_value(col, fk_values, i)
-            if val is None:
-                values.append("NULL" if not col["not_null"] else "'X'")
-            elif isinstance(val, str):
-                values.append(f"'{val}'")
-            else:
-                values.append(str(val))
-
-        col_names = [f"`{c['name']}`" for c in columns if not c["auto_inc"]]
-        val_list = [values[i] for i, c in enumerate(columns) if not c["auto_inc"]]
-        inserts.append(
-            f"INSERT INTO `{table_name}` ({', '.join(col_names)}) VALUES ({', '.join(val_list)});"
-        )
-
-    return inserts
+def generate_table_content(
+    creation_command: str,
+    number_insertions: int,
+    seed=None,
+    position: int = 0,
+    chunk_size: int = 10000,
+    output_format: str = "insert",
+    rows_per_statement: int = 1000,
+    profiles: dict = None,
+    keys: dict = None,
+):
+    """
+    Gera a tabela inteira e retorna (tabela, conteúdo): lista de comandos
+    para insert/multi_insert, texto para csv/copy. Roda nos processos de
+    services.generationPool; com a mesma semente e o mesmo chunk_size o
+    resultado é idêntico ao de iter_population.
+    """
+    table_name, content = None, None
+    for table_name, _, chunk in iter_table_population(
+        creation_command,
+        number_insertions,
+        key_pool(number_insertions),
+        chunk_size,
+        table_seed(seed, position),
+        output_format,
+        rows_per_statement,
+        profiles,
+        keys,
+    ):
+        if content is None:
+            content = chunk
+        else:
+            content += chunk
+    if table_name is None:
+        table_name = parse_create_table(creation_command)[0]
+        content = [] if output_format in ("insert", "multi_insert") else ""
+    return table_name, content
 
 
 def parse_create_table_dependencies(create_table_sql):
-    table_match = re.search(
-        r"CREATE\s+TABLE\s+`?(\w+)`?", create_table_sql, re.IGNORECASE
-    )
-    if not table_match:
+    try:
+        table = parse_table(create_table_sql)
+    except ValueError:
         raise ValueError(
             f"Não foi possível encontrar o nome da tabela em:\n{create_table_sql}"
         )
-    table_name = table_match.group(1)
+    return table.name, table.dependencies
 
-    fks = re.findall(r"REFERENCES\s+`?(\w+)`?", create_table_sql, re.IGNORECASE)
-    return table_name, set(fks)
 
+def _strongly_connected(nodes: list, edges: dict) -> list:
+    """Componentes fortemente conexos (Tarjan iterativo), na ordem de nodes."""
+    index, low, on_stack, stack, components = {}, {}, set(), [], []
+    for root in nodes:
+        if root in index:
+            continue
+        work = [(root, iter(edges[root]))]
+        index[root] = low[root] = len(index)
+        stack.append(root)
+        on_stack.add(root)
+        while work:
+            node, children = work[-1]
+            child = next(children, None)
+            if child is None:
+                work.pop()
+                if work:
+                    low[work[-1][0]] = min(low[work[-1][0]], low[node])
+                if low[node] == index[node]:
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        component.append(member)
+                        if member == node:
+                            break
+                    components.append(component)
+            elif child not in index:
+                index[child] = low[child] = len(index)
+                stack.append(child)
+                on_stack.add(child)
+                work.append((child, iter(edges[child])))
+            elif child in on_stack:
+                low[node] = min(low[node], index[child])
+    return components
+
+
+def _break_cycles(tables: list, dependencies: dict) -> dict:
+    """
+    Escolhe as dependências a adiar até o grafo não ter ciclos: em cada
+    componente com ciclo, a tabela com menos dependências dentro dele
+    (empate pela ordem de entrada) deixa de depender das demais.
+    Retorna {tabela: tabelas adiadas} e remove essas arestas de dependencies.
+    """
+    breaks = {}
+    while True:
+        components = [
+            component
+            for component in _strongly_connected(tables, dependencies)
+            if len(component) > 1
+        ]
+        if not components:
+            return breaks
+        for component in components:
+            members = set(component)
+            table = min(
+                (t for t in tables if t in members),
+                key=lambda t: len(dependencies[t] & members),
+            )
+            parents = dependencies[table] & members
+            breaks.setdefault(table, set()).update(parents)
+            dependencies[table] -= parents
 
-def order_create_tables(create_tables_sql_list):
-    dependencies = defaultdict(set)
-    dependents = defaultdict(set)
-    tables = set()
+
+def plan_create_tables(create_tables_sql_list) -> dict:
+    """
+    Organiza os CREATE TABLE em ondas: as tabelas de uma onda só dependem
+    das ondas anteriores, então podem ser criadas e carregadas em paralelo.
+    Ciclos de chaves estrangeiras são quebrados removendo do CREATE as FKs
+    de uma das tabelas, que voltam como ALTER TABLE em "deferred". Outros
+    comandos (CREATE INDEX, etc.) vão em "others", para rodar no fim.
+    """
+    # Cada comando é analisado uma única vez; a ordem de entrada desempata,
+    # para que a mesma lista gere sempre a mesma ordem (e as mesmas sementes).
+    table_map = {}
+    dependencies = {}
+    others = []
 
     for sql in create_tables_sql_list:
+        if not is_create_table(sql):
+            others.append(sql)
+            continue
         table, deps = parse_create_table_dependencies(sql)
-        tables.add(table)
+        table_map[table] = sql
         dependencies[table] = deps
-        for dep in deps:
-            dependents[dep].add(table)
-
-    indegree = {t: len(dependencies[t]) for t in tables}
 
-    queue = deque([t for t in tables if indegree[t] == 0])
-    ordered_tables = []
+    # Referências a tabelas fora da lista não bloqueiam a ordem.
+    pending = {t: set(deps) & table_map.keys() for t, deps in dependencies.items()}
+    deferred = []
+    for table, parents in _break_cycles(list(pending), pending).items():
+        logger.info(
+            f"Ciclo de chaves estrangeiras: FKs de {table} para "
+            f"{', '.join(sorted(parents))} adiadas para ALTER TABLE."
+        )
+        table_map[table], alters = defer_foreign_keys(table_map[table], parents)
+        deferred.extend(alters)
+
+    # Kahn por níveis: cada tabela só é revisitada quando um pai é criado,
+    # então uma cadeia longa de FKs não custa uma varredura por onda.
+    position = {t: i for i, t in enumerate(pending)}
+    remaining = {t: len(deps) for t, deps in pending.items()}
+    dependents = defaultdict(list)
+    for t, deps in pending.items():
+        for dep in deps:
+            dependents[dep].append(t)
+
+    waves, names = [], []
+    wave = [t for t in pending if not remaining[t]]
+    while wave:
+        waves.append([table_map[t] for t in wave])
+        names.append(wave)
+        ready = []
+        for t in wave:
+            for child in dependents[t]:
+                remaining[child] -= 1
+                if not remaining[child]:
+                    ready.append(child)
+        wave = sorted(ready, key=position.get)
+
+    if sum(len(wave) for wave in names) != len(pending):
+        raise ValueError("Ciclo detectado nas dependências das tabelas.")
 
-    while queue:
-        t = queue.popleft()
-        ordered_tables.append(t)
-        for dep in dependents[t]:
-            indegree[dep] -= 1
-            if indegree[dep] == 0:
-                queue.append(dep)
+    return {"waves": waves, "tables": names, "deferred": deferred, "others": others}
 
-    if len(ordered_tables) != len(tables):
-        raise ValueError("Ciclo detectado nas dependências das tabelas.")
 
-    table_map = {
-        parse_create_table_dependencies(sql)[0]: sql for sql in create_tables_sql_list
+def order_create_tables(create_tables_sql_list, keep_foreign_keys: bool = False):
+    """
+    CREATE TABLE em ordem de criação (as ondas de plan_create_tables em
+    sequência). Por padrão as FKs adiadas de ciclos ficam fora dos comandos;
+    com keep_foreign_keys os comandos voltam como vieram, só reordenados
+    (útil para gerar dados, que precisa saber de todas as FKs).
+    """
+    plan = plan_create_tables(create_tables_sql_list)
+    if not keep_foreign_keys:
+        return [sql for wave in plan["waves"] for sql in wave]
+    originals = {
+        parse_table(sql).name: sql for sql in create_tables_sql_list if is_create_table(sql)
     }
-    return [table_map[t] for t in ordered_tables]
+    return [originals[table] for wave in plan["tables"] for table in wave]
@@ -0,0 +1,19 @@
+import json
+
+from fastapi.responses import StreamingResponse
+
+
+def _ndjson_lines(records):
+    try:
+        for record in records:
+            yield json.dumps(record, ensure_ascii=False) + "\n"
+    except Exception as e:
+        yield json.dumps({"error": str(e)}, ensure_ascii=False) + "\n"
+
+
+def ndjson_response(records) -> StreamingResponse:
+    """
+    Envia um registro JSON por linha à medida que o gerador os produz.
+    Geradores síncronos rodam no threadpool, fora do event loop.
+    """
+    return StreamingResponse(_ndjson_lines(records), media_type="application/x-ndjson")
@@ -0,0 +1,226 @@
+import os
+import re
+import functools
+import json
+import unicodedata
+from collections import defaultdict
+
+from helpers.ddlParser import is_create_table, iter_statements, parse_table
+from helpers.sqlNormalizer import tokenize_sql
+
+_REFERENCES = re.compile(
+    r"REFERENCES\s+(?:[`\"\[]?\w+[`\"\]]?\.)?[`\"\[]?(\w+)", re.IGNORECASE
+)
+_NAME_KEYS = ("name", "table", "table_name", "nome", "tabela")
+
+
+def _strip_accents(text: str) -> str:
+    normalized = unicodedata.normalize("NFKD", text)
+    return "".join(c for c in normalized if not unicodedata.combining(c))
+
+
+@functools.lru_cache(maxsize=64)
+def _split_ddl(database_structure: str):
+    # Memoizado por texto: o mesmo schema chega em várias requisições.
+    # Cada trecho vai do CREATE TABLE até o próximo, como antes; os nomes e
+    # as referências vêm do modelo de helpers.ddlParser.
+    tables = []
+    for start, _, statement in iter_statements(database_structure):
+        if not is_create_table(statement):
+            continue
+        try:
+            tables.append((start, parse_table(statement)))
+        except ValueError:
+            continue
+    if not tables:
+        return None
+    preamble = database_structure[: tables[0][0]]
+    chunks, references = {}, {}
+    for i, (start, table) in enumerate(tables):
+        end = tables[i + 1][0] if i + 1 < len(tables) else len(database_structure)
+        chunks[table.name] = database_structure[start:end]
+        references[table.name] = table.dependencies
+    return preamble, chunks, references
+
+
+def _json_table_name(item):
+    if isinstance(item, dict):
+        for key in _NAME_KEYS:
+            if isinstance(item.get(key), str):
+                return item[key]
+    return None
+
+
+def _json_references(value) -> set:
+    refs = set()
+    if isinstance(value, dict):
+        for key, item in value.items():
+            if re.search(r"ref|foreign|fk", key, re.IGNORECASE):
+                if isinstance(item, str):
+                    refs.update(re.findall(r"\w+", item))
+                elif isinstance(item, dict):
+                    refs.update(
+                        v for k, v in item.items() if k in _NAME_KEYS and isinstance(v, str)
+                    )
+            refs |= _json_references(item)
+    elif isinstance(value, list):
+        for item in value:
+            refs |= _json_references(item)
+    elif isinstance(value, str):
+        refs.update(_REFERENCES.findall(value))
+    return refs
+
+
+def _split_json(database_structure: str):
+    try:
+        data = json.loads(database_structure)
+    except (ValueError, TypeError):
+        return None
+
+    container = data.get("tables", data) if isinstance(data, dict) else data
+    if isinstance(container, dict):
+        tables = {name: definition for name, definition in container.items()}
+    elif isinstance(container, list):
+        tables = {}
+        for item in container:
+            name = _json_table_name(item)
+            if name is None:
+                return None
+            tables[name] = item
+    else:
+        return None
+
+    if not tables:
+        return None
+
+    def render(names):
+        kept = [n for n in tables if n in names]
+        if isinstance(container, dict):
+            pruned = {n: tables[n] for n in kept}
+        else:
+            pruned = [tables[n] for n in kept]
+        if isinstance(data, dict) and "tables" in data:
+            pruned = {**data, "tables": pruned}
+        return json.dumps(pruned, ensure_ascii=False)
+
+    references = {name: _json_references(definition) for name, definition in tables.items()}
+    return tables.keys(), references, render
+
+
+def split_schema(database_structure: str):
+    """
+    Separa a estrutura do banco por tabela (DDL ou JSON).
+    Retorna (tabelas, referências por tabela, função que monta o texto podado)
+    ou None se a estrutura não puder ser separada.
+    """
+    ddl = _split_ddl(database_structure)
+    if ddl is not None:
+        preamble, chunks, references = ddl
+
+        def render(names):
+            return preamble + "".join(text for name, text in chunks.items() if name in names)
+
+        return chunks.keys(), references, render
+
+    return _split_json(database_structure)
+
+
+def _name_variants(name: str) -> set:
+    base = _strip_accents(name.lower())
+    variants = {base, base + "s", base + "es"}
+    if base.endswith("es"):
+        variants.add(base[:-2])
+    if base.endswith("s"):
+        variants.add(base[:-1])
+    return variants
+
+
+def tables_in_query(query: str, tables) -> set:
+    identifiers = set()
+    for kind, text in tokenize_sql(query):
+        if kind == "word":
+            identifiers.add(text.lower())
+        elif kind == "quoted":
+            identifiers.add(text[1:-1].lower())
+    return {t for t in tables if t.lower() in identifiers}
+
+
+def tables_in_order(order: str, tables) -> set:
+    words = set(re.findall(r"\w+", _strip_accents(order.lower())))
+    found = set()
+    for table in tables:
+        if _name_variants(table) & words:
+            found.add(table)
+            continue
+        parts = [p for p in table.lower().split("_") if p]
+        if len(parts) > 1 and all(_name_variants(p) & words for p in parts):
+            found.add(table)
+    return found
+
+
+def _with_neighbours(selected: set, references: dict, depth: int) -> set:
+    neighbours = defaultdict(set)
+    lower_names = {name.lower(): name for name in references}
+    for table, refs in references.items():
+        for ref in refs:
+            parent = lower_names.get(ref.lower())
+            if parent and parent != table:
+                neighbours[table].add(parent)
+                neighbours[parent].add(table)
+
+    result = set(selected)
+    frontier = set(selected)
+    for _ in range(depth):
+        frontier = {n for t in frontier for n in neighbours[t]} - result
+        if not frontier:
+            break
+        result |= frontier
+    return result
+
+
+def prune_schema(database_structure: str, query: str = None, order: str = None):
+    """
+    Reduz a estrutura do banco às tabelas citadas na query SQL (ou no pedido
+    em linguagem natural) e às suas vizinhas por chave estrangeira.
+    Retorna a estrutura resultante e estatísticas da poda.
+    """
+    stats = {
+        "pruned": False,
+        "tables_total": 0,
+        "tables_kept": 0,
+        "original_chars": len(database_structure),
+        "pruned_chars": len(database_structure),
+    }
+
+    split = split_schema(database_structure)
+    if split is None:
+        return database_structure, stats
+
+    tables, references, render = split
+    stats["tables_total"] = stats["tables_kept"] = len(tables)
+
+    selected = set()
+    if query:
+        selected |= tables_in_query(query, tables)
+    if order:
+        selected |= tables_in_order(order, tables)
+    if not selected:
+        return database_structure, stats
+
+    depth = int(os.getenv("SCHEMA_PRUNING_DEPTH", 1))
+    kept = _with_neighbours(selected, references, depth)
+    if len(kept) >= len(tables):
+        return database_structure, stats
+
+    pruned = render(kept)
+    stats.update(
+        pruned=True,
+        tables_kept=len(kept),
+        pruned_chars=len(pruned),
+        tables=sorted(kept),
+    )
+    return pruned, stats
+
+
+def pruning_enabled() -> bool:
+    return os.getenv("SCHEMA_PRUNING", "true").lower() in ("1", "true", "yes")
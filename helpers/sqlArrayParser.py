@@ -0,0 +1,274 @@
+import re
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Delimitador de abertura -> delimitadores aceitos para fechar a string.
+_CLOSERS = {
+    '"': '"”',
+    "“": '”“"',
+    "”": '”“"',
+    "'": "'’",
+    "‘": "’‘'",
+    "’": "’‘'",
+}
+_ESCAPES = {"n": "\n", "t": "\t", "r": "\r", "b": "\b", "f": "\f", "/": "/"}
+_STRING_BODY = {
+    closers: re.compile("[^\\\\" + re.escape(closers) + "]+") for closers in set(_CLOSERS.values())
+}
+
+_PRE, _ARRAY, _STRING, _ESCAPE, _UNICODE, _PENDING, _BARE, _NESTED, _DONE = range(9)
+
+
+class SqlArrayParser:
+    """
+    Parser incremental e tolerante para a lista JSON de comandos SQL que os
+    LLMs devolvem. Recebe os pedaços do stream em feed() e retorna cada
+    string assim que ela fecha.
+
+    Corrige em uma única passada os defeitos mais comuns: cercas de markdown
+    e texto antes/depois da lista, aspas tipográficas, aspas simples no
+    estilo Python, vírgulas sobrando ou faltando, aspas duplas não escapadas
+    dentro do SQL e itens sem aspas (separados por ';').
+    """
+
+    def __init__(self, allow_bare: bool = True):
+        self.allow_bare = allow_bare
+        self.started = False
+        self.finished = False
+        self.truncated = False
+        self._state = _PRE
+        self._pre = []
+        self._buffer = []
+        self._closers = ""
+        self._pending = ""
+        self._unicode = ""
+        self._depth = 0
+        self._bare_quote = None
+        self._bare_parens = 0
+
+    def feed(self, chunk: str) -> list:
+        out = []
+        i, n = 0, len(chunk)
+        while i < n:
+            state = self._state
+            c = chunk[i]
+
+            if state == _DONE:
+                break
+
+            if state == _PRE:
+                j = chunk.find("[", i)
+                if j < 0:
+                    self._pre.append(chunk[i:])
+                    break
+                self._pre.append(chunk[i:j])
+                self.started = True
+                self._state = _ARRAY
+                i = j + 1
+
+            elif state == _ARRAY:
+                if c in _CLOSERS:
+                    self._open_string(c)
+                elif c == "]":
+                    self._finish()
+                elif c in "[{":
+                    self._depth = 1
+                    self._state = _NESTED
+                elif not (c.isspace() or c == ","):
+                    if self.allow_bare:
+                        self._state = _BARE
+                        self._bare_quote = None
+                        self._bare_parens = 0
+                        continue
+                i += 1
+
+            elif state == _STRING:
+                match = _STRING_BODY[self._closers].match(chunk, i)
+                if match:
+                    self._buffer.append(match.group())
+                    i = match.end()
+                    continue
+                if c == "\\":
+                    self._state = _ESCAPE
+                else:
+                    self._pending = c
+                    self._state = _PENDING
+                i += 1
+
+            elif state == _ESCAPE:
+                if c == "u":
+                    self._unicode = ""
+                    self._state = _UNICODE
+                else:
+                    self._buffer.append(_ESCAPES.get(c, c))
+                    self._state = _STRING
+                i += 1
+
+            elif state == _UNICODE:
+                self._unicode += c
+                if len(self._unicode) == 4:
+                    try:
+                        self._buffer.append(chr(int(self._unicode, 16)))
+                    except ValueError:
+                        self._buffer.append("\\u" + self._unicode)
+                    self._state = _STRING
+                i += 1
+
+            elif state == _PENDING:
+                # Aspa que talvez feche a string: só confirma se o próximo
+                # caractere relevante for um separador ou o início de outro item.
+                if c.isspace():
+                    self._pending += c
+                    i += 1
+                elif c in ",]" or c in _CLOSERS or not self.allow_bare:
+                    out.extend(self._commit_string())
+                    self._state = _ARRAY
+                else:
+                    self._buffer.append(self._pending)
+                    self._pending = ""
+                    self._state = _STRING
+
+            elif state == _BARE:
+                if self._bare_quote:
+                    if c == self._bare_quote:
+                        self._bare_quote = None
+                    self._buffer.append(c)
+                elif c in "'\"`":
+                    self._bare_quote = c
+                    self._buffer.append(c)
+                elif c == "(":
+                    self._bare_parens += 1
+                    self._buffer.append(c)
+                elif c == ")":
+                    self._bare_parens -= 1
+                    self._buffer.append(c)
+                elif c == ";" and self._bare_parens <= 0:
+                    self._buffer.append(c)
+                    out.extend(self._commit_bare())
+                    self._state = _ARRAY
+                elif c == "]" and self._bare_parens <= 0:
+                    out.extend(self._commit_bare())
+                    self._finish()
+                else:
+                    self._buffer.append(c)
+                i += 1
+
+            elif state == _NESTED:
+                # Objetos ou listas aninhadas são ignorados, respeitando strings.
+                if self._bare_quote:
+                    if c == "\\":
+                        i += 1
+                    elif c == self._bare_quote:
+                        self._bare_quote = None
+                elif c in '"\'':
+                    self._bare_quote = c
+                elif c in "[{":
+                    self._depth += 1
+                elif c in "]}":
+                    self._depth -= 1
+                    if self._depth == 0:
+                        self._bare_quote = None
+                        self._state = _ARRAY
+                i += 1
+
+        return out
+
+    def close(self) -> list:
+        out = []
+        if self._state == _PENDING:
+            out.extend(self._commit_string())
+        elif self._state == _BARE:
+            out.extend(self._commit_bare())
+        elif self._state in (_STRING, _ESCAPE, _UNICODE):
+            self.truncated = True
+            logger.warning("Saída do LLM truncada: último comando SQL descartado.")
+        elif self._state == _PRE:
+            out.extend(self._quoted_fallback())
+        self._state = _DONE
+        return out
+
+    def _open_string(self, quote: str):
+        self._closers = _CLOSERS[quote]
+        self._buffer = []
+        self._pending = ""
+        self._state = _STRING
+
+    def _finish(self):
+        self.finished = True
+        self._state = _DONE
+
+    def _commit_string(self) -> list:
+        text = "".join(self._buffer)
+        self._buffer = []
+        self._pending = ""
+        if any("\ud800" <= ch <= "\udfff" for ch in text):
+            text = text.encode("utf-16", "surrogatepass").decode("utf-16", "replace")
+        return [text] if text.strip() else []
+
+    def _commit_bare(self) -> list:
+        text = "".join(self._buffer).strip()
+        self._buffer = []
+        if not text or text.lower() == "null":
+            return []
+        if text.endswith(";"):
+            return [text]
+        return [item for item in _split_top_level(text) if item.lower() != "null"]
+
+    def _quoted_fallback(self) -> list:
+        # Sem "[": aproveita apenas as strings entre aspas do texto.
+        fallback = SqlArrayParser(allow_bare=False)
+        text = re.sub(r"```\w*", "", "".join(self._pre))
+        items = fallback.feed("[" + text)
+        return items + fallback.close()
+
+
+def _split_top_level(text: str) -> list:
+    items, current, parens, quote = [], [], 0, None
+    for c in text:
+        if quote:
+            quote = None if c == quote else quote
+        elif c in "'\"`":
+            quote = c
+        elif c == "(":
+            parens += 1
+        elif c == ")":
+            parens -= 1
+        elif c == "," and parens <= 0:
+            items.append("".join(current).strip())
+            current = []
+            continue
+        current.append(c)
+    items.append("".join(current).strip())
+    return [item for item in items if item]
+
+
+def parse_sql_array(text: str) -> list:
+    parser = SqlArrayParser()
+    return parser.feed(text) + parser.close()
+
+
+async def iter_sql_array(chunks):
+    """
+    Consome um stream de texto do LLM e produz cada comando SQL ao fechar.
+    Levanta ValueError ao final se a lista veio truncada, vazia ou se a
+    resposta não tinha lista nenhuma.
+    """
+    parser = SqlArrayParser()
+    count = 0
+    try:
+        async for chunk in chunks:
+            for statement in parser.feed(chunk):
+                count += 1
+                yield statement
+        for statement in parser.close():
+            count += 1
+            yield statement
+        if parser.truncated:
+            raise ValueError("Saída do LLM truncada antes do fim da lista de comandos.")
+        if not count:
+            if parser.started:
+                raise ValueError("Saída do LLM com a lista de comandos vazia.")
+            raise ValueError("Saída do LLM sem lista de comandos SQL.")
+    finally:
+        await chunks.aclose()
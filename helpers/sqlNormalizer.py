@@ -0,0 +1,92 @@
+import re
+import hashlib
+from collections import Counter
+
+_TOKEN_PATTERN = re.compile(
+    r"""
+    (?P<comment>--[^\n]*|/\*.*?\*/)
+    |(?P<string>'(?:[^'\\]|\\.|'')*')
+    |(?P<quoted>"(?:[^"]|"")*"|`[^`]*`|\[[^\]]*\])
+    |(?P<number>\b\d+(?:\.\d+)?(?:[eE][+-]?\d+)?\b)
+    |(?P<word>[^\W\d]\w*)
+    |(?P<space>\s+)
+    |(?P<other>.)
+    """,
+    re.VERBOSE | re.DOTALL,
+)
+
+LITERAL_PLACEHOLDER = "?"
+
+
+def tokenize_sql(query: str):
+    for match in _TOKEN_PATTERN.finditer(query):
+        yield match.lastgroup, match.group()
+
+
+def normalize_sql(query: str, strip_literals: bool = True):
+    """
+    Normaliza uma query SQL ignorando espaços, comentários e caixa.
+    Retorna a forma normalizada e a lista de literais encontrados na ordem.
+    """
+    parts = []
+    literals = []
+    for kind, text in tokenize_sql(query):
+        if kind in ("space", "comment"):
+            continue
+        if kind in ("string", "number"):
+            literals.append(text)
+            parts.append(LITERAL_PLACEHOLDER if strip_literals else text)
+        elif kind == "word":
+            parts.append(text.lower())
+        else:
+            parts.append(text)
+
+    normalized = " ".join(parts)
+    if normalized.endswith(" ;"):
+        normalized = normalized[:-2]
+    return normalized, literals
+
+
+def schema_fingerprint(database_structure: str) -> str:
+    collapsed = " ".join(database_structure.split())
+    return hashlib.sha256(collapsed.encode("utf-8")).hexdigest()
+
+
+def rebind_literals(statements: list, old_literals: list, new_literals: list):
+    """
+    Substitui, nos comandos gerados para uma query, os literais originais
+    pelos literais de uma query com a mesma forma normalizada.
+    Retorna None quando a substituição seria ambígua.
+    """
+    if len(old_literals) != len(new_literals):
+        return None
+
+    mapping = {}
+    for old, new in zip(old_literals, new_literals):
+        if mapping.setdefault(old, new) != new:
+            return None
+
+    changed = {old: new for old, new in mapping.items() if old != new}
+    if not changed:
+        return statements
+
+    expected = Counter(old for old in old_literals if old in changed)
+    found = Counter()
+    rebound = []
+    for statement in statements:
+        if not isinstance(statement, str):
+            rebound.append(statement)
+            continue
+        parts = []
+        for kind, text in tokenize_sql(statement):
+            if kind in ("string", "number") and text in changed:
+                found[text] += 1
+                text = changed[text]
+            parts.append(text)
+        rebound.append("".join(parts))
+
+    # Um literal que aparece mais (ou menos) vezes que na query original pode
+    # ter sido introduzido pelo LLM, então não é seguro substituí-lo.
+    if found != expected:
+        return None
+    return rebound
@@ -0,0 +1,52 @@
+import json
+
+from fastapi import HTTPException, Request
+from fastapi.responses import StreamingResponse
+
+
+def format_sse(data: dict, event: str = None) -> str:
+    message = f"event: {event}\n" if event else ""
+    return message + f"data: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+async def _sse_events(request: Request, events):
+    try:
+        async for event, data in events:
+            if await request.is_disconnected():
+                return
+            yield format_sse(data, event=event)
+        yield format_sse({}, event="done")
+    except HTTPException as e:
+        yield format_sse({"detail": e.detail}, event="error")
+    except Exception as e:
+        yield format_sse({"detail": str(e)}, event="error")
+    finally:
+        await events.aclose()
+
+
+async def _deltas(chunks):
+    try:
+        async for chunk in chunks:
+            yield None, {"delta": chunk}
+    finally:
+        await chunks.aclose()
+
+
+def event_stream_response(request: Request, events) -> StreamingResponse:
+    """
+    Envia pares (evento, dados) como Server-Sent Events.
+    Se o cliente desconectar, o gerador de eventos é fechado.
+    """
+    return StreamingResponse(
+        _sse_events(request, events),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+def sse_response(request: Request, chunks) -> StreamingResponse:
+    """
+    Encaminha os tokens do provedor como Server-Sent Events.
+    Se o cliente desconectar, o stream do provedor é fechado.
+    """
+    return event_stream_response(request, _deltas(chunks))
@@ -1,13 +1,36 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from routes import llmRoutes
 from routes import optimizerRoutes
+from routes import statusRoutes
+from services import generationPool
+from services.cache import optimizer_cache
+from services import httpClient
+from services import llmRouter
+from services import retrieval
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await httpClient.startup()
+    await llmRouter.startup()
+    await retrieval.startup()
+    yield
+    await retrieval.shutdown()
+    await llmRouter.shutdown()
+    await generationPool.shutdown()
+    await optimizer_cache.close()
+    await httpClient.shutdown()
+
 
-app = FastAPI(debug=True)
+app = FastAPI(debug=True, lifespan=lifespan)
 
 app.include_router(llmRoutes.router)
 app.include_router(optimizerRoutes.router)
+app.include_router(statusRoutes.router)
 
 app.add_middleware(
     CORSMiddleware,
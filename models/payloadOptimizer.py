@@ -1,5 +1,7 @@
-from pydantic import BaseModel
-from typing import List, Dict
+import os
+
+from pydantic import BaseModel, Field
+from typing import List, Dict, Literal, Optional
 
 
 class OptimizerRequest(BaseModel):
@@ -9,6 +11,31 @@ class OptimizerRequest(BaseModel):
 
 class OptimizerResponse(BaseModel):
     result: List[str]
+    schema_stats: Optional[Dict] = None
+
+
+class OptimizerBatchRequest(BaseModel):
+    database_structure: str
+    # Cada query única vira uma chamada ao LLM; o teto vem de OPTIMIZER_BATCH_MAX.
+    queries: List[str] = Field(
+        ..., min_length=1, max_length=int(os.getenv("OPTIMIZER_BATCH_MAX", 100))
+    )
+    concurrency: Optional[int] = Field(None, ge=1)
+
+
+class OptimizerBatchItem(BaseModel):
+    index: int
+    query: str
+    result: Optional[List[str]] = None
+    error: Optional[str] = None
+    cache: Optional[str] = None
+    duplicate_of: Optional[int] = None
+
+
+class OptimizerBatchResponse(BaseModel):
+    results: List[OptimizerBatchItem]
+    unique_queries: int
+    errors: int
 
 
 class CreateDatabaseRequest(BaseModel):
@@ -17,15 +44,31 @@ class CreateDatabaseRequest(BaseModel):
 
 class CreateDatabaseResponse(BaseModel):
     sql: List[str]
+    # Tabelas de uma mesma onda podem ser criadas em paralelo; as FKs
+    # adiadas (ciclos) e os demais comandos rodam depois de todas as ondas.
+    waves: Optional[List[List[str]]] = None
+    deferred_foreign_keys: Optional[List[str]] = None
 
 
 class PopulateDatabaseResponse(BaseModel):
     sql: List[str]
 
 
+class ColumnProfile(BaseModel):
+    distribution: Literal["uniform", "zipf", "hot_key"] = "uniform"
+    zipf_s: float = Field(1.1, gt=0)
+    hot_fraction: float = Field(0.01, gt=0, le=1)
+    hot_weight: float = Field(0.8, ge=0, le=1)
+    cardinality: Optional[int] = Field(None, ge=1)
+    null_ratio: float = Field(0.0, ge=0, le=1)
+
+
 class PopulateDatabaseRequest(BaseModel):
     creation_commands: list
     number_insertions: int
+    seed: Optional[int] = None
+    # Perfis por coluna, com chave "tabela.coluna".
+    column_profiles: Optional[Dict[str, ColumnProfile]] = None
 
 
 class OptimizationAnalysisRequest(BaseModel):
@@ -36,17 +79,82 @@ class OptimizationAnalysisRequest(BaseModel):
     applied_indexes: List[str]
 
 
+class VerifyRequest(BaseModel):
+    creation_commands: List[str]
+    original_query: str
+    optimized_query: Optional[str] = None
+    applied_indexes: List[str] = []
+    # Saída de /optimizer/generate: índices e query reescrita são separados.
+    optimization: Optional[List[str]] = None
+    number_insertions: int = Field(1000, ge=1)
+    seed: int = 0
+    column_profiles: Optional[Dict[str, ColumnProfile]] = None
+    repeat: int = Field(5, ge=1, le=50)
+
+
+class VerifyResponse(BaseModel):
+    original_metrics: Dict
+    optimized_metrics: Dict
+    original_query: str
+    optimized_query: str
+    applied_indexes: List[str]
+    failed_indexes: List[Dict]
+    results_match: bool
+    speedup: Optional[float] = None
+    runs: Dict
+    tables: Dict[str, int]
+    load_time_ms: Optional[float] = None
+
+
 class OptimizationAnalysisResponse(BaseModel):
     analysis: str
 
 
 class WeightRequest(BaseModel):
-    ram_gb: int = None
-    priority: str = None
+    ram_gb: Optional[float] = Field(None, gt=0)
+    priority: Optional[str] = None
 
 
 class WeightResponse(BaseModel):
-    result: Dict
+    result: Dict[str, float]
+    priorities: List[str] = []
+
+
+class QueryMetrics(BaseModel):
+    id: Optional[str] = None
+    query: Optional[str] = None
+    execution_time: float = Field(0, ge=0)
+    cpu_usage: float = Field(0, ge=0)
+    io_usage: float = Field(0, ge=0)
+    rows_read: float = Field(0, ge=0)
+    execution_frequency: float = Field(0, ge=0)
+    table_size: float = Field(0, ge=0)
+    tables_without_index: float = Field(0, ge=0)
+    join_collisions: float = Field(0, ge=0)
+
+
+class ScoreRequest(BaseModel):
+    records: List[QueryMetrics] = Field(..., min_length=1)
+    # Pesos explícitos; sem eles, vêm de /optimizer/weights para ram_gb e priority.
+    weights: Optional[Dict[str, float]] = None
+    ram_gb: Optional[float] = Field(None, gt=0)
+    priority: Optional[str] = None
+    normalization: Literal["minmax", "log"] = "minmax"
+    top: Optional[int] = Field(None, ge=1)
+
+
+class QueryScore(BaseModel):
+    rank: int
+    index: int
+    id: Optional[str] = None
+    query: Optional[str] = None
+    score: float
+    main_factor: str
+
+
+class ScoreResponse(BaseModel):
+    weights: Dict[str, float]
+    scores: List[QueryScore]
 
 
 class OrderTablesRequest(BaseModel):
@@ -1,4 +1,5 @@
 from pydantic import BaseModel
+from typing import Dict, Optional
 
 
 class RAGQueryRequest(BaseModel):
@@ -6,4 +7,5 @@ class RAGQueryRequest(BaseModel):
     database_structure: str
 
 class RAGQueryResponse(BaseModel):
-    query: str
\ No newline at end of file
+    query: str
+    schema_stats: Optional[Dict] = None
\ No newline at end of file
@@ -1,2 +1,3 @@
 from .llmRoutes import router as llm_router
-from .optimizerRoutes import router as optimizer_router
\ No newline at end of file
+from .optimizerRoutes import router as optimizer_router
+from .statusRoutes import router as status_router
\ No newline at end of file
@@ -1,29 +1,73 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from loguru import logger
 
-from dependencies import get_api_key
-from services.llm import LLMService
+from dependencies import get_api_key, with_priority
+from helpers.schemaPruner import prune_schema, pruning_enabled
+from helpers.sse import sse_response
+from services.hedging import hedged_call
+from services.llmRouter import get_llm
+from services.retrieval import get_retriever
 from models.payloadRAG import RAGQueryRequest, RAGQueryResponse
 from models.payloadInterpreter import InterpreterQueryRequest, InterpreterQueryResponse
 
-router = APIRouter(prefix="/rag", tags=["Query"], dependencies=[Depends(get_api_key)])
-service = LLMService()
+router = APIRouter(
+    prefix="/rag",
+    tags=["Query"],
+    dependencies=[Depends(get_api_key), Depends(with_priority("interactive"))],
+)
+
+
+async def _select_schema(database_structure: str, order: str):
+    try:
+        retriever = get_retriever()
+        if retriever is not None:
+            return await retriever.retrieve(database_structure, order)
+    except Exception as e:
+        logger.warning(f"Falha na recuperação de contexto no Qdrant: {e}")
+
+    if pruning_enabled():
+        return prune_schema(database_structure, order=order)
+    return database_structure, None
 
 
 @router.post("/query/structure", response_model=RAGQueryResponse)
-async def query_rag(request: RAGQueryRequest):
+async def query_rag(
+    request: RAGQueryRequest,
+    response: Response,
+    prune: bool = Query(True, description="Envia apenas as tabelas citadas no pedido"),
+    hedge: bool = Query(False, description="Dispara um segundo provedor se o primeiro demorar"),
+    model_name: str = Query("default", description="Nome do modelo LLM a usar"),
+):
     try:
-        query = await service.get_sql_query_with_database_structure(
-            database_structure=request.database_structure, order=request.order
-        )
-        return RAGQueryResponse(query=query)
+        llm = get_llm(model_name)
+        database_structure, schema_stats = request.database_structure, None
+        if prune:
+            database_structure, schema_stats = await _select_schema(
+                request.database_structure, request.order
+            )
+
+        async def call(llm):
+            return await llm.get_sql_query_with_database_structure(
+                database_structure=database_structure, order=request.order
+            )
+
+        if hedge:
+            query, model_id = await hedged_call(model_name, call, "sql_query", primary=llm)
+            response.headers["X-LLM-Model"] = model_id
+        else:
+            query = await call(llm)
+        return RAGQueryResponse(query=query, schema_stats=schema_stats)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Erro ao processar RAG: {str(e)}")
 
 
 @router.post("/query/interpreter", response_model=InterpreterQueryResponse)
-async def query_interpreter(request: InterpreterQueryRequest):
+async def query_interpreter(
+    request: InterpreterQueryRequest,
+    model_name: str = Query("default", description="Nome do modelo LLM a usar"),
+):
     try:
-        response = await service.get_result_interpretation(
+        response = await get_llm(model_name).get_result_interpretation(
             result=request.result, order=request.order
         )
         return InterpreterQueryResponse(response=response)
@@ -31,3 +75,16 @@ async def query_interpreter(request: InterpreterQueryRequest):
         raise HTTPException(
             status_code=500, detail=f"Erro ao processar Interpretador: {str(e)}"
         )
+
+
+@router.post("/query/interpreter/stream")
+async def query_interpreter_stream(
+    request: InterpreterQueryRequest,
+    http_request: Request,
+    model_name: str = Query("default", description="Nome do modelo LLM a usar"),
+):
+    llm = get_llm(model_name)
+    return sse_response(
+        http_request,
+        llm.stream_result_interpretation(result=request.result, order=request.order),
+    )
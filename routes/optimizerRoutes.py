@@ -1,12 +1,34 @@
+import os
 import json
 import re
-from fastapi import APIRouter, Depends, HTTPException, Query
-from dependencies import get_api_key
-from helpers.helpers import order_create_tables
-from services.llmRouter import get_llm
+import asyncio
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response
+from dependencies import get_api_key, with_priority
+from helpers.dataGenerator import load_commands
+from helpers.helpers import (
+    iter_population,
+    order_create_tables,
+    parse_create_table,
+    plan_create_tables,
+)
+from helpers.ndjson import ndjson_response
+from helpers.schemaPruner import prune_schema, pruning_enabled
+from helpers.sqlNormalizer import normalize_sql
+from helpers.sqlArrayParser import iter_sql_array
+from helpers.sse import event_stream_response, sse_response
+from services import weightModel
+from services.cache import optimizer_cache
+from services.generationPool import generate_population
+from services.hedging import hedged_call
+from services.llmRouter import get_llm, resolve_model, track_served
+from services.queryScorer import score_queries
+from services.queryVerifier import split_optimization, verify
 from models.payloadOptimizer import (
     OptimizerRequest,
     OptimizerResponse,
+    OptimizerBatchRequest,
+    OptimizerBatchItem,
+    OptimizerBatchResponse,
     CreateDatabaseRequest,
     CreateDatabaseResponse,
     OrderTablesRequest,
@@ -14,6 +36,10 @@ from models.payloadOptimizer import (
     PopulateDatabaseRequest,
     OptimizationAnalysisRequest,
     OptimizationAnalysisResponse,
+    ScoreRequest,
+    ScoreResponse,
+    VerifyRequest,
+    VerifyResponse,
     WeightRequest,
     WeightResponse,
 )
@@ -23,23 +49,206 @@ router = APIRouter(
 )
 
 
+def _prepare(model_name: str, query: str, database_structure: str, prune: bool):
+    schema_stats = None
+    if prune and pruning_enabled():
+        database_structure, schema_stats = prune_schema(database_structure, query=query)
+
+    key, literals = optimizer_cache.key_for(
+        resolve_model(model_name), query, database_structure
+    )
+    return database_structure, schema_stats, key, literals
+
+
+async def _cache_result(model_name, served, query, database_structure, key, result, literals):
+    """
+    Grava no cache sob a chave do modelo que de fato respondeu: se o
+    failover ou o hedge trocou de modelo, a resposta não fica associada
+    ao modelo pedido. Respostas vazias nunca são guardadas.
+    """
+    if not result:
+        return
+    model = served[0] if served else resolve_model(model_name)
+    if model != resolve_model(model_name):
+        key, literals = optimizer_cache.key_for(model, query, database_structure)
+    await optimizer_cache.set(key, result, literals)
+
+
+async def _optimize(
+    model_name: str,
+    query: str,
+    database_structure: str,
+    prune: bool = True,
+    cache_bypass: bool = False,
+    hedge: bool = False,
+):
+    llm = get_llm(model_name)
+    database_structure, schema_stats, key, literals = _prepare(
+        model_name, query, database_structure, prune
+    )
+
+    if cache_bypass:
+        optimizer_cache.bypass()
+        cache_status = "BYPASS"
+    else:
+        cached = await optimizer_cache.get(key, literals)
+        if cached is not None:
+            return cached, schema_stats, "HIT"
+        cache_status = "MISS"
+
+    async def call(llm):
+        return await llm.optimize_generate(
+            query=query,
+            database_structure=database_structure,
+        )
+
+    served = track_served()
+    if hedge:
+        result, _ = await hedged_call(model_name, call, "optimize_generate", primary=llm)
+    else:
+        result = await call(llm)
+    await _cache_result(model_name, served, query, database_structure, key, result, literals)
+    return result, schema_stats, cache_status
+
+
 @router.post("/generate", response_model=OptimizerResponse)
 async def optimize_query(
     request: OptimizerRequest,
+    response: Response,
     model_name: str = Query("default", description="Nome do modelo LLM a usar"),
+    x_cache_bypass: bool = Header(False, description="Ignora o cache de respostas"),
+    prune: bool = Query(True, description="Envia apenas as tabelas usadas pela query"),
+    hedge: bool = Query(False, description="Dispara um segundo provedor se o primeiro demorar"),
 ):
     try:
-        llm = get_llm(model_name)
-        result = await llm.optimize_generate(
-            query=request.query,
-            database_structure=request.database_structure,
+        result, schema_stats, cache_status = await _optimize(
+            model_name,
+            request.query,
+            request.database_structure,
+            prune=prune,
+            cache_bypass=x_cache_bypass,
+            hedge=hedge,
         )
-        return OptimizerResponse(result=result)
+        response.headers["X-Cache"] = cache_status
+        return OptimizerResponse(result=result, schema_stats=schema_stats)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@router.post("/create-database", response_model=CreateDatabaseResponse)
+@router.post("/generate/stream")
+async def optimize_query_stream(
+    request: OptimizerRequest,
+    http_request: Request,
+    model_name: str = Query("default", description="Nome do modelo LLM a usar"),
+    x_cache_bypass: bool = Header(False, description="Ignora o cache de respostas"),
+    prune: bool = Query(True, description="Envia apenas as tabelas usadas pela query"),
+):
+    llm = get_llm(model_name)
+    database_structure, schema_stats, key, literals = _prepare(
+        model_name, request.query, request.database_structure, prune
+    )
+    if x_cache_bypass:
+        optimizer_cache.bypass()
+        cached, cache_status = None, "BYPASS"
+    else:
+        cached = await optimizer_cache.get(key, literals)
+        cache_status = "HIT" if cached is not None else "MISS"
+
+    async def events():
+        if schema_stats is not None:
+            yield "schema", schema_stats
+        if cached is not None:
+            for sql in cached:
+                yield "statement", {"sql": sql}
+            return
+
+        result = []
+        served = track_served()
+        statements = iter_sql_array(
+            llm.stream_optimize_generate(
+                query=request.query, database_structure=database_structure
+            )
+        )
+        try:
+            async for sql in statements:
+                result.append(sql)
+                yield "statement", {"sql": sql}
+        finally:
+            await statements.aclose()
+        await _cache_result(
+            model_name, served, request.query, database_structure, key, result, literals
+        )
+
+    response = event_stream_response(http_request, events())
+    response.headers["X-Cache"] = cache_status
+    return response
+
+
+@router.post(
+    "/generate/batch",
+    response_model=OptimizerBatchResponse,
+    dependencies=[Depends(with_priority("bulk"))],
+)
+async def optimize_batch(
+    request: OptimizerBatchRequest,
+    model_name: str = Query("default", description="Nome do modelo LLM a usar"),
+    x_cache_bypass: bool = Header(False, description="Ignora o cache de respostas"),
+    prune: bool = Query(True, description="Envia apenas as tabelas usadas pela query"),
+):
+    max_concurrency = int(os.getenv("OPTIMIZER_BATCH_MAX_CONCURRENCY", 16))
+    concurrency = request.concurrency or int(os.getenv("OPTIMIZER_BATCH_CONCURRENCY", 4))
+    semaphore = asyncio.Semaphore(max(1, min(concurrency, max_concurrency)))
+
+    first_index = {}
+    for index, query in enumerate(request.queries):
+        first_index.setdefault(normalize_sql(query, strip_literals=False)[0], index)
+    unique = sorted(set(first_index.values()))
+
+    async def run(index: int) -> OptimizerBatchItem:
+        query = request.queries[index]
+        async with semaphore:
+            try:
+                result, _, cache_status = await _optimize(
+                    model_name,
+                    query,
+                    request.database_structure,
+                    prune=prune,
+                    cache_bypass=x_cache_bypass,
+                )
+                return OptimizerBatchItem(
+                    index=index, query=query, result=result, cache=cache_status
+                )
+            except HTTPException as e:
+                return OptimizerBatchItem(index=index, query=query, error=str(e.detail))
+            except Exception as e:
+                return OptimizerBatchItem(index=index, query=query, error=str(e))
+
+    done = dict(zip(unique, await asyncio.gather(*(run(i) for i in unique))))
+
+    results = []
+    for index, query in enumerate(request.queries):
+        first = first_index[normalize_sql(query, strip_literals=False)[0]]
+        if first == index:
+            results.append(done[index])
+        else:
+            results.append(
+                done[first].model_copy(
+                    update={"index": index, "query": query, "duplicate_of": first}
+                )
+            )
+
+    return OptimizerBatchResponse(
+        results=results,
+        unique_queries=len(unique),
+        errors=sum(1 for item in results if item.error is not None),
+    )
+
+
+@router.post(
+    "/create-database",
+    response_model=CreateDatabaseResponse,
+    dependencies=[Depends(with_priority("bulk"))],
+)
 async def create_db(
     request: CreateDatabaseRequest,
     model_name: str = Query("default", description="Nome do modelo LLM a usar"),
@@ -47,21 +256,120 @@ async def create_db(
     try:
         llm = get_llm(model_name)
         sql = await llm.create_database(database_structure=request.database_structure)
-        ordered = order_create_tables(sql)
+        plan = plan_create_tables(sql)
+        ordered = [command for wave in plan["waves"] for command in wave]
 
-        response = CreateDatabaseResponse(sql=ordered)
+        response = CreateDatabaseResponse(
+            sql=ordered + plan["deferred"] + plan["others"],
+            waves=plan["waves"],
+            deferred_foreign_keys=plan["deferred"],
+        )
         return response
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@router.post("/populate")
-async def populate_db(request: PopulateDatabaseRequest, model_name: str = "groq"):
+def _profiles(column_profiles) -> dict:
+    return {key: profile.model_dump() for key, profile in (column_profiles or {}).items()}
+
+
+def _inserted_columns(creation_commands: list, output_format: str) -> dict:
+    inserted_columns = {}
+    if output_format == "csv":
+        for command in creation_commands:
+            table, columns = parse_create_table(command)
+            inserted_columns[table] = [c["name"] for c in columns if not c["auto_inc"]]
+    return inserted_columns
+
+
+def _population_record(
+    table: str, content, output_format: str, inserted_columns: dict, index: int = None
+) -> dict:
+    key = "statements" if output_format in ("insert", "multi_insert") else "content"
+    record = {"table": table}
+    if index is not None:
+        record["chunk"] = index
+    record[key] = content
+    if output_format == "csv" and not index:
+        record["load_commands"] = load_commands(table, inserted_columns[table])
+    return record
+
+
+def _population_records(
+    creation_commands: list,
+    number_insertions: int,
+    chunk_size: int,
+    output_format: str,
+    rows_per_statement: int,
+    seed: int = None,
+    profiles: dict = None,
+):
+    inserted_columns = _inserted_columns(creation_commands, output_format)
+    for table, index, content in iter_population(
+        creation_commands,
+        number_insertions,
+        chunk_size,
+        seed=seed,
+        output_format=output_format,
+        rows_per_statement=rows_per_statement,
+        profiles=profiles,
+    ):
+        yield _population_record(table, content, output_format, inserted_columns, index)
+
+
+@router.post(
+    "/populate",
+    dependencies=[Depends(with_priority("bulk"))],
+)
+async def populate_db(
+    request: PopulateDatabaseRequest,
+    model_name: str = "groq",
+    stream: bool = Query(False, description="Envia os dados em NDJSON, bloco a bloco"),
+    chunk_size: int = Query(10000, ge=1, description="Linhas por bloco no modo stream"),
+    output_format: str = Query(
+        "insert",
+        alias="format",
+        pattern="^(insert|multi_insert|csv|copy)$",
+        description="insert, multi_insert (várias linhas por INSERT), csv ou copy",
+    ),
+    rows_per_statement: int = Query(1000, ge=1, description="Linhas por INSERT em multi_insert"),
+):
     try:
-        ordered = order_create_tables(request.creation_commands)
+        ordered = order_create_tables(request.creation_commands, keep_foreign_keys=True)
+        profiles = _profiles(request.column_profiles)
+        if stream:
+            return ndjson_response(
+                _population_records(
+                    ordered,
+                    request.number_insertions,
+                    chunk_size,
+                    output_format,
+                    rows_per_statement,
+                    request.seed,
+                    profiles,
+                )
+            )
+        if output_format != "insert":
+            tables = await generate_population(
+                ordered,
+                request.number_insertions,
+                request.seed,
+                chunk_size,
+                output_format,
+                rows_per_statement,
+                profiles,
+            )
+            inserted_columns = _inserted_columns(ordered, output_format)
+            return [
+                _population_record(table, content, output_format, inserted_columns)
+                for table, content in tables
+            ]
+
         sql_raw = await get_llm(model_name).populate_database(
             creation_commands=ordered,
             number_insertions=request.number_insertions,
+            seed=request.seed,
+            profiles=profiles,
         )
 
         cleaned = re.sub(r"```(?:json)?", "", sql_raw).strip("`\n ")
@@ -76,8 +384,65 @@ async def populate_db(request: PopulateDatabaseRequest, model_name: str = "groq"
 @router.post("/order-tables")
 async def order_tables_endpoint(request: OrderTablesRequest):
     try:
-        ordered = order_create_tables(request.creation_commands)
-        return {"ordered_tables": ordered}
+        plan = plan_create_tables(request.creation_commands)
+        return {
+            "ordered_tables": [command for wave in plan["waves"] for command in wave],
+            "waves": plan["waves"],
+            "deferred_foreign_keys": plan["deferred"],
+            "other_statements": plan["others"],
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/verify", response_model=VerifyResponse)
+async def verify_optimization(request: VerifyRequest):
+    """
+    Mede a otimização em um SQLite em memória com os dados de /populate.
+    A resposta pode ser enviada direto para /optimizer/analyze.
+    """
+    try:
+        indexes, optimized_query = list(request.applied_indexes), request.optimized_query
+        if request.optimization:
+            suggested, rewritten = split_optimization(request.optimization)
+            indexes += suggested
+            optimized_query = optimized_query or rewritten
+        result = await asyncio.to_thread(
+            verify,
+            request.creation_commands,
+            request.original_query,
+            optimized_query,
+            indexes,
+            request.number_insertions,
+            request.seed,
+            _profiles(request.column_profiles),
+            request.repeat,
+        )
+        return VerifyResponse(**result)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/score", response_model=ScoreResponse)
+async def score(request: ScoreRequest):
+    """
+    Score de custo de um lote de métricas de queries com os pesos de
+    /optimizer/weights (ou os informados), do mais caro para o mais barato.
+    """
+    try:
+        if request.weights is not None:
+            weights = weightModel.normalize_weights(request.weights)
+        else:
+            weights = weightModel.get_weights(ram_gb=request.ram_gb, priority=request.priority)
+        records = [record.model_dump() for record in request.records]
+        scores = await asyncio.to_thread(
+            score_queries, records, weights, request.normalization, request.top
+        )
+        return ScoreResponse(weights=weights, scores=scores)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -89,7 +454,7 @@ async def analyze(
 ):
     try:
         llm = get_llm(model_name)
-        result = llm.analyze_optimization_effects(
+        result = await llm.analyze_optimization_effects(
             original_metrics=request.original_metrics,
             optimized_metrics=request.optimized_metrics,
             original_query=request.original_query,
@@ -101,20 +466,37 @@ async def analyze(
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@router.post("/weights")
-async def weights(
-    request: WeightRequest,
+@router.post("/analyze/stream")
+async def analyze_stream(
+    request: OptimizationAnalysisRequest,
+    http_request: Request,
     model_name: str = Query("default", description="Nome do modelo LLM a usar"),
 ):
-    try:
-        llm = get_llm(model_name)
-
-        result = await llm.get_weights(ram_gb=request.ram_gb, priority=request.priority)
-
-        cleaned = re.sub(r"```(?:json)?", "", result).strip("`")
+    llm = get_llm(model_name)
+    return sse_response(
+        http_request,
+        llm.stream_optimization_analysis(
+            original_metrics=request.original_metrics,
+            optimized_metrics=request.optimized_metrics,
+            original_query=request.original_query,
+            optimized_query=request.optimized_query,
+            applied_indexes=request.applied_indexes,
+        ),
+    )
 
-        cleaned_json = json.loads(cleaned)
 
-        return WeightResponse(result=cleaned_json)
+@router.post("/weights", response_model=WeightResponse)
+async def weights(request: WeightRequest):
+    """
+    Pesos do score de custo a partir da tabela local de services.weightModel
+    (faixas de RAM x prioridade). O LLM só é usado offline, em seed_table.
+    """
+    try:
+        result = weightModel.get_weights(ram_gb=request.ram_gb, priority=request.priority)
+        return WeightResponse(
+            result=result, priorities=list(weightModel.match_priorities(request.priority))
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -0,0 +1,40 @@
+from fastapi import APIRouter, Depends
+
+from dependencies import get_api_key
+from services import metrics, scheduler, weightModel
+from helpers.ddlParser import cache_info as ddl_cache_info
+from services.cache import optimizer_cache
+from services.httpClient import pool_stats
+from services.llmRouter import failover_enabled, health
+from services.retry import retry_budget
+
+router = APIRouter(prefix="/status", tags=["Status"], dependencies=[Depends(get_api_key)])
+
+
+@router.get("/http-pool")
+async def http_pool_status():
+    return pool_stats()
+
+
+@router.get("/cache")
+async def cache_status():
+    return {
+        **optimizer_cache.snapshot(),
+        "ddl_parser": ddl_cache_info(),
+        "weights": weightModel.cache_info(),
+    }
+
+
+@router.get("/metrics")
+async def metrics_status():
+    return {**metrics.snapshot(), "retry_budget": retry_budget.available}
+
+
+@router.get("/llm")
+async def llm_status():
+    return {"failover": failover_enabled(), "models": health()}
+
+
+@router.get("/scheduler")
+async def scheduler_status():
+    return scheduler.snapshot()
@@ -0,0 +1,277 @@
+import os
+import json
+import time
+import asyncio
+import hashlib
+import sqlite3
+import functools
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+from dotenv import load_dotenv
+from loguru import logger
+
+from helpers.sqlNormalizer import normalize_sql, rebind_literals, schema_fingerprint
+
+load_dotenv()
+
+
+class ResponseCache:
+    """
+    Cache de respostas em dois níveis: LRU em memória e, opcionalmente,
+    um arquivo SQLite compartilhado entre processos e reinicializações.
+    O nível em disco roda em uma única thread própria, fora do event loop.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        ttl: float = 86400,
+        disk_path: Optional[str] = None,
+        disk_max_bytes: int = 64 * 1024 * 1024,
+        touch_batch: int = 64,
+    ):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.disk_path = disk_path
+        self.disk_max_bytes = disk_max_bytes
+        self.touch_batch = touch_batch
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._disk = None
+        self._disk_executor = None
+        # Estado abaixo só é usado pela thread do disco.
+        self._touched = {}
+        self._disk_bytes = 0
+        self._disk_entries = 0
+        self.stats = {
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "bypasses": 0,
+            "stores": 0,
+            "evictions": 0,
+            "rebinds": 0,
+        }
+        if disk_path:
+            self._open_disk()
+
+    def _open_disk(self):
+        try:
+            self._disk = sqlite3.connect(self.disk_path, check_same_thread=False)
+            self._disk.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+                "created_at REAL NOT NULL, accessed_at REAL NOT NULL, "
+                "size INTEGER NOT NULL)"
+            )
+            self._disk.execute(
+                "CREATE INDEX IF NOT EXISTS entries_accessed_at ON entries (accessed_at)"
+            )
+            self._disk.commit()
+            self._count_disk()
+        except sqlite3.Error as e:
+            logger.warning(f"Cache em disco desativado ({self.disk_path}): {e}")
+            self._disk = None
+            return
+        self._disk_executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="response-cache"
+        )
+
+    @staticmethod
+    def key_for(model: str, query: str, database_structure: str):
+        normalized, literals = normalize_sql(query)
+        raw = f"{model}\x00{normalized}\x00{schema_fingerprint(database_structure)}"
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest(), literals
+
+    def _expired(self, created_at: float) -> bool:
+        return self.ttl > 0 and time.time() - created_at > self.ttl
+
+    def _memory_get(self, key: str):
+        entry = self._memory.get(key)
+        if entry is None:
+            return None
+        if self._expired(entry[0]):
+            del self._memory[key]
+            return None
+        self._memory.move_to_end(key)
+        return entry[1]
+
+    def _memory_set(self, key: str, value: dict, created_at: float):
+        self._memory[key] = (created_at, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+            self.stats["evictions"] += 1
+
+    async def _on_disk(self, function, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._disk_executor, functools.partial(function, *args)
+        )
+
+    def _count_disk(self):
+        self._disk_bytes, self._disk_entries = self._disk.execute(
+            "SELECT COALESCE(SUM(size), 0), COUNT(*) FROM entries"
+        ).fetchone()
+
+    def _disk_get(self, key: str):
+        row = self._disk.execute(
+            "SELECT value, created_at, size FROM entries WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        if self._expired(row[1]):
+            self._disk.execute("DELETE FROM entries WHERE key = ?", (key,))
+            self._disk.commit()
+            self._touched.pop(key, None)
+            self._disk_bytes -= row[2]
+            self._disk_entries -= 1
+            return None
+        # accessed_at só serve para a evicção: as leituras acumulam os
+        # acessos e gravam em lote, sem um commit por hit.
+        self._touched[key] = time.time()
+        if len(self._touched) >= self.touch_batch:
+            self._flush_touches()
+            self._disk.commit()
+        return json.loads(row[0]), row[1]
+
+    def _flush_touches(self):
+        if self._touched:
+            self._disk.executemany(
+                "UPDATE entries SET accessed_at = ? WHERE key = ?",
+                [(accessed_at, key) for key, accessed_at in self._touched.items()],
+            )
+            self._touched.clear()
+
+    def _disk_set(self, key: str, value: dict, created_at: float):
+        payload = json.dumps(value, ensure_ascii=False)
+        previous = self._disk.execute(
+            "SELECT size FROM entries WHERE key = ?", (key,)
+        ).fetchone()
+        self._disk.execute(
+            "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?)",
+            (key, payload, created_at, created_at, len(payload)),
+        )
+        self._touched.pop(key, None)
+        self._disk_bytes += len(payload) - (previous[0] if previous else 0)
+        self._disk_entries += 0 if previous else 1
+        if self._disk_bytes > self.disk_max_bytes:
+            self._evict_disk()
+        self._disk.commit()
+
+    def _evict_disk(self):
+        """
+        Chamado só quando uma gravação passa de disk_max_bytes: remove os
+        expirados e, se preciso, os menos acessados até 90% do limite, para
+        que as gravações seguintes não voltem a disparar a evicção.
+        """
+        self._flush_touches()
+        if self.ttl > 0:
+            self._disk.execute(
+                "DELETE FROM entries WHERE created_at < ?", (time.time() - self.ttl,)
+            )
+            self._count_disk()
+        target = self.disk_max_bytes * 0.9
+        if self._disk_bytes <= target:
+            return
+
+        victims, freed = [], 0
+        for key, size in self._disk.execute(
+            "SELECT key, size FROM entries ORDER BY accessed_at"
+        ):
+            if self._disk_bytes - freed <= target:
+                break
+            victims.append((key,))
+            freed += size
+        self._disk.executemany("DELETE FROM entries WHERE key = ?", victims)
+        self._disk_bytes -= freed
+        self._disk_entries -= len(victims)
+        with self._lock:
+            self.stats["evictions"] += len(victims)
+
+    async def get(self, key: str, literals: list):
+        with self._lock:
+            entry = self._memory_get(key)
+        tier = "memory_hits"
+        if entry is None and self._disk is not None:
+            try:
+                disk_entry = await self._on_disk(self._disk_get, key)
+            except sqlite3.Error as e:
+                logger.warning(f"Falha ao ler o cache em disco: {e}")
+                disk_entry = None
+            if disk_entry is not None:
+                entry, created_at = disk_entry
+                with self._lock:
+                    self._memory_set(key, entry, created_at)
+                tier = "disk_hits"
+
+        result, rebound = None, False
+        if entry is not None:
+            result = entry["result"]
+            if entry["literals"] != literals:
+                result = rebind_literals(result, entry["literals"], literals)
+                rebound = True
+
+        with self._lock:
+            # Entradas vazias (gravadas antes de process_llm_output rejeitá-las) contam como miss.
+            if not result:
+                self.stats["misses"] += 1
+                return None
+            if rebound:
+                self.stats["rebinds"] += 1
+            self.stats[tier] += 1
+            return result
+
+    async def set(self, key: str, result, literals: list):
+        value = {"result": result, "literals": literals}
+        created_at = time.time()
+        with self._lock:
+            self._memory_set(key, value, created_at)
+            self.stats["stores"] += 1
+        if self._disk is not None:
+            try:
+                await self._on_disk(self._disk_set, key, value, created_at)
+            except sqlite3.Error as e:
+                logger.warning(f"Falha ao gravar no cache em disco: {e}")
+
+    def bypass(self):
+        with self._lock:
+            self.stats["bypasses"] += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                **self.stats,
+                "memory_entries": len(self._memory),
+                "disk_entries": self._disk_entries,
+                "disk_bytes": self._disk_bytes,
+                "disk_enabled": self._disk is not None,
+            }
+
+    def _close_disk(self):
+        self._flush_touches()
+        self._disk.commit()
+        self._disk.close()
+
+    async def close(self):
+        """Grava os acessos pendentes e fecha o arquivo do nível em disco."""
+        if self._disk is None:
+            return
+        try:
+            await self._on_disk(self._close_disk)
+        except sqlite3.Error as e:
+            logger.warning(f"Falha ao fechar o cache em disco: {e}")
+        self._disk_executor.shutdown(wait=True)
+        self._disk = None
+
+
+optimizer_cache = ResponseCache(
+    max_entries=int(os.getenv("OPTIMIZER_CACHE_SIZE", 1024)),
+    ttl=float(os.getenv("OPTIMIZER_CACHE_TTL", 86400)),
+    disk_path=os.getenv("OPTIMIZER_CACHE_PATH"),
+    disk_max_bytes=int(os.getenv("OPTIMIZER_CACHE_DISK_MAX_BYTES", 64 * 1024 * 1024)),
+    touch_batch=int(os.getenv("OPTIMIZER_CACHE_TOUCH_BATCH", 64)),
+)
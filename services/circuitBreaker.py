@@ -0,0 +1,152 @@
+import os
+import time
+import threading
+from collections import deque
+
+from dotenv import load_dotenv
+from loguru import logger
+
+from services import metrics
+
+load_dotenv()
+
+
+class CircuitOpenError(Exception):
+    def __init__(self, name: str, retry_in: float):
+        super().__init__(
+            f"Circuito aberto para '{name}'; nova tentativa em {retry_in:.1f}s"
+        )
+        self.name = name
+        self.retry_in = retry_in
+
+
+class CircuitBreaker:
+    """
+    Acompanha as últimas chamadas a um modelo. Abre quando a taxa de falhas
+    (erros ou chamadas lentas) passa do limite, recusa chamadas durante
+    open_seconds e depois libera algumas sondas (meio-aberto) antes de fechar.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        failure_rate: float = 0.5,
+        min_calls: int = 5,
+        window: int = 20,
+        slow_call_seconds: float = 20.0,
+        open_seconds: float = 30.0,
+        half_open_probes: int = 1,
+    ):
+        self.name = name
+        self.failure_rate = failure_rate
+        self.min_calls = min_calls
+        self.slow_call_seconds = slow_call_seconds
+        self.open_seconds = open_seconds
+        self.half_open_probes = half_open_probes
+        self.state = "closed"
+        self._outcomes = deque(maxlen=window)
+        self._latencies = deque(maxlen=window)
+        self._opened_at = 0.0
+        self._probes = 0
+        self._lock = threading.Lock()
+
+    def _transition(self, state: str):
+        if state == self.state:
+            return
+        logger.warning(f"Circuito '{self.name}': {self.state} -> {state}")
+        metrics.increment(f"llm.breaker.{self.name}.{state}")
+        self.state = state
+        if state == "open":
+            self._opened_at = time.monotonic()
+        elif state == "half_open":
+            self._probes = 0
+        elif state == "closed":
+            self._outcomes.clear()
+
+    def _retry_in(self) -> float:
+        return max(0.0, self._opened_at + self.open_seconds - time.monotonic())
+
+    def available(self) -> bool:
+        """Indica se o modelo aceitaria uma chamada agora, sem consumir sonda."""
+        with self._lock:
+            if self.state == "open":
+                return self._retry_in() == 0
+            if self.state == "half_open":
+                return self._probes < self.half_open_probes
+            return True
+
+    def acquire(self):
+        with self._lock:
+            if self.state == "open":
+                if self._retry_in() > 0:
+                    raise CircuitOpenError(self.name, self._retry_in())
+                self._transition("half_open")
+            if self.state == "half_open":
+                if self._probes >= self.half_open_probes:
+                    raise CircuitOpenError(self.name, 0.0)
+                self._probes += 1
+
+    def release(self):
+        """Devolve uma sonda de chamada cancelada sem resultado."""
+        with self._lock:
+            if self.state == "half_open":
+                self._probes = max(0, self._probes - 1)
+
+    def record(self, success: bool, latency: float = None):
+        with self._lock:
+            if latency is not None:
+                self._latencies.append(latency)
+                if latency > self.slow_call_seconds:
+                    success = False
+
+            if self.state == "half_open":
+                self._probes = max(0, self._probes - 1)
+                self._transition("closed" if success else "open")
+                return
+
+            self._outcomes.append(success)
+            failures = self._outcomes.count(False)
+            if (
+                self.state == "closed"
+                and len(self._outcomes) >= self.min_calls
+                and failures / len(self._outcomes) >= self.failure_rate
+            ):
+                self._transition("open")
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            calls = len(self._outcomes)
+            latencies = sorted(self._latencies)
+            return {
+                "state": self.state,
+                "calls": calls,
+                "failure_rate": (self._outcomes.count(False) / calls) if calls else 0.0,
+                "p95_latency": latencies[int(0.95 * (len(latencies) - 1))] if latencies else None,
+                "retry_in": self._retry_in() if self.state == "open" else 0.0,
+            }
+
+
+_breakers: dict = {}
+_breakers_lock = threading.Lock()
+
+
+def get_breaker(name: str) -> CircuitBreaker:
+    with _breakers_lock:
+        breaker = _breakers.get(name)
+        if breaker is None:
+            breaker = _breakers[name] = CircuitBreaker(
+                name,
+                failure_rate=float(os.getenv("LLM_BREAKER_FAILURE_RATE", 0.5)),
+                min_calls=int(os.getenv("LLM_BREAKER_MIN_CALLS", 5)),
+                window=int(os.getenv("LLM_BREAKER_WINDOW", 20)),
+                slow_call_seconds=float(os.getenv("LLM_BREAKER_SLOW_CALL_SECONDS", 20)),
+                open_seconds=float(os.getenv("LLM_BREAKER_OPEN_SECONDS", 30)),
+                half_open_probes=int(os.getenv("LLM_BREAKER_HALF_OPEN_PROBES", 1)),
+            )
+        return breaker
+
+
+def snapshot() -> dict:
+    with _breakers_lock:
+        breakers = dict(_breakers)
+    return {name: breaker.snapshot() for name, breaker in breakers.items()}
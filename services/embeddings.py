@@ -0,0 +1,63 @@
+import os
+import re
+import zlib
+import unicodedata
+
+import numpy as np
+
+
+def _tokens(text: str):
+    normalized = unicodedata.normalize("NFKD", text.lower())
+    normalized = "".join(c for c in normalized if not unicodedata.combining(c))
+    for word in re.findall(r"\w+", normalized):
+        yield word, 1.0
+        parts = [p for p in word.split("_") if p]
+        if len(parts) > 1:
+            for part in parts:
+                yield part, 1.0
+        padded = f"#{word}#"
+        for i in range(len(padded) - 2):
+            yield padded[i : i + 3], 0.3
+
+
+class HashingEmbedder:
+    """
+    Embedding local em CPU por feature hashing de palavras e trigramas.
+    Não depende de modelo baixado e é determinístico entre processos.
+    """
+
+    def __init__(self, dim: int = 512):
+        self.dim = dim
+        self.name = f"hashing{dim}"
+
+    def embed(self, texts: list) -> np.ndarray:
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for token, weight in _tokens(text):
+                h = zlib.crc32(token.encode("utf-8"))
+                sign = 1.0 if h & 0x80000000 else -1.0
+                vectors[row, h % self.dim] += sign * weight
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return vectors / norms
+
+
+class SentenceTransformerEmbedder:
+    def __init__(self, model_name: str):
+        from sentence_transformers import SentenceTransformer
+
+        self.model = SentenceTransformer(model_name, device="cpu")
+        self.dim = self.model.get_sentence_embedding_dimension()
+        self.name = re.sub(r"\W+", "_", model_name)
+
+    def embed(self, texts: list) -> np.ndarray:
+        return self.model.encode(
+            texts, normalize_embeddings=True, convert_to_numpy=True
+        ).astype(np.float32)
+
+
+def get_embedder():
+    model_name = os.getenv("EMBEDDING_MODEL")
+    if model_name:
+        return SentenceTransformerEmbedder(model_name)
+    return HashingEmbedder(int(os.getenv("EMBEDDING_DIM", 512)))
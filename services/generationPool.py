@@ -0,0 +1,121 @@
+import os
+import time
+import asyncio
+import functools
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+from dotenv import load_dotenv
+from loguru import logger
+
+from helpers.helpers import generate_table_content, schema_keys
+from services import metrics
+
+load_dotenv()
+
+_executor: Optional[ProcessPoolExecutor] = None
+
+
+def _workers() -> int:
+    return int(os.getenv("GENERATION_WORKERS", os.cpu_count() or 1))
+
+
+def _min_rows() -> int:
+    # Abaixo disso subir o pool (~0,3 s por processo com spawn) custa mais
+    # do que gerar tudo numa thread com 2 a 8 CPUs; ver
+    # benchmarks/bench_generation_pool.py.
+    return int(os.getenv("GENERATION_POOL_MIN_ROWS", 200000))
+
+
+def _parallelism(tables: int) -> int:
+    """Tabelas que rodam de fato ao mesmo tempo: limitado por processos e CPUs."""
+    return min(_workers(), tables, os.cpu_count() or 1)
+
+
+def get_executor() -> ProcessPoolExecutor:
+    """
+    Pool de processos para a geração de dados. Usa spawn para não herdar
+    o estado do event loop nem os clientes HTTP do processo principal.
+    """
+    global _executor
+    if _executor is None:
+        workers = _workers()
+        _executor = ProcessPoolExecutor(
+            max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+        )
+        logger.info(f"Pool de geração de dados criado ({workers} processos).")
+    return _executor
+
+
+def _generate_serial(creation_commands: list, number_insertions: int, **options) -> list:
+    return [
+        generate_table_content(command, number_insertions, position=position, **options)
+        for position, command in enumerate(creation_commands)
+    ]
+
+
+async def _generate_pool(creation_commands: list, number_insertions: int, **options) -> list:
+    loop = asyncio.get_running_loop()
+    executor = get_executor()
+    return await asyncio.gather(
+        *(
+            loop.run_in_executor(
+                executor,
+                functools.partial(
+                    generate_table_content,
+                    command,
+                    number_insertions,
+                    position=position,
+                    **options,
+                ),
+            )
+            for position, command in enumerate(creation_commands)
+        )
+    )
+
+
+async def generate_population(
+    creation_commands: list,
+    number_insertions: int,
+    seed=None,
+    chunk_size: int = 10000,
+    output_format: str = "insert",
+    rows_per_statement: int = 1000,
+    profiles: dict = None,
+) -> list:
+    """
+    Gera todas as tabelas fora do event loop e retorna [(tabela, conteúdo)]
+    na ordem de creation_commands. Cada tabela usa a semente [seed, posição],
+    então o resultado não depende do número de processos; as FKs sorteiam
+    entre as chaves do pai (schema_keys) com os perfis de coluna pedidos.
+    Volumes abaixo de GENERATION_POOL_MIN_ROWS linhas, ou sem ao menos duas
+    CPUs para gerar tabelas em paralelo, rodam em uma thread, sem o custo de subir
+    o pool e enviar o trabalho a outro processo.
+    """
+    options = {
+        "seed": seed,
+        "chunk_size": chunk_size,
+        "output_format": output_format,
+        "rows_per_statement": rows_per_statement,
+        "profiles": profiles,
+        "keys": schema_keys(creation_commands),
+    }
+    started = time.monotonic()
+    total = len(creation_commands) * number_insertions
+    if _parallelism(len(creation_commands)) < 2 or total < _min_rows():
+        tables = await asyncio.to_thread(
+            _generate_serial, creation_commands, number_insertions, **options
+        )
+    else:
+        tables = await _generate_pool(creation_commands, number_insertions, **options)
+    metrics.observe("populate.generation", time.monotonic() - started)
+    return list(tables)
+
+
+async def shutdown():
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+        logger.info("Pool de geração de dados encerrado.")
@@ -1,4 +1,4 @@
-from groq import Groq
+from groq import AsyncGroq
 from dotenv import load_dotenv
 import os
 
@@ -9,12 +9,13 @@ load_dotenv()
 api_key = os.getenv("GROQ_API_KEY")
 
 
-def llm_connect():
+def async_llm_connect():
     try:
-        client = Groq(api_key=api_key)
+        # As novas tentativas ficam a cargo de services.retry.
+        client = AsyncGroq(api_key=api_key, max_retries=0)
         if client:
-            logger.info("Conexão com o Groq estabelecida com sucesso.")
+            logger.info("Conexão assíncrona com o Groq estabelecida com sucesso.")
         return client
     except Exception as e:
-        print(f"Erro ao conectar ao banco de dados: {e}")
+        logger.error(f"Erro ao criar o cliente assíncrono do Groq: {e}")
         raise e
@@ -0,0 +1,95 @@
+import os
+import asyncio
+
+from loguru import logger
+
+from services import metrics
+from services.llmRouter import get_llm, model_id, provider_names, resolve_model
+
+
+def hedge_partner(model: str):
+    """
+    Modelo usado como segunda tentativa: LLM_HEDGE_MODEL, ou o primeiro
+    provedor registrado diferente do principal.
+    """
+    primary = resolve_model(model)
+    partner = os.getenv("LLM_HEDGE_MODEL")
+    if partner and resolve_model(partner) != primary:
+        return resolve_model(partner)
+    for name in provider_names():
+        if name != primary:
+            return name
+    return None
+
+
+def hedge_delay(llm, operation: str) -> float:
+    """
+    Espera antes de disparar o segundo provedor: o percentil
+    LLM_HEDGE_PERCENTILE da latência observada do modelo principal,
+    ou LLM_HEDGE_DELAY enquanto não houver amostras suficientes.
+    """
+    name = f"llm.latency.{model_id(llm)}.{operation}"
+    fallback = float(os.getenv("LLM_HEDGE_DELAY", 2.0))
+    min_samples = int(os.getenv("LLM_HEDGE_MIN_SAMPLES", 20))
+    if metrics.sample_count(name) < min_samples:
+        return fallback
+    observed = metrics.percentile(name, float(os.getenv("LLM_HEDGE_PERCENTILE", 95)))
+    return max(float(os.getenv("LLM_HEDGE_MIN_DELAY", 0.2)), observed)
+
+
+async def hedged(primary, secondary, call, operation: str):
+    """
+    Executa call(primary) e, se não houver resposta dentro de hedge_delay,
+    dispara call(secondary). Retorna (resultado, modelo vencedor) da primeira
+    resposta válida e cancela a outra. Se ambas falharem, propaga o erro
+    do modelo principal.
+    """
+    delay = hedge_delay(primary, operation)
+    tasks = {asyncio.create_task(call(primary)): primary}
+    errors = {}
+    hedge_fired = secondary is None
+
+    try:
+        while tasks:
+            timeout = None if hedge_fired else delay
+            done, _ = await asyncio.wait(
+                tasks, timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+            )
+
+            if not done or (not hedge_fired and not _any_succeeded(done)):
+                if not hedge_fired:
+                    hedge_fired = True
+                    metrics.increment(f"llm.hedge.fired.{operation}")
+                    logger.info(
+                        f"{operation}: {model_id(primary)} sem resposta em {delay:.2f}s; "
+                        f"disparando {model_id(secondary)}"
+                    )
+                    tasks[asyncio.create_task(call(secondary))] = secondary
+
+            for task in done:
+                llm = tasks.pop(task)
+                if task.exception() is None and task.result():
+                    role = "primary" if llm is primary else "secondary"
+                    metrics.increment(f"llm.hedge.won.{operation}.{role}")
+                    return task.result(), model_id(llm)
+                errors[llm] = task.exception() or ValueError("Resposta vazia do LLM")
+    finally:
+        for task in tasks:
+            task.cancel()
+
+    raise errors.get(primary) or next(iter(errors.values()))
+
+
+def _any_succeeded(done) -> bool:
+    return any(task.exception() is None and task.result() for task in done)
+
+
+async def hedged_call(model: str, call, operation: str, primary=None):
+    """
+    Atalho para os endpoints: resolve o parceiro de hedge a partir de
+    get_llm e retorna (resultado, modelo vencedor).
+    """
+    primary = primary or get_llm(model)
+    partner = hedge_partner(model)
+    secondary = get_llm(partner) if partner else None
+    return await hedged(primary, secondary, call, operation)
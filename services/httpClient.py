@@ -0,0 +1,107 @@
+import os
+import importlib.util
+from typing import Optional
+
+import httpx
+from dotenv import load_dotenv
+from loguru import logger
+
+load_dotenv()
+
+_client: Optional[httpx.AsyncClient] = None
+_requests_total = 0
+
+
+def _env_float(name: str, default: float) -> float:
+    return float(os.getenv(name, default))
+
+
+def _limits() -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=int(os.getenv("HTTP_MAX_CONNECTIONS", 100)),
+        max_keepalive_connections=int(os.getenv("HTTP_MAX_KEEPALIVE_CONNECTIONS", 20)),
+        keepalive_expiry=_env_float("HTTP_KEEPALIVE_EXPIRY", 30.0),
+    )
+
+
+def _timeout() -> httpx.Timeout:
+    return httpx.Timeout(
+        connect=_env_float("HTTP_CONNECT_TIMEOUT", 5.0),
+        read=_env_float("HTTP_READ_TIMEOUT", 60.0),
+        write=_env_float("HTTP_WRITE_TIMEOUT", 10.0),
+        pool=_env_float("HTTP_POOL_TIMEOUT", 5.0),
+    )
+
+
+def _http2_enabled() -> bool:
+    if os.getenv("HTTP_HTTP2", "true").lower() not in ("1", "true", "yes"):
+        return False
+    return importlib.util.find_spec("h2") is not None
+
+
+async def _count_request(request: httpx.Request):
+    global _requests_total
+    _requests_total += 1
+
+
+def _build_client() -> httpx.AsyncClient:
+    http2 = _http2_enabled()
+    client = httpx.AsyncClient(
+        http2=http2,
+        limits=_limits(),
+        timeout=_timeout(),
+        event_hooks={"request": [_count_request]},
+    )
+    logger.info(f"Cliente HTTP compartilhado criado (http2={http2}).")
+    return client
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """
+    Retorna o cliente HTTP assíncrono compartilhado pela aplicação.
+    Normalmente criado no lifespan; criado sob demanda caso contrário.
+    """
+    global _client
+    if _client is None or _client.is_closed:
+        _client = _build_client()
+    return _client
+
+
+async def startup():
+    get_http_client()
+
+
+async def shutdown():
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+        logger.info("Cliente HTTP compartilhado encerrado.")
+
+
+def pool_stats() -> dict:
+    limits = _limits()
+    stats = {
+        "open": _client is not None and not _client.is_closed,
+        "http2": _http2_enabled(),
+        "requests_total": _requests_total,
+        "max_connections": limits.max_connections,
+        "max_keepalive_connections": limits.max_keepalive_connections,
+        "keepalive_expiry": limits.keepalive_expiry,
+        "connections": 0,
+        "active": 0,
+        "idle": 0,
+        "queued_requests": 0,
+    }
+    if not stats["open"]:
+        return stats
+
+    pool = getattr(getattr(_client, "_transport", None), "_pool", None)
+    connections = list(getattr(pool, "connections", []))
+    stats["connections"] = len(connections)
+    stats["idle"] = sum(1 for conn in connections if conn.is_idle())
+    stats["active"] = stats["connections"] - stats["idle"]
+    stats["queued_requests"] = sum(
+        1 for request in getattr(pool, "_requests", []) if request.is_queued()
+    )
+    return stats
@@ -1,7 +1,14 @@
 from abc import ABC, abstractmethod
+from typing import AsyncIterator
 
 
 class BaseLLMService(ABC):
+    async def warmup(self):
+        pass
+
+    async def close(self):
+        pass
+
     @abstractmethod
     async def get_sql_query_with_database_structure(
         self, database_structure: str, order: str
@@ -12,22 +19,36 @@ class BaseLLMService(ABC):
     async def get_result_interpretation(self, result: str, order: str) -> str:
         pass
 
+    @abstractmethod
+    def stream_result_interpretation(self, result: str, order: str) -> AsyncIterator[str]:
+        pass
+
     @abstractmethod
     async def optimize_generate(self, query: str, database_structure: str) -> str:
         pass
 
+    @abstractmethod
+    def stream_optimize_generate(
+        self, query: str, database_structure: str
+    ) -> AsyncIterator[str]:
+        pass
+
     @abstractmethod
     async def create_database(self, database_structure: str) -> str:
         pass
 
     @abstractmethod
     async def populate_database(
-        self, creation_command: str, number_insertions: int
+        self,
+        creation_command: str,
+        number_insertions: int,
+        seed: int = None,
+        profiles: dict = None,
     ) -> str:
         pass
 
     @abstractmethod
-    def analyze_optimization_effects(
+    async def analyze_optimization_effects(
         self,
         original_metrics: dict,
         optimized_metrics: dict,
@@ -37,6 +58,17 @@ class BaseLLMService(ABC):
     ) -> str:
         pass
 
+    @abstractmethod
+    def stream_optimization_analysis(
+        self,
+        original_metrics: dict,
+        optimized_metrics: dict,
+        original_query: str,
+        optimized_query: str,
+        applied_indexes: list,
+    ) -> AsyncIterator[str]:
+        pass
+
     @abstractmethod
     async def get_weights(self, ram_gb: int = None, priority: str = None) -> str:
         pass
@@ -1,23 +1,64 @@
 import json
 from fastapi import HTTPException
 from helpers.helpers import process_llm_output
-from services.groq import llm_connect
-from helpers.helpers import generate_inserts
+from services.groq import async_llm_connect
+from services.circuitBreaker import get_breaker
+from services import scheduler
+from services.singleFlight import coalesced
+from services.retry import complete_with_retry
+from services.generationPool import generate_population
 
 
 class GroqLLM:
     def __init__(self):
-        self.client = llm_connect()
-        self.attempt = 0
+        self.client = async_llm_connect()
         self.model = "llama-3.1-8b-instant"
 
+    @coalesced
+    async def _chat(self, messages: list) -> str:
+        await scheduler.acquire("groq", self.model, messages)
+        response = await self.client.chat.completions.create(
+            model=self.model,
+            messages=messages,
+        )
+        return response.choices[0].message.content
+
+    async def _complete(self, operation: str, messages: list, parser=None):
+        return await complete_with_retry(
+            self._chat,
+            messages,
+            f"{self.model}.{operation}",
+            parser,
+            breaker=get_breaker(self.model),
+        )
+
+    async def _stream_chat(self, messages: list):
+        await scheduler.acquire("groq", self.model, messages)
+        stream = await self.client.chat.completions.create(
+            model=self.model,
+            messages=messages,
+            stream=True,
+        )
+        try:
+            async for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+        finally:
+            await stream.close()
+
+    async def warmup(self):
+        await self.client.models.list()
+
+    async def close(self):
+        await self.client.close()
+
     async def get_sql_query_with_database_structure(
         self, database_structure: str, order: str
     ) -> str:
         try:
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
+            return await self._complete(
+                "sql_query",
+                [
                     {
                         "role": "system",
                         "content": (
@@ -28,35 +69,38 @@ class GroqLLM:
                         ),
                     },
                     {"role": "user", "content": order},
-                ],
+                ]
             )
-            return response.choices[0].message.content
         except Exception as e:
             raise HTTPException(500, f"Erro ao gerar query SQL com Groq: {str(e)}")
 
+    def _interpretation_messages(self, result: str, order: str) -> list:
+        return [
+            {
+                "role": "system",
+                "content": (
+                    f"Você é um assistente especializado em SQL. "
+                    f"Com base na seguinte pergunta do usuário: {order} "
+                    f"Formate a resposta gerada pelo banco em linguagem natural. "
+                    f"Retorne apenas a resposta para o usuário, sem explicações."
+                ),
+            },
+            {"role": "user", "content": result},
+        ]
+
     async def get_result_interpretation(self, result: str, order: str) -> str:
         try:
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": (
-                            f"Você é um assistente especializado em SQL. "
-                            f"Com base na seguinte pergunta do usuário: {order} "
-                            f"Formate a resposta gerada pelo banco em linguagem natural. "
-                            f"Retorne apenas a resposta para o usuário, sem explicações."
-                        ),
-                    },
-                    {"role": "user", "content": result},
-                ],
+            return await self._complete(
+                "interpretation", self._interpretation_messages(result, order)
             )
-            return response.choices[0].message.content
         except Exception as e:
             raise HTTPException(
                 500, f"Erro ao interpretar resultado com Groq: {str(e)}"
             )
 
+    def stream_result_interpretation(self, result: str, order: str):
+        return self._stream_chat(self._interpretation_messages(result, order))
+
     async def create_database(self, database_structure: dict) -> str:
         try:
             system_message = """
@@ -77,90 +121,108 @@ class GroqLLM:
                 {json.dumps(database_structure)}
                 """
 
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
+            return await self._complete(
+                "create_database",
+                [
                     {"role": "system", "content": system_message},
                     {"role": "user", "content": user_message},
                 ],
+                process_llm_output,
             )
-            return process_llm_output(response.choices[0].message.content)
 
         except Exception as e:
-            self.attempt += 1
-            if self.attempt < 3:
-                return await self.create_database(database_structure)
             raise HTTPException(
                 500, f"Erro ao gerar estrutura de banco com Groq: {str(e)}"
             )
 
-    async def optimize_generate(self, query: str, database_structure: str) -> str:
-        try:
-            system_message = """
-                Você é um especialista em otimização de queries SQL.
-                Sua tarefa é analisar uma query SQL fornecida e a estrutura de um banco de dados e identificar oportunidades de melhoria.
+    def _optimize_messages(self, query: str, database_structure: str) -> list:
+        system_message = """
+            Você é um especialista em otimização de queries SQL.
+            Sua tarefa é analisar uma query SQL fornecida e a estrutura de um banco de dados e identificar oportunidades de melhoria.
 
-                O resultado deve ser um JSON contendo uma lista de strings. Cada string deve ser um comando SQL.
+            O resultado deve ser um JSON contendo uma lista de strings. Cada string deve ser um comando SQL.
 
-                A resposta deve incluir, no mínimo, dois elementos:
-                1. Um comando SQL `CREATE INDEX` para cada coluna que possa ser usada para melhorar a performance da query. Se não houver necessidade de novos índices, retorne um array vazio para este campo.
-                2. A query SQL reescrita, otimizada para ser mais eficiente e escalável.
+            A resposta deve incluir, no mínimo, dois elementos:
+            1. Um comando SQL `CREATE INDEX` para cada coluna que possa ser usada para melhorar a performance da query. Se não houver necessidade de novos índices, retorne um array vazio para este campo.
+            2. A query SQL reescrita, otimizada para ser mais eficiente e escalável.
 
-                Sua resposta deve ser *exclusivamente* o JSON, sem qualquer texto adicional, explicações ou formatação de markdown.
+            Sua resposta deve ser *exclusivamente* o JSON, sem qualquer texto adicional, explicações ou formatação de markdown.
 
-                Exemplo de formato de resposta:
-                [
-                "CREATE INDEX idx_nome_tabela_coluna ON nome_tabela (coluna_analisada);",
-                "SELECT A.coluna1, B.coluna2 FROM tabela_A AS A JOIN tabela_B AS B ON A.id = B.id WHERE A.coluna1 > 100;"
-                ]
+            Exemplo de formato de resposta:
+            [
+            "CREATE INDEX idx_nome_tabela_coluna ON nome_tabela (coluna_analisada);",
+            "SELECT A.coluna1, B.coluna2 FROM tabela_A AS A JOIN tabela_B AS B ON A.id = B.id WHERE A.coluna1 > 100;"
+            ]
 
-                Se não houver necessidade de índices, a resposta deve ser:
-                [
-                "SELECT A.coluna1 FROM tabela_A AS A WHERE A.coluna1 > 100;"
-                ]
-            """
-            user_message = f"""
-                Estrutura do banco de dados:
-                {database_structure}
+            Se não houver necessidade de índices, a resposta deve ser:
+            [
+            "SELECT A.coluna1 FROM tabela_A AS A WHERE A.coluna1 > 100;"
+            ]
+        """
+        user_message = f"""
+            Estrutura do banco de dados:
+            {database_structure}
 
-                Query original a ser otimizada:
-                {query}
-            """
+            Query original a ser otimizada:
+            {query}
+        """
 
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": system_message},
-                    {"role": "user", "content": user_message},
-                ],
+        return [
+            {"role": "system", "content": system_message},
+            {"role": "user", "content": user_message},
+        ]
+
+    async def optimize_generate(self, query: str, database_structure: str) -> str:
+        try:
+            return await self._complete(
+                "optimize_generate",
+                self._optimize_messages(query, database_structure),
+                process_llm_output,
             )
-            return process_llm_output(response.choices[0].message.content)
         except Exception as e:
-            self.attempt += 1
-            if self.attempt < 3:
-                return await self.optimize_generate(query, database_structure)
             raise HTTPException(500, f"Erro ao otimizar query com Groq: {str(e)}")
 
+    def stream_optimize_generate(self, query: str, database_structure: str):
+        return self._stream_chat(self._optimize_messages(query, database_structure))
+
     async def populate_database(
-        self, creation_commands: list, number_insertions: int
+        self,
+        creation_commands: list,
+        number_insertions: int,
+        seed: int = None,
+        profiles: dict = None,
     ) -> str:
-        inserts = []
-        fk_values = {
-            "VARCHAR": [],
-            "INT": [],
-        }
-
-        for count in range(number_insertions):
-            fk_values["VARCHAR"].append(f"fk_value_{count}")
-            fk_values["INT"].append(count + 1)
-
-        for creation_command in creation_commands:
-            inserts.append(
-                generate_inserts(creation_command, number_insertions, fk_values)
-            )
-        return json.dumps(inserts, ensure_ascii=False)
+        tables = await generate_population(
+            creation_commands, number_insertions, seed, profiles=profiles
+        )
+        return json.dumps([inserts for _, inserts in tables], ensure_ascii=False)
+
+    def _analysis_messages(
+        self,
+        original_metrics: dict,
+        optimized_metrics: dict,
+        original_query: str,
+        optimized_query: str,
+        applied_indexes: list,
+    ) -> list:
+        system_prompt = (
+            "Você é um especialista em performance SQL. Compare a versão original e otimizada de uma query, "
+            "com suas métricas e índices aplicados. Decida se vale a pena manter a otimização com justificativa técnica. "
+            "Responda com clareza, analisando tempo, memória, uso de índices e impacto percentual."
+        )
+        user_prompt = (
+            f"Query original:\n{original_query}\n\n"
+            f"Métricas da query original:\n{original_metrics}\n\n"
+            f"Query otimizada:\n{optimized_query}\n\n"
+            f"Métricas da query otimizada:\n{optimized_metrics}\n\n"
+            f"Índices aplicados:\n" + "\n".join(applied_indexes)
+        )
+        return [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_prompt},
+        ]
 
-    def analyze_optimization_effects(
+    async def analyze_optimization_effects(
         self,
         original_metrics: dict,
         optimized_metrics: dict,
@@ -169,33 +231,41 @@ class GroqLLM:
         applied_indexes: list,
     ) -> str:
         try:
-            system_prompt = (
-                "Você é um especialista em performance SQL. Compare a versão original e otimizada de uma query, "
-                "com suas métricas e índices aplicados. Decida se vale a pena manter a otimização com justificativa técnica. "
-                "Responda com clareza, analisando tempo, memória, uso de índices e impacto percentual."
-            )
-            user_prompt = (
-                f"Query original:\n{original_query}\n\n"
-                f"Métricas da query original:\n{original_metrics}\n\n"
-                f"Query otimizada:\n{optimized_query}\n\n"
-                f"Métricas da query otimizada:\n{optimized_metrics}\n\n"
-                f"Índices aplicados:\n" + "\n".join(applied_indexes)
-            )
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt},
-                ],
+            return await self._complete(
+                "analysis",
+                self._analysis_messages(
+                    original_metrics,
+                    optimized_metrics,
+                    original_query,
+                    optimized_query,
+                    applied_indexes,
+                ),
             )
-            return response.choices[0].message.content
         except Exception as e:
             raise HTTPException(500, f"Erro ao analisar otimização com Groq: {str(e)}")
 
+    def stream_optimization_analysis(
+        self,
+        original_metrics: dict,
+        optimized_metrics: dict,
+        original_query: str,
+        optimized_query: str,
+        applied_indexes: list,
+    ):
+        return self._stream_chat(
+            self._analysis_messages(
+                original_metrics,
+                optimized_metrics,
+                original_query,
+                optimized_query,
+                applied_indexes,
+            )
+        )
+
     async def get_weights(self, ram_gb: int = None, priority: str = None) -> str:
         try:
             prompt = f"""
-                {"O banco possui cerca de " + ram_gb + " de RAM disponível para operações." if ram_gb else ""}
+                {"O banco possui cerca de " + str(ram_gb) + "GB de RAM disponível para operações." if ram_gb else ""}
                 {"A prioridade do sistema é: " + priority + "." if priority else ""}
 
                 Quero calcular um score de custo para queries SQL usando a fórmula:
@@ -218,9 +288,9 @@ class GroqLLM:
                 }}
                 """
 
-            chat_completion = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
+            return await self._complete(
+                "weights",
+                [
                     {
                         "role": "system",
                         "content": (
@@ -237,8 +307,5 @@ class GroqLLM:
                 ],
             )
 
-            content = chat_completion.choices[0].message.content
-            return content
-
         except Exception as e:
             raise Exception(f"Erro ao gerar pesos com LLM: {e}")
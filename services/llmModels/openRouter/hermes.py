@@ -1,4 +1,5 @@
 from services.llmModels.openRouter import OpenRouterBaseLLMService
+from loguru import logger
 import os
 
 
@@ -7,5 +8,5 @@ class HermesLLM(OpenRouterBaseLLMService):
         model_name = os.getenv(
             "HERMES_MODEL_NAME", "nousresearch/deephermes-3-llama-3-8b-preview:free"
         )
-        print(f"Conectando ao modelo: {model_name}")
+        logger.info(f"Conectando ao modelo: {model_name}")
         super().__init__(model_name=model_name)
@@ -1,31 +1,90 @@
 import os
 import json
-import httpx
 from fastapi import HTTPException
 from typing import List
 from services.llmModels import BaseLLMService
-from helpers.helpers import generate_inserts, process_llm_output
+from services.httpClient import get_http_client
+from services.circuitBreaker import get_breaker
+from services import scheduler
+from services.singleFlight import coalesced
+from services.retry import ProviderError, complete_with_retry
+from services.generationPool import generate_population
+from helpers.helpers import process_llm_output
 
 
 class OpenRouterBaseLLMService(BaseLLMService):
     def __init__(self, model_name: str):
         self.api_key = os.getenv("OPENROUTER_API_KEY")
         self.base_url = "https://openrouter.ai/api/v1/chat/completions"
+        self.models_url = "https://openrouter.ai/api/v1/models"
         self.model_name = model_name
-        self.attempt = 0
 
-    async def _chat(self, messages: List[dict]) -> str:
-        headers = {
+    def _headers(self) -> dict:
+        return {
             "Authorization": f"Bearer {self.api_key}",
             "Content-Type": "application/json",
         }
+
+    @coalesced
+    async def _chat(self, messages: List[dict]) -> str:
+        await scheduler.acquire("openrouter", self.model_name, messages)
         body = {"model": self.model_name, "messages": messages}
 
-        async with httpx.AsyncClient(timeout=60) as client:
-            response = await client.post(self.base_url, headers=headers, json=body)
+        client = get_http_client()
+        response = await client.post(self.base_url, headers=self._headers(), json=body)
+        if response.status_code != 200:
+            raise self._provider_error(response)
+        return response.json()["choices"][0]["message"]["content"]
+
+    async def _complete(self, operation: str, messages: List[dict], parser=None):
+        return await complete_with_retry(
+            self._chat,
+            messages,
+            f"{self.model_name}.{operation}",
+            parser,
+            breaker=get_breaker(self.model_name),
+        )
+
+    @staticmethod
+    def _provider_error(response) -> ProviderError:
+        try:
+            retry_after = float(response.headers.get("retry-after"))
+        except (TypeError, ValueError):
+            retry_after = None
+        return ProviderError(
+            f"OpenRouter error: {response.text}",
+            status_code=response.status_code,
+            retry_after=retry_after,
+        )
+
+    async def _stream_chat(self, messages: List[dict]):
+        await scheduler.acquire("openrouter", self.model_name, messages)
+        body = {"model": self.model_name, "messages": messages, "stream": True}
+
+        client = get_http_client()
+        async with client.stream(
+            "POST", self.base_url, headers=self._headers(), json=body
+        ) as response:
             if response.status_code != 200:
-                raise HTTPException(500, f"OpenRouter error: {response.text}")
-            return response.json()["choices"][0]["message"]["content"]
+                await response.aread()
+                raise self._provider_error(response)
+
+            async for line in response.aiter_lines():
+                if not line.startswith("data:"):
+                    continue
+                data = line[len("data:") :].strip()
+                if data == "[DONE]":
+                    break
+                payload = json.loads(data)
+                if "error" in payload:
+                    raise ProviderError(f"OpenRouter error: {payload['error']}")
+                choices = payload.get("choices") or [{}]
+                content = choices[0].get("delta", {}).get("content")
+                if content:
+                    yield content
+
+    async def warmup(self):
+        await get_http_client().head(self.models_url)
 
     async def get_sql_query_with_database_structure(
         self, database_structure: str, order: str
@@ -42,10 +101,10 @@ class OpenRouterBaseLLMService(BaseLLMService):
             },
             {"role": "user", "content": order},
         ]
-        return await self._chat(messages)
+        return await self._complete("sql_query", messages)
 
-    async def get_result_interpretation(self, result: str, order: str) -> str:
-        messages = [
+    def _interpretation_messages(self, result: str, order: str) -> List[dict]:
+        return [
             {
                 "role": "system",
                 "content": (
@@ -57,54 +116,66 @@ class OpenRouterBaseLLMService(BaseLLMService):
             },
             {"role": "user", "content": result},
         ]
-        return await self._chat(messages)
+
+    async def get_result_interpretation(self, result: str, order: str) -> str:
+        return await self._complete(
+            "interpretation", self._interpretation_messages(result, order)
+        )
+
+    def stream_result_interpretation(self, result: str, order: str):
+        return self._stream_chat(self._interpretation_messages(result, order))
+
+    def _optimize_messages(self, query: str, database_structure: str) -> List[dict]:
+        system_message = """
+            You are an expert in SQL query optimization.
+            Your task is to analyze a provided SQL query and database structure and identify improvement opportunities.
+
+            The result should be a JSON containing a list of strings. Each string should be an SQL command.
+
+            The response should include at least two elements:
+            1. A SQL `CREATE INDEX` command for each column that could be used to improve query performance. If no new indexes are needed, return an empty array for this field.
+            2. The rewritten SQL query, optimized to be more efficient and scalable.
+
+            Your response should be *exclusively* the JSON, without any additional text, explanations, or markdown formatting.
+
+            Example response format:
+            [
+            "CREATE INDEX idx_table_name_column ON table_name (analyzed_column);",
+            "SELECT A.column1, B.column2 FROM table_A AS A JOIN table_B AS B ON A.id = B.id WHERE A.column1 > 100;"
+            ]
+
+            If no indexes are needed, the response should be:
+            [
+            "SELECT A.column1 FROM table_A AS A WHERE A.column1 > 100;"
+            ]
+        """
+        user_message = f"""
+            Database structure:
+            {database_structure}
+
+            Original query to be optimized:
+            {query}
+        """
+        return [
+            {"role": "system", "content": system_message},
+            {"role": "user", "content": user_message},
+        ]
 
     async def optimize_generate(self, query: str, database_structure: str) -> str:
         try:
-            system_message = """
-                You are an expert in SQL query optimization.
-                Your task is to analyze a provided SQL query and database structure and identify improvement opportunities.
-
-                The result should be a JSON containing a list of strings. Each string should be an SQL command.
-
-                The response should include at least two elements:
-                1. A SQL `CREATE INDEX` command for each column that could be used to improve query performance. If no new indexes are needed, return an empty array for this field.
-                2. The rewritten SQL query, optimized to be more efficient and scalable.
-
-                Your response should be *exclusively* the JSON, without any additional text, explanations, or markdown formatting.
-
-                Example response format:
-                [
-                "CREATE INDEX idx_table_name_column ON table_name (analyzed_column);",
-                "SELECT A.column1, B.column2 FROM table_A AS A JOIN table_B AS B ON A.id = B.id WHERE A.column1 > 100;"
-                ]
-
-                If no indexes are needed, the response should be:
-                [
-                "SELECT A.column1 FROM table_A AS A WHERE A.column1 > 100;"
-                ]
-            """
-            user_message = f"""
-                Database structure:
-                {database_structure}
-
-                Original query to be optimized:
-                {query}
-            """
-            messages = [
-                {"role": "system", "content": system_message},
-                {"role": "user", "content": user_message},
-            ]
-            raw_response = await self._chat(messages)
-            return process_llm_output(raw_response)
+            return await self._complete(
+                "optimize_generate",
+                self._optimize_messages(query, database_structure),
+                process_llm_output,
+            )
         except Exception as e:
-            self.attempt += 1
-            if self.attempt < 3:
-                return await self.optimize_generate(query, database_structure)
             raise HTTPException(
                 500, f"Error generating database optimization: {str(e)}"
             )
 
+    def stream_optimize_generate(self, query: str, database_structure: str):
+        return self._stream_chat(self._optimize_messages(query, database_structure))
+
     async def create_database(self, database_structure: str) -> str:
         try:
             messages = [
@@ -119,42 +190,31 @@ class OpenRouterBaseLLMService(BaseLLMService):
                     ),
                 }
             ]
-            raw = await self._chat(messages)
-            return process_llm_output(raw)
+            return await self._complete("create_database", messages, process_llm_output)
         except Exception as e:
-            self.attempt += 1
-            if self.attempt < 3:
-                return await self.create_database(database_structure)
             raise HTTPException(500, f"Error generating database structure: {str(e)}")
 
     async def populate_database(
-        self, creation_commands: list, number_insertions: int
+        self,
+        creation_commands: list,
+        number_insertions: int,
+        seed: int = None,
+        profiles: dict = None,
     ) -> str:
-        inserts = []
-        fk_values = {
-            "VARCHAR": [],
-            "INT": [],
-        }
-
-        for count in range(number_insertions):
-            fk_values["VARCHAR"].append(f"fk_value_{count}")
-            fk_values["INT"].append(count + 1)
+        tables = await generate_population(
+            creation_commands, number_insertions, seed, profiles=profiles
+        )
+        return json.dumps([inserts for _, inserts in tables], ensure_ascii=False)
 
-        for creation_command in creation_commands:
-            inserts.append(
-                generate_inserts(creation_command, number_insertions, fk_values)
-            )
-        return json.dumps(inserts, ensure_ascii=False)
-
-    def analyze_optimization_effects(
+    def _analysis_messages(
         self,
         original_metrics: dict,
         optimized_metrics: dict,
         original_query: str,
         optimized_query: str,
         applied_indexes: list,
-    ) -> str:
-        messages = [
+    ) -> List[dict]:
+        return [
             {
                 "role": "system",
                 "content": (
@@ -174,9 +234,43 @@ class OpenRouterBaseLLMService(BaseLLMService):
                 ),
             },
         ]
-        import asyncio
 
-        return asyncio.run(self._chat(messages))
+    async def analyze_optimization_effects(
+        self,
+        original_metrics: dict,
+        optimized_metrics: dict,
+        original_query: str,
+        optimized_query: str,
+        applied_indexes: list,
+    ) -> str:
+        return await self._complete(
+            "analysis",
+            self._analysis_messages(
+                original_metrics,
+                optimized_metrics,
+                original_query,
+                optimized_query,
+                applied_indexes,
+            ),
+        )
+
+    def stream_optimization_analysis(
+        self,
+        original_metrics: dict,
+        optimized_metrics: dict,
+        original_query: str,
+        optimized_query: str,
+        applied_indexes: list,
+    ):
+        return self._stream_chat(
+            self._analysis_messages(
+                original_metrics,
+                optimized_metrics,
+                original_query,
+                optimized_query,
+                applied_indexes,
+            )
+        )
 
     async def get_weights(self, ram_gb: int = None, priority: str = None) -> str:
         try:
@@ -217,7 +311,6 @@ class OpenRouterBaseLLMService(BaseLLMService):
                 {"role": "user", "content": prompt},
             ]
 
-            raw = await self._chat(messages)
-            return raw
+            return await self._complete("weights", messages)
         except Exception as e:
             raise Exception(f"Error generating weights with LLM: {e}")
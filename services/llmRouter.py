@@ -1,16 +1,156 @@
+import os
+import asyncio
+import inspect
+import functools
+import contextvars
+
+from loguru import logger
+
+from services import metrics
+from services.circuitBreaker import get_breaker
+from services.retry import is_provider_failure
+
 from services.llmModels import GroqLLM
 from services.llmModels.openRouter import MistralLLM
 from services.llmModels.openRouter import GemmaLLM
 from services.llmModels.openRouter import HermesLLM
 from services.llmModels import BaseLLMService
 
-def get_llm(model: str = "default") -> BaseLLMService:
-    match model.lower():
-        case "mistral":
-            return MistralLLM()
-        case "gemma":
-            return GemmaLLM()
-        case "hermes":
-            return HermesLLM()
-        case _:
-            return GroqLLM()
+_PROVIDERS = {
+    "default": GroqLLM,
+    "mistral": MistralLLM,
+    "gemma": GemmaLLM,
+    "hermes": HermesLLM,
+}
+
+_registry: dict = {}
+_served = contextvars.ContextVar("llm_served", default=None)
+
+
+def resolve_model(model: str) -> str:
+    name = model.lower()
+    return name if name in _PROVIDERS else "default"
+
+
+def provider_names() -> list:
+    return list(_PROVIDERS)
+
+
+def _provider(name: str) -> BaseLLMService:
+    llm = _registry.get(name)
+    if llm is None:
+        llm = _registry.setdefault(name, _PROVIDERS[name]())
+    return llm
+
+
+def model_id(llm) -> str:
+    return getattr(llm, "model", None) or getattr(llm, "model_name", "")
+
+
+def track_served() -> list:
+    """
+    Passa a registrar, na lista retornada, o nome de cada modelo que de fato
+    respondeu às chamadas deste contexto (o pedido ou o substituto do failover).
+    """
+    box = []
+    _served.set(box)
+    return box
+
+
+def _record_served(name: str):
+    box = _served.get()
+    if box is not None:
+        box.append(name)
+
+
+def failover_enabled() -> bool:
+    return os.getenv("LLM_FAILOVER", "true").lower() in ("1", "true", "yes")
+
+
+class FailoverLLM:
+    """
+    Encaminha as chamadas ao modelo pedido e, se o circuito dele estiver
+    aberto ou o provedor falhar, ao próximo modelo saudável do registro.
+    Atributos que não são métodos vêm do modelo pedido.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def _candidates(self) -> list:
+        names = [self.name]
+        if failover_enabled():
+            names += [n for n in _PROVIDERS if n != self.name]
+        healthy = [n for n in names if get_breaker(model_id(_provider(n))).available()]
+        return healthy or [self.name]
+
+    def __getattr__(self, attr):
+        value = getattr(_provider(self.name), attr)
+        if not callable(value):
+            return value
+        if not inspect.iscoroutinefunction(value):
+            # Streams: escolhe o primeiro modelo saudável antes de começar.
+            @functools.wraps(value)
+            def pick(*args, **kwargs):
+                name = self._candidates()[0]
+                _record_served(name)
+                return getattr(_provider(name), attr)(*args, **kwargs)
+
+            return pick
+
+        @functools.wraps(value)
+        async def call(*args, **kwargs):
+            last_error = None
+            for name in self._candidates():
+                try:
+                    result = await getattr(_provider(name), attr)(*args, **kwargs)
+                except Exception as e:
+                    if not is_provider_failure(e):
+                        raise
+                    last_error = e
+                    logger.warning(f"{attr}: modelo '{name}' indisponível ({e})")
+                    continue
+                _record_served(name)
+                if name != self.name:
+                    metrics.increment(f"llm.failover.{self.name}.{name}")
+                    logger.info(f"{attr}: '{self.name}' substituído por '{name}'")
+                return result
+            raise last_error
+
+        return call
+
+
+def get_llm(model: str = "default") -> FailoverLLM:
+    return FailoverLLM(resolve_model(model))
+
+
+def health() -> dict:
+    result = {}
+    for name in _PROVIDERS:
+        model = model_id(_provider(name))
+        result[name] = {"model": model, **get_breaker(model).snapshot()}
+    return result
+
+
+async def _warmup(name: str, llm: BaseLLMService):
+    try:
+        await llm.warmup()
+        logger.info(f"Modelo '{name}' aquecido.")
+    except Exception as e:
+        logger.warning(f"Falha ao aquecer o modelo '{name}': {e}")
+
+
+async def startup():
+    for name in _PROVIDERS:
+        _provider(name)
+
+    if os.getenv("LLM_WARMUP", "true").lower() in ("1", "true", "yes"):
+        await asyncio.gather(
+            *(_warmup(name, llm) for name, llm in _registry.items())
+        )
+
+
+async def shutdown():
+    for llm in _registry.values():
+        await llm.close()
+    _registry.clear()
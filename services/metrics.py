@@ -0,0 +1,56 @@
+import threading
+from collections import defaultdict, deque
+
+_lock = threading.Lock()
+_counters = defaultdict(int)
+_gauges = {}
+_samples = defaultdict(lambda: deque(maxlen=1024))
+
+
+def increment(name: str, value: int = 1):
+    with _lock:
+        _counters[name] += value
+
+
+def set_gauge(name: str, value: float):
+    with _lock:
+        _gauges[name] = value
+
+
+def observe(name: str, value: float):
+    with _lock:
+        _samples[name].append(value)
+
+
+def sample_count(name: str) -> int:
+    with _lock:
+        return len(_samples.get(name, ()))
+
+
+def percentile(name: str, p: float):
+    with _lock:
+        values = sorted(_samples.get(name, ()))
+    if not values:
+        return None
+    index = min(len(values) - 1, int(round(p / 100 * (len(values) - 1))))
+    return values[index]
+
+
+def snapshot() -> dict:
+    with _lock:
+        counters = dict(_counters)
+        gauges = dict(_gauges)
+        names = list(_samples)
+    return {
+        "counters": counters,
+        "gauges": gauges,
+        "observations": {
+            name: {
+                "count": len(_samples[name]),
+                "p50": percentile(name, 50),
+                "p95": percentile(name, 95),
+                "p99": percentile(name, 99),
+            }
+            for name in names
+        },
+    }
@@ -0,0 +1,67 @@
+from operator import itemgetter
+
+import numpy as np
+
+from services.weightModel import FEATURES
+
+_FEATURE_VALUES = itemgetter(*FEATURES)
+
+
+def feature_matrix(records: list) -> np.ndarray:
+    """Matriz (n, 8) com as métricas de cada registro (dict com todas as FEATURES)."""
+    matrix = np.array(list(map(_FEATURE_VALUES, records)), dtype=np.float64)
+    return matrix.reshape(len(records), len(FEATURES))
+
+
+def normalize_features(matrix: np.ndarray, method: str = "minmax") -> np.ndarray:
+    """
+    Leva cada coluna para [0, 1] pelo mínimo e máximo do lote. "log" aplica
+    log1p antes, para que um outlier de várias ordens de grandeza não
+    achate o resto. Colunas constantes viram 0 e não influenciam o ranking.
+    """
+    if method == "log":
+        matrix = np.log1p(matrix)
+    low = matrix.min(axis=0)
+    spread = matrix.max(axis=0) - low
+    spread[spread == 0] = 1.0
+    return (matrix - low) / spread
+
+
+def score_matrix(matrix: np.ndarray, weights: dict, method: str = "minmax") -> tuple:
+    """
+    score = w1 * execution_time + ... + w8 * join_collisions sobre as
+    features normalizadas, em uma única passada. Retorna (scores, fator
+    de maior contribuição de cada linha).
+    """
+    vector = np.array([weights[feature] for feature in FEATURES], dtype=np.float64)
+    contributions = normalize_features(matrix, method) * vector
+    return contributions.sum(axis=1), contributions.argmax(axis=1)
+
+
+def rank_scores(scores: np.ndarray, top: int = None) -> np.ndarray:
+    """Índices em ordem decrescente de score; com top, só os top primeiros."""
+    if top is not None and top < len(scores):
+        # argpartition isola os top em O(n) antes de ordenar só esse trecho.
+        candidates = np.argpartition(-scores, top - 1)[:top]
+        return candidates[np.lexsort((candidates, -scores[candidates]))]
+    return np.argsort(-scores, kind="stable")
+
+
+def score_queries(records: list, weights: dict, method: str = "minmax", top: int = None) -> list:
+    """Pontua e ordena os registros de métricas; o primeiro é o mais caro."""
+    if not records:
+        return []
+    scores, factors = score_matrix(feature_matrix(records), weights, method)
+    order = rank_scores(scores, top).tolist()
+    scores, factors = scores.round(6).tolist(), factors.tolist()
+    return [
+        {
+            "rank": rank,
+            "index": index,
+            "id": records[index].get("id"),
+            "query": records[index].get("query"),
+            "score": scores[index],
+            "main_factor": FEATURES[factors[index]],
+        }
+        for rank, index in enumerate(order, start=1)
+    ]
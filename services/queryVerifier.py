@@ -0,0 +1,395 @@
+import os
+import re
+import time
+import sqlite3
+import hashlib
+import json
+import statistics
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+
+from dotenv import load_dotenv
+from loguru import logger
+
+from helpers.dataGenerator import key_pool
+from helpers.ddlParser import parse_table
+from helpers.helpers import iter_table_data, order_create_tables, schema_keys, table_seed
+
+load_dotenv()
+
+_ALTER_INDEX = re.compile(
+    r"^\s*ALTER\s+TABLE\s+(\S+)\s+ADD\s+(UNIQUE\s+)?(?:INDEX|KEY)\s*([^\s(]+)?\s*(\(.*\))\s*;?\s*$",
+    re.IGNORECASE | re.DOTALL,
+)
+_CREATE_INDEX = re.compile(r"^\s*CREATE\s+(?:UNIQUE\s+)?INDEX\b", re.IGNORECASE)
+_INDEX_NOISE = re.compile(r"\s+USING\s+\w+|\bCONCURRENTLY\s+", re.IGNORECASE)
+_QUERY = re.compile(r"^\s*(?:\(\s*)*(SELECT|WITH|UPDATE|DELETE|INSERT)\b", re.IGNORECASE)
+
+_databases = OrderedDict()
+_databases_lock = threading.Lock()
+
+# Ações que nunca são autorizadas: ATTACH criaria arquivos no host e
+# PRAGMA (inclusive as funções pragma_*) mexe na configuração da conexão.
+_DENIED = {sqlite3.SQLITE_ATTACH, sqlite3.SQLITE_DETACH, sqlite3.SQLITE_PRAGMA}
+_QUERY_ACTIONS = {
+    sqlite3.SQLITE_SELECT,
+    sqlite3.SQLITE_READ,
+    sqlite3.SQLITE_FUNCTION,
+    sqlite3.SQLITE_RECURSIVE,
+    sqlite3.SQLITE_INSERT,
+    sqlite3.SQLITE_UPDATE,
+    sqlite3.SQLITE_DELETE,
+}
+# Além do CREATE INDEX, o SQLite registra o índice em sqlite_master e lê
+# as colunas (e funções de índices com expressão) para montá-lo.
+_INDEX_ACTIONS = {
+    sqlite3.SQLITE_CREATE_INDEX,
+    sqlite3.SQLITE_READ,
+    sqlite3.SQLITE_FUNCTION,
+    sqlite3.SQLITE_REINDEX,
+}
+_CATALOG = ("sqlite_master", "sqlite_schema")
+
+
+def _query_action(action: int, arg1) -> bool:
+    # BEGIN é o que o módulo sqlite3 emite sozinho antes de um DML.
+    if action == sqlite3.SQLITE_TRANSACTION:
+        return arg1 == "BEGIN"
+    return action in _QUERY_ACTIONS
+
+
+def _index_action(action: int, arg1) -> bool:
+    if action == sqlite3.SQLITE_INSERT:
+        return arg1 in _CATALOG
+    return action in _INDEX_ACTIONS
+
+
+class _VerifyConnection(sqlite3.Connection):
+    """
+    Conexão do banco de verificação com um authorizer fixo: ATTACH, DETACH
+    e PRAGMA são sempre negados e, dentro de restricted(), só passam as
+    ações aceitas pela política. O authorizer nunca é trocado porque
+    set_authorizer(None) só o desativa a partir do Python 3.11.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.policy = None
+        self.set_authorizer(self._authorize)
+
+    def _authorize(self, action, arg1, arg2, database, source):
+        if action in _DENIED:
+            return sqlite3.SQLITE_DENY
+        if self.policy is None or self.policy(action, arg1):
+            return sqlite3.SQLITE_OK
+        return sqlite3.SQLITE_DENY
+
+    @contextmanager
+    def restricted(self, policy):
+        self.policy = policy
+        try:
+            yield
+        finally:
+            self.policy = None
+
+
+def _connect() -> _VerifyConnection:
+    return sqlite3.connect(":memory:", check_same_thread=False, factory=_VerifyConnection)
+
+
+def _single_statement(sql: str) -> str:
+    """Remove o ';' final e rejeita textos com mais de um comando SQL."""
+    sql = sql.strip().rstrip(";").rstrip()
+    if not sql:
+        raise ValueError("Comando SQL vazio.")
+    for position, char in enumerate(sql):
+        if char == ";" and sqlite3.complete_statement(sql[: position + 1]):
+            raise ValueError("Envie um único comando SQL por vez.")
+    return sql
+
+
+def _quote(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _columns(names) -> str:
+    return ", ".join(_quote(name) for name in names)
+
+
+def sqlite_ddl(creation_command: str) -> list:
+    """
+    Traduz um CREATE TABLE (MySQL/PostgreSQL) para o SQLite a partir do
+    modelo de helpers.ddlParser: opções de tabela, AUTO_INCREMENT e tipos
+    com argumentos não numéricos ficam de fora; KEY/INDEX viram CREATE INDEX.
+    """
+    table = parse_table(creation_command)
+    auto_pk = (
+        len(table.primary_key) == 1 and table.column(table.primary_key[0]).auto_inc
+    )
+    definitions = []
+    for col in table.columns:
+        if auto_pk and col.name == table.primary_key[0]:
+            definitions.append(f"{_quote(col.name)} INTEGER PRIMARY KEY")
+            continue
+        col_type = col.type
+        if col.args and all(arg.isdigit() for arg in col.args):
+            col_type += f"({', '.join(col.args)})"
+        definition = f"{_quote(col.name)} {col_type}"
+        if col.not_null:
+            definition += " NOT NULL"
+        if col.unique:
+            definition += " UNIQUE"
+        definitions.append(definition)
+    if table.primary_key and not auto_pk:
+        definitions.append(f"PRIMARY KEY ({_columns(table.primary_key)})")
+    for fk in table.foreign_keys:
+        definitions.append(
+            f"FOREIGN KEY ({_columns(fk.columns)}) "
+            f"REFERENCES {_quote(fk.ref_table)} ({_columns(fk.ref_columns)})"
+        )
+
+    statements = [f"CREATE TABLE {_quote(table.name)} ({', '.join(definitions)})"]
+    for position, index in enumerate(table.indexes):
+        name = index.name or f"{table.name}_idx_{position}"
+        unique = "UNIQUE " if index.unique else ""
+        statements.append(
+            f"CREATE {unique}INDEX {_quote(name)} ON {_quote(table.name)} ({_columns(index.columns)})"
+        )
+    return statements
+
+
+def sqlite_index(statement: str) -> str:
+    """CREATE INDEX ou ALTER TABLE ... ADD INDEX do MySQL no formato do SQLite."""
+    match = _ALTER_INDEX.match(statement)
+    if match:
+        table, unique, name, columns = match.groups()
+        name = name or "idx_" + hashlib.sha1(statement.encode("utf-8")).hexdigest()[:8]
+        statement = f"CREATE {'UNIQUE ' if unique else ''}INDEX {name} ON {table} {columns}"
+    return _INDEX_NOISE.sub(" ", statement).strip().rstrip(";")
+
+
+def split_optimization(statements: list) -> tuple:
+    """Separa a saída de /optimizer/generate em (índices, primeira query reescrita)."""
+    indexes, query = [], None
+    for statement in statements:
+        if _CREATE_INDEX.match(statement) or _ALTER_INDEX.match(statement):
+            indexes.append(statement)
+        elif query is None and _QUERY.match(statement):
+            query = statement
+    return indexes, query
+
+
+def _load(conn: sqlite3.Connection, creation_commands: list, number_insertions: int, seed, profiles) -> dict:
+    ordered = order_create_tables(creation_commands, keep_foreign_keys=True)
+    for creation_command in ordered:
+        for statement in sqlite_ddl(creation_command):
+            conn.execute(statement)
+
+    fk_values = key_pool(number_insertions)
+    keys = schema_keys(ordered)
+    tables = {}
+    for position, creation_command in enumerate(ordered):
+        chunks = iter_table_data(
+            creation_command,
+            number_insertions,
+            fk_values,
+            seed=table_seed(seed, position),
+            profiles=profiles,
+            keys=keys,
+        )
+        for table_name, _, rows, data in chunks:
+            if not data:
+                conn.executemany(f"INSERT INTO {_quote(table_name)} DEFAULT VALUES", [()] * rows)
+                continue
+            columns = []
+            for column in data.values():
+                values = column["values"].astype(object)
+                if column["nulls"] is not None:
+                    values[column["nulls"]] = None
+                columns.append(values.tolist())
+            placeholders = ", ".join("?" for _ in data)
+            # OR IGNORE: valores aleatórios podem repetir em colunas UNIQUE.
+            conn.executemany(
+                f"INSERT OR IGNORE INTO {_quote(table_name)} ({_columns(data)}) VALUES ({placeholders})",
+                zip(*columns),
+            )
+        conn.commit()
+        tables[table_name] = conn.execute(f"SELECT COUNT(*) FROM {_quote(table_name)}").fetchone()[0]
+    conn.execute("ANALYZE")
+    conn.commit()
+    return tables
+
+
+def _database_key(creation_commands, number_insertions, seed, profiles) -> str:
+    payload = json.dumps([creation_commands, number_insertions, seed, profiles], sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def build_database(creation_commands: list, number_insertions: int, seed=0, profiles=None):
+    """
+    Banco SQLite em memória com o DDL e os dados de /optimizer/populate
+    (mesma semente, mesmos perfis). Os bancos recentes ficam guardados em
+    conexões em memória (VERIFY_DB_CACHE) e são copiados com backup() para
+    não gerar os dados de novo.
+    Retorna (conexão, linhas por tabela, tempo de carga em ms ou None se veio do cache).
+    """
+    key = _database_key(creation_commands, number_insertions, seed, profiles)
+    conn = _connect()
+    with _databases_lock:
+        cached = _databases.get(key)
+        if cached is not None:
+            _databases.move_to_end(key)
+            source, tables = cached
+            source.backup(conn)
+    if cached is not None:
+        return conn, tables, None
+
+    started = time.perf_counter()
+    tables = _load(conn, creation_commands, number_insertions, seed, profiles)
+    load_ms = (time.perf_counter() - started) * 1000
+    logger.info(f"Banco de verificação criado: {len(tables)} tabelas em {load_ms:.0f} ms")
+
+    size = int(os.getenv("VERIFY_DB_CACHE", 4))
+    if size > 0:
+        source = _connect()
+        conn.backup(source)
+        with _databases_lock:
+            _databases[key] = (source, tables)
+            while len(_databases) > size:
+                _, (evicted, _) = _databases.popitem(last=False)
+                evicted.close()
+    return conn, tables, load_ms
+
+
+def _plan_summary(plan: list) -> dict:
+    scans, indexes = [], []
+    for detail in plan:
+        if detail.startswith("SCAN ") and " USING " not in detail:
+            words = detail.split()
+            scans.append(words[2] if words[1] == "TABLE" and len(words) > 2 else words[1])
+        match = re.search(r"USING (?:COVERING )?INDEX (\S+)", detail)
+        if match:
+            indexes.append(match.group(1))
+    return {"full_scans": scans, "indexes_used": indexes}
+
+
+def _result_hash(rows: list) -> str:
+    digest = hashlib.sha256()
+    for row in sorted(repr(row) for row in rows):
+        digest.update(row.encode("utf-8"))
+    return digest.hexdigest()
+
+
+def measure(conn: sqlite3.Connection, query: str, repeat: int = 5) -> dict:
+    """
+    Executa a query repeat vezes (mais um aquecimento) e retorna tempos,
+    linhas e o EXPLAIN QUERY PLAN. Alterações de DML são desfeitas a cada
+    execução; VERIFY_QUERY_TIMEOUT limita cada execução. Só um comando é
+    aceito e ele só pode ler ou alterar linhas (conn de build_database).
+    """
+    try:
+        query = _single_statement(query)
+    except ValueError as e:
+        return {"error": str(e)}
+    timeout = float(os.getenv("VERIFY_QUERY_TIMEOUT", 10))
+    deadline = [0.0]
+    conn.set_progress_handler(lambda: time.perf_counter() > deadline[0], 10000)
+    try:
+        with conn.restricted(_query_action):
+            plan = [row[3] for row in conn.execute("EXPLAIN QUERY PLAN " + query)]
+        timings, rows, count = [], [], 0
+        for _ in range(repeat + 1):
+            deadline[0] = time.perf_counter() + timeout
+            started = time.perf_counter()
+            with conn.restricted(_query_action):
+                cursor = conn.execute(query)
+                rows = cursor.fetchall() if cursor.description else []
+            timings.append(time.perf_counter() - started)
+            count = len(rows) if cursor.description else cursor.rowcount
+            conn.rollback()
+    except sqlite3.Error as e:
+        conn.rollback()
+        return {"error": str(e)}
+    finally:
+        conn.set_progress_handler(None, 0)
+
+    timings = timings[1:]
+    return {
+        "execution_time_ms": round(statistics.median(timings) * 1000, 3),
+        "min_time_ms": round(min(timings) * 1000, 3),
+        "max_time_ms": round(max(timings) * 1000, 3),
+        "runs": len(timings),
+        "rows": count,
+        "plan": plan,
+        **_plan_summary(plan),
+        "result_hash": _result_hash(rows),
+    }
+
+
+def verify(
+    creation_commands: list,
+    original_query: str,
+    optimized_query: str = None,
+    indexes: list = None,
+    number_insertions: int = 1000,
+    seed=0,
+    profiles: dict = None,
+    repeat: int = 5,
+) -> dict:
+    """
+    Mede a query original e a otimizada sem e com os índices sugeridos em
+    um banco SQLite com os dados gerados. original_metrics (original, sem
+    índices) e optimized_metrics (otimizada, com índices) seguem o formato
+    esperado por /optimizer/analyze.
+    """
+    max_rows = int(os.getenv("VERIFY_MAX_ROWS", 100000))
+    if number_insertions > max_rows:
+        raise ValueError(f"number_insertions acima do limite de verificação ({max_rows}).")
+
+    optimized_query = optimized_query or original_query
+    conn, tables, load_ms = build_database(creation_commands, number_insertions, seed, profiles)
+    try:
+        runs = {"original": {}, "optimized": {}}
+        runs["original"]["without_indexes"] = measure(conn, original_query, repeat)
+        runs["optimized"]["without_indexes"] = measure(conn, optimized_query, repeat)
+
+        applied, failed = [], []
+        for statement in indexes or []:
+            try:
+                index = _single_statement(sqlite_index(statement))
+                if not _CREATE_INDEX.match(index):
+                    raise ValueError("Só CREATE INDEX é aceito como índice.")
+                with conn.restricted(_index_action):
+                    conn.execute(index)
+                applied.append(statement)
+            except (sqlite3.Error, ValueError) as e:
+                failed.append({"statement": statement, "error": str(e)})
+        if applied:
+            conn.execute("ANALYZE")
+        conn.commit()
+
+        runs["original"]["with_indexes"] = measure(conn, original_query, repeat)
+        runs["optimized"]["with_indexes"] = measure(conn, optimized_query, repeat)
+    finally:
+        conn.close()
+
+    original = runs["original"]["without_indexes"]
+    optimized = runs["optimized"]["with_indexes"]
+    compared = "error" not in original and "error" not in optimized
+    speedup = None
+    if compared and optimized["execution_time_ms"] > 0:
+        speedup = round(original["execution_time_ms"] / optimized["execution_time_ms"], 2)
+    return {
+        "original_metrics": original,
+        "optimized_metrics": optimized,
+        "original_query": original_query,
+        "optimized_query": optimized_query,
+        "applied_indexes": applied,
+        "failed_indexes": failed,
+        "results_match": compared and original["result_hash"] == optimized["result_hash"],
+        "speedup": speedup,
+        "runs": runs,
+        "tables": tables,
+        "load_time_ms": None if load_ms is None else round(load_ms, 1),
+    }
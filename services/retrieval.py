@@ -0,0 +1,261 @@
+import os
+import time
+import asyncio
+import hashlib
+from typing import List, Optional
+
+import numpy as np
+from dotenv import load_dotenv
+from loguru import logger
+
+from helpers.schemaPruner import split_schema, tables_in_order
+from helpers.sqlNormalizer import schema_fingerprint
+from models.llmModel import ContextIn, ContextOut
+from services.embeddings import get_embedder
+
+load_dotenv()
+
+
+class InMemoryVectorStore:
+    def __init__(self):
+        self._points = {}
+
+    def count(self, schema_id: str) -> int:
+        return sum(1 for p in self._points.values() if p.payload["schema_id"] == schema_id)
+
+    def upsert(self, points: List[ContextIn]):
+        for point in points:
+            self._points[point.id] = point
+
+    def search(self, vector: List[float], schema_id: str, limit: int) -> List[ContextOut]:
+        candidates = [p for p in self._points.values() if p.payload["schema_id"] == schema_id]
+        if not candidates:
+            return []
+        matrix = np.asarray([p.vector for p in candidates], dtype=np.float32)
+        scores = matrix @ np.asarray(vector, dtype=np.float32)
+        best = np.argsort(-scores)[:limit]
+        return [
+            ContextOut(id=candidates[i].id, score=float(scores[i]), payload=candidates[i].payload)
+            for i in best
+        ]
+
+
+class QdrantVectorStore:
+    def __init__(self, client, collection: str, dim: int):
+        self.client = client
+        self.collection = collection
+        self.dim = dim
+        self._ensure_collection()
+
+    def _ensure_collection(self):
+        from qdrant_client.http.exceptions import UnexpectedResponse
+        from qdrant_client.models import Distance, PayloadSchemaType, VectorParams
+
+        if self.client.collection_exists(self.collection):
+            return
+        try:
+            self.client.create_collection(
+                collection_name=self.collection,
+                vectors_config=VectorParams(size=self.dim, distance=Distance.COSINE),
+            )
+        except (UnexpectedResponse, ValueError) as e:
+            # Outro processo criou a coleção entre a verificação e o create
+            # (409 no servidor, ValueError no modo local); o resto propaga.
+            if getattr(e, "status_code", None) != 409 and "already exists" not in str(e):
+                raise
+            return
+        self.client.create_payload_index(
+            collection_name=self.collection,
+            field_name="schema_id",
+            field_schema=PayloadSchemaType.KEYWORD,
+        )
+
+    def close(self):
+        self.client.close()
+
+    @staticmethod
+    def _schema_filter(schema_id: str):
+        from qdrant_client.models import FieldCondition, Filter, MatchValue
+
+        return Filter(must=[FieldCondition(key="schema_id", match=MatchValue(value=schema_id))])
+
+    def count(self, schema_id: str) -> int:
+        return self.client.count(
+            collection_name=self.collection,
+            count_filter=self._schema_filter(schema_id),
+            exact=True,
+        ).count
+
+    def upsert(self, points: List[ContextIn]):
+        from qdrant_client.models import PointStruct
+
+        self.client.upsert(
+            collection_name=self.collection,
+            points=[PointStruct(id=p.id, vector=p.vector, payload=p.payload) for p in points],
+        )
+
+    def search(self, vector: List[float], schema_id: str, limit: int) -> List[ContextOut]:
+        hits = self.client.search(
+            collection_name=self.collection,
+            query_vector=vector,
+            query_filter=self._schema_filter(schema_id),
+            limit=limit,
+        )
+        return [ContextOut(id=h.id, score=h.score, payload=h.payload) for h in hits]
+
+
+def _point_id(schema_id: str, table: str) -> int:
+    digest = hashlib.sha256(f"{schema_id}:{table}".encode("utf-8")).hexdigest()
+    return int(digest[:15], 16)
+
+
+class SchemaRetriever:
+    """
+    Indexa cada tabela de uma estrutura de banco como um chunk no vector
+    store e recupera as tabelas mais relevantes para uma pergunta.
+    """
+
+    def __init__(self, store, embedder, top_k: int = 8):
+        self.store = store
+        self.embedder = embedder
+        self.top_k = top_k
+        self._indexed = set()
+
+    async def _index(self, schema_id: str, chunks: dict):
+        if schema_id in self._indexed:
+            return
+        if await asyncio.to_thread(self.store.count, schema_id) < len(chunks):
+            names = list(chunks)
+            vectors = await asyncio.to_thread(
+                self.embedder.embed, [chunks[name] for name in names]
+            )
+            points = [
+                ContextIn(
+                    id=_point_id(schema_id, name),
+                    vector=vector.tolist(),
+                    payload={"schema_id": schema_id, "table": name, "content": chunks[name]},
+                )
+                for name, vector in zip(names, vectors)
+            ]
+            await asyncio.to_thread(self.store.upsert, points)
+            logger.info(f"Estrutura {schema_id[:12]} indexada com {len(points)} tabelas.")
+        self._indexed.add(schema_id)
+
+    async def retrieve(self, database_structure: str, question: str):
+        stats = {
+            "retrieved": False,
+            "tables_total": 0,
+            "tables_kept": 0,
+            "original_chars": len(database_structure),
+            "pruned_chars": len(database_structure),
+        }
+
+        split = split_schema(database_structure)
+        if split is None:
+            return database_structure, stats
+
+        tables, _, render = split
+        stats["tables_total"] = stats["tables_kept"] = len(tables)
+        if len(tables) <= self.top_k:
+            return database_structure, stats
+
+        chunks = {name: render({name}) for name in tables}
+        schema_id = f"{self.embedder.name}:{schema_fingerprint(database_structure)}"
+        await self._index(schema_id, chunks)
+
+        selected = sorted(tables_in_order(question, tables))[: self.top_k]
+        query_vector = (await asyncio.to_thread(self.embedder.embed, [question]))[0]
+        hits = await asyncio.to_thread(
+            self.store.search, query_vector.tolist(), schema_id, self.top_k
+        )
+        for hit in hits:
+            if len(selected) >= self.top_k:
+                break
+            if hit.payload["table"] not in selected:
+                selected.append(hit.payload["table"])
+
+        retrieved = render(set(selected))
+        stats.update(
+            retrieved=True,
+            tables_kept=len(selected),
+            pruned_chars=len(retrieved),
+            tables=selected,
+        )
+        return retrieved, stats
+
+
+_retriever: Optional[SchemaRetriever] = None
+_building: Optional[asyncio.Task] = None
+_retry_at = 0.0
+_failures = 0
+
+
+def _backend() -> str:
+    return os.getenv("RAG_BACKEND", "qdrant").lower()
+
+
+def _build_store(backend: str, dim: int, embedder_name: str):
+    if backend == "memory":
+        return InMemoryVectorStore()
+
+    from services.db import connect
+
+    collection = f"{os.getenv('RAG_COLLECTION', 'schema_chunks')}_{embedder_name}"
+    return QdrantVectorStore(connect(), collection, dim)
+
+
+def _create_retriever(backend: str) -> SchemaRetriever:
+    embedder = get_embedder()
+    store = _build_store(backend, embedder.dim, embedder.name)
+    return SchemaRetriever(store, embedder, int(os.getenv("RAG_TOP_K", 8)))
+
+
+async def _build(backend: str):
+    """
+    Cria o retriever em uma thread. Se o vector store falhar, guarda a
+    falha e só tenta de novo após um backoff exponencial (RAG_RETRY_BACKOFF,
+    até RAG_RETRY_BACKOFF_MAX segundos).
+    """
+    global _retriever, _retry_at, _failures
+    try:
+        _retriever = await asyncio.to_thread(_create_retriever, backend)
+        _failures = 0
+        logger.info(f"Retriever de schemas pronto (backend={backend}).")
+    except Exception as e:
+        _failures += 1
+        delay = min(
+            float(os.getenv("RAG_RETRY_BACKOFF", 30)) * 2 ** (_failures - 1),
+            float(os.getenv("RAG_RETRY_BACKOFF_MAX", 600)),
+        )
+        _retry_at = time.monotonic() + delay
+        logger.warning(f"Vector store '{backend}' indisponível; nova tentativa em {delay:.0f}s: {e}")
+
+
+def get_retriever() -> Optional[SchemaRetriever]:
+    """
+    Retriever pronto ou None. Nunca bloqueia a requisição: enquanto o
+    vector store não estiver disponível, agenda a criação em segundo plano
+    (respeitando o backoff) e o chamador usa a poda local do schema.
+    """
+    global _building
+    backend = _backend()
+    if backend == "off":
+        return None
+    if _retriever is None:
+        idle = _building is None or _building.done()
+        if idle and time.monotonic() >= _retry_at:
+            _building = asyncio.get_running_loop().create_task(_build(backend))
+    return _retriever
+
+
+async def startup():
+    backend = _backend()
+    if backend != "off" and _retriever is None:
+        await _build(backend)
+
+
+async def shutdown():
+    global _retriever
+    if _retriever is not None and hasattr(_retriever.store, "close"):
+        await asyncio.to_thread(_retriever.store.close)
+    _retriever = None
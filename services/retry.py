@@ -0,0 +1,211 @@
+import os
+import time
+import random
+import asyncio
+import threading
+
+import groq
+import httpx
+from dotenv import load_dotenv
+from loguru import logger
+
+from services import metrics, scheduler
+from services.circuitBreaker import CircuitBreaker, CircuitOpenError
+
+load_dotenv()
+
+
+class ProviderError(Exception):
+    def __init__(self, message: str, status_code: int = None, retry_after: float = None):
+        super().__init__(message)
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+
+class RetryError(Exception):
+    def __init__(self, operation: str, attempts: int, last_error: Exception):
+        super().__init__(f"{last_error} ({attempts} tentativas em {operation})")
+        self.operation = operation
+        self.attempts = attempts
+        self.last_error = last_error
+
+
+class RetryPolicy:
+    def __init__(
+        self,
+        max_attempts: int = 3,
+        base_delay: float = 0.5,
+        max_delay: float = 8.0,
+    ):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def backoff(self, attempt: int) -> float:
+        # "Full jitter": espera aleatória entre 0 e o teto exponencial.
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+
+
+class RetryBudget:
+    """
+    Limita as novas tentativas a uma fração das chamadas recentes, para que
+    uma degradação do provedor não multiplique o tráfego.
+    """
+
+    def __init__(self, ratio: float = 0.2, capacity: float = 20.0):
+        self.ratio = ratio
+        self.capacity = capacity
+        self._tokens = capacity
+        self._lock = threading.Lock()
+
+    def deposit(self):
+        with self._lock:
+            self._tokens = min(self.capacity, self._tokens + self.ratio)
+
+    def withdraw(self) -> bool:
+        with self._lock:
+            if self._tokens < 1:
+                return False
+            self._tokens -= 1
+            return True
+
+    @property
+    def available(self) -> float:
+        return self._tokens
+
+
+default_policy = RetryPolicy(
+    max_attempts=int(os.getenv("LLM_RETRY_MAX_ATTEMPTS", 3)),
+    base_delay=float(os.getenv("LLM_RETRY_BASE_DELAY", 0.5)),
+    max_delay=float(os.getenv("LLM_RETRY_MAX_DELAY", 8.0)),
+)
+retry_budget = RetryBudget(
+    ratio=float(os.getenv("LLM_RETRY_BUDGET_RATIO", 0.2)),
+    capacity=float(os.getenv("LLM_RETRY_BUDGET_CAPACITY", 20)),
+)
+
+
+def _retry_after(headers) -> float:
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+def classify(exc: Exception):
+    """
+    Retorna o tipo de falha ("rate_limit", "transport", "server", "parse")
+    ou None quando não vale a pena tentar de novo.
+    """
+    if isinstance(exc, ProviderError):
+        if exc.status_code == 429:
+            return "rate_limit"
+        if exc.status_code is None or exc.status_code >= 500:
+            return "server"
+        return None
+    if isinstance(exc, groq.RateLimitError):
+        return "rate_limit"
+    if isinstance(exc, (groq.APIConnectionError, httpx.TransportError)):
+        return "transport"
+    if isinstance(exc, groq.APIStatusError):
+        return "server" if exc.status_code >= 500 else None
+    if isinstance(exc, (ValueError, SyntaxError, KeyError, IndexError, TypeError)):
+        return "parse"
+    return None
+
+
+_HEALTH_FAILURES = ("rate_limit", "transport", "server")
+
+
+def is_provider_failure(exc: Exception) -> bool:
+    """
+    Percorre a cadeia de exceções procurando uma falha do provedor
+    (indisponibilidade, limite de taxa ou circuito aberto).
+    """
+    seen = set()
+    while exc is not None and id(exc) not in seen:
+        seen.add(id(exc))
+        if isinstance(exc, CircuitOpenError) or classify(exc) in _HEALTH_FAILURES:
+            return True
+        exc = exc.__cause__ or exc.__context__
+    return False
+
+
+def _delay_for(kind: str, exc: Exception, attempt: int, policy: RetryPolicy) -> float:
+    delay = policy.backoff(attempt)
+    if kind == "rate_limit":
+        retry_after = getattr(exc, "retry_after", None)
+        response = getattr(exc, "response", None)
+        if retry_after is None and response is not None:
+            retry_after = _retry_after(response.headers)
+        if retry_after is not None:
+            delay = max(delay, retry_after)
+    return delay
+
+
+async def call_with_retry(
+    operation: str,
+    attempt_fn,
+    policy: RetryPolicy = None,
+    breaker: CircuitBreaker = None,
+):
+    """
+    Executa attempt_fn (uma tentativa completa: chamada ao provedor e parsing)
+    repetindo em falhas transitórias com backoff exponencial e jitter.
+    O estado das tentativas é local a cada chamada. Com um breaker, cada
+    tentativa passa pelo circuito do modelo e alimenta sua saúde.
+    """
+    policy = policy or default_policy
+    retry_budget.deposit()
+    metrics.increment(f"llm.calls.{operation}")
+
+    attempt = 1
+    while True:
+        if breaker is not None:
+            breaker.acquire()
+        queued = scheduler.track_queue_time()
+        started = time.perf_counter()
+        try:
+            result = await attempt_fn()
+            elapsed = time.perf_counter() - started - queued[0]
+            metrics.observe(f"llm.latency.{operation}", elapsed)
+            if breaker is not None:
+                breaker.record(True, elapsed)
+            return result
+        except asyncio.CancelledError:
+            if breaker is not None:
+                breaker.release()
+            raise
+        except Exception as e:
+            kind = classify(e)
+            if breaker is not None:
+                breaker.record(
+                    kind not in _HEALTH_FAILURES, time.perf_counter() - started - queued[0]
+                )
+            metrics.increment(f"llm.errors.{operation}.{kind or 'fatal'}")
+            if kind is None or attempt >= policy.max_attempts:
+                if attempt > 1:
+                    raise RetryError(operation, attempt, e) from e
+                raise
+            if not retry_budget.withdraw():
+                metrics.increment("llm.retry.budget_exhausted")
+                raise RetryError(operation, attempt, e) from e
+
+            delay = _delay_for(kind, e, attempt, policy)
+            metrics.increment(f"llm.retries.{operation}.{kind}")
+            logger.warning(
+                f"{operation}: tentativa {attempt} falhou ({kind}: {e}); "
+                f"nova tentativa em {delay:.2f}s"
+            )
+            await asyncio.sleep(delay)
+            attempt += 1
+
+
+async def complete_with_retry(
+    chat, messages: list, operation: str, parser=None, breaker: CircuitBreaker = None
+):
+    async def attempt():
+        content = await chat(messages)
+        return parser(content) if parser else content
+
+    return await call_with_retry(operation, attempt, breaker=breaker)
@@ -0,0 +1,190 @@
+import os
+import json
+import time
+import heapq
+import asyncio
+import itertools
+import contextvars
+
+from dotenv import load_dotenv
+from loguru import logger
+
+from services import metrics
+
+load_dotenv()
+
+PRIORITIES = {"interactive": 0, "default": 1, "bulk": 2}
+
+_priority = contextvars.ContextVar("llm_priority", default="default")
+_queued = contextvars.ContextVar("llm_queued", default=None)
+
+# Limites por provedor (requisições e tokens por minuto; 0 = sem limite).
+_PROVIDER_DEFAULTS = {
+    "groq": {"rpm": 30, "tpm": 6000},
+    "openrouter": {"rpm": 20, "tpm": 0},
+}
+
+
+def set_priority(level: str):
+    if level not in PRIORITIES:
+        raise ValueError(f"Prioridade desconhecida: {level}")
+    return _priority.set(level)
+
+
+def current_priority() -> str:
+    return _priority.get()
+
+
+def track_queue_time() -> list:
+    """
+    Passa a acumular, na lista retornada, o tempo que as chamadas deste
+    contexto passam na fila, para que não seja contado como latência do provedor.
+    """
+    box = [0.0]
+    _queued.set(box)
+    return box
+
+
+def estimate_tokens(messages: list) -> int:
+    """
+    Estimativa grosseira do custo de um prompt: ~4 caracteres por token,
+    mais a resposta esperada (LLM_COMPLETION_TOKEN_ESTIMATE).
+    """
+    chars = sum(len(m.get("content") or "") for m in messages)
+    return chars // 4 + 1 + int(os.getenv("LLM_COMPLETION_TOKEN_ESTIMATE", 256))
+
+
+class TokenBucket:
+    def __init__(self, per_minute: float, clock=time.monotonic):
+        self.capacity = per_minute
+        self.rate = per_minute / 60.0
+        self.tokens = per_minute
+        self.clock = clock
+        self.updated = clock()
+
+    def _refill(self):
+        now = self.clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, cost: float) -> float:
+        if not self.capacity:
+            return 0.0
+        self._refill()
+        cost = min(cost, self.capacity)
+        return 0.0 if self.tokens >= cost else (cost - self.tokens) / self.rate
+
+    def consume(self, cost: float):
+        if self.capacity:
+            self.tokens -= min(cost, self.capacity)
+
+
+class RateLimiter:
+    """
+    Fila de um modelo: libera as chamadas por prioridade (e ordem de
+    chegada) quando os buckets de requisições e de tokens permitem.
+    """
+
+    def __init__(self, name: str, rpm: float, tpm: float, clock=time.monotonic):
+        self.name = name
+        self.clock = clock
+        self.requests = TokenBucket(rpm, clock)
+        self.tokens = TokenBucket(tpm, clock)
+        self._queue = []
+        self._seq = itertools.count()
+        self._changed = asyncio.Condition()
+
+    @property
+    def depth(self) -> int:
+        return len(self._queue)
+
+    def _wait_time(self, cost: int) -> float:
+        return max(self.requests.wait_time(1), self.tokens.wait_time(cost))
+
+    async def _wait(self, timeout):
+        """Espera uma mudança na fila ou até timeout segundos (None = sem limite)."""
+        try:
+            await asyncio.wait_for(self._changed.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+
+    async def acquire(self, cost: int, priority: str):
+        entry = (PRIORITIES[priority], next(self._seq), cost)
+        started = self.clock()
+        async with self._changed:
+            heapq.heappush(self._queue, entry)
+            metrics.set_gauge(f"llm.scheduler.queue.{self.name}", len(self._queue))
+            try:
+                while True:
+                    timeout = None
+                    if self._queue[0] is entry:
+                        timeout = self._wait_time(cost)
+                        if timeout == 0:
+                            heapq.heappop(self._queue)
+                            self.requests.consume(1)
+                            self.tokens.consume(cost)
+                            break
+                    await self._wait(timeout)
+            except BaseException:
+                if entry in self._queue:
+                    self._queue.remove(entry)
+                    heapq.heapify(self._queue)
+                raise
+            finally:
+                metrics.set_gauge(f"llm.scheduler.queue.{self.name}", len(self._queue))
+                self._changed.notify_all()
+
+        waited = self.clock() - started
+        box = _queued.get()
+        if box is not None:
+            box[0] += waited
+        metrics.observe(f"llm.scheduler.wait.{priority}", waited)
+        if waited > 1:
+            logger.info(f"{self.name}: chamada {priority} aguardou {waited:.1f}s na fila")
+
+    def snapshot(self) -> dict:
+        return {
+            "queue_depth": self.depth,
+            "rpm": self.requests.capacity,
+            "tpm": self.tokens.capacity,
+            "requests_available": round(self.requests.tokens, 2),
+            "tokens_available": round(self.tokens.tokens, 2),
+        }
+
+
+_limiters: dict = {}
+
+
+def _limits(provider: str, model: str) -> dict:
+    defaults = _PROVIDER_DEFAULTS.get(provider, {"rpm": 0, "tpm": 0})
+    prefix = provider.upper()
+    limits = {
+        "rpm": float(os.getenv(f"{prefix}_RPM", defaults["rpm"])),
+        "tpm": float(os.getenv(f"{prefix}_TPM", defaults["tpm"])),
+    }
+    try:
+        overrides = json.loads(os.getenv("LLM_RATE_LIMITS", "{}"))
+    except ValueError:
+        logger.warning("LLM_RATE_LIMITS inválido; usando os limites do provedor.")
+        overrides = {}
+    limits.update(overrides.get(model, {}))
+    return limits
+
+
+def get_limiter(provider: str, model: str) -> RateLimiter:
+    limiter = _limiters.get(model)
+    if limiter is None:
+        limits = _limits(provider, model)
+        limiter = _limiters.setdefault(model, RateLimiter(model, limits["rpm"], limits["tpm"]))
+    return limiter
+
+
+async def acquire(provider: str, model: str, messages: list):
+    """Aguarda a vez desta chamada ao modelo, respeitando RPM/TPM e prioridade."""
+    if os.getenv("LLM_SCHEDULER", "true").lower() not in ("1", "true", "yes"):
+        return
+    await get_limiter(provider, model).acquire(estimate_tokens(messages), current_priority())
+
+
+def snapshot() -> dict:
+    return {name: limiter.snapshot() for name, limiter in _limiters.items()}
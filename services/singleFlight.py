@@ -0,0 +1,86 @@
+import os
+import json
+import asyncio
+import hashlib
+import functools
+
+from services import metrics
+
+
+class SingleFlight:
+    """
+    Agrupa chamadas concorrentes com a mesma chave em uma única tarefa.
+    A tarefa só é cancelada quando todos que a aguardam desistem.
+    """
+
+    def __init__(self):
+        self._tasks = {}
+        self._waiters = {}
+
+    def __len__(self) -> int:
+        return len(self._tasks)
+
+    async def do(self, key: str, fn):
+        task = self._tasks.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._tasks[key] = task
+            self._waiters[key] = 0
+            task.add_done_callback(lambda t: self._forget(key, t))
+            metrics.increment("llm.coalesce.leader")
+        else:
+            metrics.increment("llm.coalesce.shared")
+        metrics.set_gauge("llm.coalesce.inflight", len(self._tasks))
+
+        self._waiters[key] += 1
+        try:
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            if self._waiters.get(key) == 1 and not task.done():
+                # Sai do mapa antes de cancelar: quem chegar com a mesma chave
+                # enquanto a tarefa morre começa um voo novo em vez de herdar
+                # um CancelledError que não pediu.
+                del self._tasks[key]
+                del self._waiters[key]
+                metrics.set_gauge("llm.coalesce.inflight", len(self._tasks))
+                task.cancel()
+            raise
+        finally:
+            if key in self._waiters and self._tasks.get(key) is task:
+                self._waiters[key] -= 1
+
+    def _forget(self, key: str, task):
+        if self._tasks.get(key) is task:
+            del self._tasks[key]
+            del self._waiters[key]
+        if not task.cancelled():
+            # Evita o aviso de exceção nunca lida quando todos desistiram.
+            task.exception()
+
+
+_flights = SingleFlight()
+
+
+def prompt_key(model: str, messages: list) -> str:
+    payload = json.dumps({"model": model, "messages": messages}, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def coalescing_enabled() -> bool:
+    return os.getenv("LLM_COALESCING", "true").lower() in ("1", "true", "yes")
+
+
+def coalesced(chat):
+    """
+    Decora o _chat de um provedor: requisições simultâneas com o mesmo
+    modelo e as mesmas mensagens compartilham uma única chamada upstream.
+    """
+
+    @functools.wraps(chat)
+    async def wrapper(self, messages):
+        if not coalescing_enabled():
+            return await chat(self, messages)
+        model = getattr(self, "model", None) or getattr(self, "model_name", "")
+        return await _flights.do(prompt_key(model, messages), lambda: chat(self, messages))
+
+    return wrapper
@@ -0,0 +1,291 @@
+import os
+import re
+import json
+import math
+import asyncio
+import threading
+import unicodedata
+from functools import lru_cache
+
+from dotenv import load_dotenv
+from loguru import logger
+
+load_dotenv()
+
+# Ordem de w1..w8 na fórmula de score de get_weights.
+FEATURES = (
+    "execution_time",
+    "cpu_usage",
+    "io_usage",
+    "rows_read",
+    "execution_frequency",
+    "table_size",
+    "tables_without_index",
+    "join_collisions",
+)
+# Chaves em português que o prompt do provedor Groq pede ao LLM.
+_ALIASES = {
+    "tempo_execucao": "execution_time",
+    "uso_cpu": "cpu_usage",
+    "uso_io": "io_usage",
+    "linhas_lidas": "rows_read",
+    "frequencia_execucao": "execution_frequency",
+    "tamanho_tabela": "table_size",
+    "tabelas_sem_indice": "tables_without_index",
+    "colisoes_em_join": "join_collisions",
+}
+
+RAM_BANDS = (4, 16, 64, 256)
+PRIORITIES = ("balanced", "latency", "throughput", "cpu", "io", "memory")
+
+# Perfil equilibrado por faixa de RAM: com pouca memória o working set não
+# cabe no cache e I/O, linhas lidas e tamanho das tabelas pesam mais; com
+# muita memória o custo migra para tempo de execução e CPU.
+_BALANCED = {
+    4: (0.15, 0.08, 0.22, 0.16, 0.10, 0.12, 0.10, 0.07),
+    16: (0.18, 0.11, 0.17, 0.14, 0.12, 0.09, 0.11, 0.08),
+    64: (0.21, 0.14, 0.12, 0.12, 0.14, 0.07, 0.11, 0.09),
+    256: (0.24, 0.17, 0.08, 0.10, 0.15, 0.05, 0.11, 0.10),
+}
+# Multiplicadores aplicados ao perfil equilibrado para cada prioridade.
+_FACTORS = {
+    "balanced": {},
+    "latency": {
+        "execution_time": 1.8,
+        "tables_without_index": 1.3,
+        "join_collisions": 1.3,
+        "execution_frequency": 0.8,
+        "table_size": 0.7,
+    },
+    "throughput": {
+        "execution_frequency": 1.8,
+        "cpu_usage": 1.3,
+        "rows_read": 1.2,
+        "execution_time": 0.8,
+    },
+    "cpu": {"cpu_usage": 2.0, "join_collisions": 1.3, "io_usage": 0.8},
+    "io": {
+        "io_usage": 2.0,
+        "rows_read": 1.4,
+        "table_size": 1.3,
+        "tables_without_index": 1.2,
+        "cpu_usage": 0.8,
+    },
+    "memory": {"table_size": 1.6, "rows_read": 1.4, "join_collisions": 1.3, "io_usage": 1.2},
+}
+# Radicais (sem acento) que identificam cada prioridade no texto livre.
+_KEYWORDS = {
+    "latency": ("latenc", "respost", "response", "rapid", "veloc", "speed", "oltp", "interativ"),
+    "throughput": (
+        "throughput", "vazao", "batch", "lote", "olap", "analit", "analyt",
+        "relatori", "report", "concorr", "concurr",
+    ),
+    "cpu": ("cpu", "processament", "processing", "comput"),
+    "io": ("io", "i/o", "disco", "disk", "storage", "armazenament"),
+    "memory": ("memori", "memory", "ram"),
+    "balanced": ("equilibr", "balanc", "geral", "general"),
+}
+# Descrições usadas ao pedir ao LLM que preencha a tabela (seed_table).
+_DESCRIPTIONS = {
+    "balanced": "equilíbrio geral entre latência, throughput e uso de recursos",
+    "latency": "baixa latência nas consultas",
+    "throughput": "alto throughput e muitas execuções concorrentes",
+    "cpu": "economizar CPU",
+    "io": "reduzir I/O de disco",
+    "memory": "reduzir o uso de memória",
+}
+
+_table = None
+_table_lock = threading.Lock()
+
+
+def _table_path():
+    return os.getenv("WEIGHTS_TABLE_PATH")
+
+
+def normalize_weights(raw: dict) -> dict:
+    """
+    Valida um conjunto de pesos (chaves em inglês ou português), rejeitando
+    ausentes, negativos ou não finitos, e reescala para somar exatamente 1.0.
+    """
+    if not isinstance(raw, dict):
+        raise ValueError("Os pesos devem ser um objeto JSON.")
+    values = {}
+    for key, value in raw.items():
+        feature = _ALIASES.get(key, key)
+        if feature not in FEATURES:
+            continue
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            raise ValueError(f"Peso inválido para {key}: {value!r}")
+        if not math.isfinite(value) or value < 0:
+            raise ValueError(f"Peso inválido para {key}: {value!r}")
+        values[feature] = float(value)
+
+    missing = [feature for feature in FEATURES if feature not in values]
+    if missing:
+        raise ValueError(f"Pesos ausentes: {', '.join(missing)}")
+    total = sum(values.values())
+    if total <= 0:
+        raise ValueError("A soma dos pesos deve ser maior que zero.")
+
+    weights = {feature: round(values[feature] / total, 4) for feature in FEATURES}
+    # O arredondamento pode deixar a soma em 0.9999/1.0001: o resíduo vai para o maior peso.
+    largest = max(FEATURES, key=weights.get)
+    weights[largest] = round(weights[largest] + 1.0 - sum(weights.values()), 4)
+    return weights
+
+
+def _default_table() -> dict:
+    table = {}
+    for priority, factors in _FACTORS.items():
+        table[priority] = {}
+        for band, base in _BALANCED.items():
+            raw = {
+                feature: weight * factors.get(feature, 1.0)
+                for feature, weight in zip(FEATURES, base)
+            }
+            table[priority][band] = normalize_weights(raw)
+    return table
+
+
+def _load_table(path: str) -> dict:
+    table = _default_table()
+    if not path or not os.path.exists(path):
+        return table
+    try:
+        with open(path, encoding="utf-8") as handle:
+            seeded = json.load(handle)
+        for priority, bands in seeded.items():
+            for band, weights in bands.items():
+                if priority in table and int(band) in table[priority]:
+                    table[priority][int(band)] = normalize_weights(weights)
+        logger.info(f"Tabela de pesos carregada de {path}.")
+    except (OSError, ValueError) as e:
+        logger.warning(f"Tabela de pesos inválida em {path}; usando a padrão: {e}")
+        return _default_table()
+    return table
+
+
+def get_table() -> dict:
+    """Tabela {prioridade: {faixa de RAM: pesos}}; carrega WEIGHTS_TABLE_PATH na primeira chamada."""
+    global _table
+    if _table is None:
+        with _table_lock:
+            if _table is None:
+                _table = _load_table(_table_path())
+    return _table
+
+
+@lru_cache(maxsize=1024)
+def match_priorities(priority: str = None) -> tuple:
+    """Prioridades conhecidas citadas no texto livre; sem nenhuma, 'balanced'."""
+    if not priority:
+        return ("balanced",)
+    text = unicodedata.normalize("NFKD", priority.lower())
+    text = "".join(c for c in text if not unicodedata.combining(c))
+    words = re.findall(r"i/o|[a-z0-9]+", text)
+    found = tuple(
+        name
+        for name in PRIORITIES
+        if any(
+            word == stem or (len(stem) > 3 and word.startswith(stem))
+            for word in words
+            for stem in _KEYWORDS[name]
+        )
+    )
+    return found or ("balanced",)
+
+
+def _interpolate(cells: dict, ram_gb: float) -> list:
+    bands = sorted(cells)
+    if ram_gb <= bands[0]:
+        return [cells[bands[0]][f] for f in FEATURES]
+    if ram_gb >= bands[-1]:
+        return [cells[bands[-1]][f] for f in FEATURES]
+    for low, high in zip(bands, bands[1:]):
+        if ram_gb <= high:
+            # As faixas crescem em escala geométrica: interpola em log2 da RAM.
+            t = (math.log2(ram_gb) - math.log2(low)) / (math.log2(high) - math.log2(low))
+            return [(1 - t) * cells[low][f] + t * cells[high][f] for f in FEATURES]
+
+
+@lru_cache(maxsize=int(os.getenv("WEIGHTS_CACHE_SIZE", 1024)))
+def _weights(ram_gb: float, priorities: tuple) -> tuple:
+    table = get_table()
+    totals = [0.0] * len(FEATURES)
+    for priority in priorities:
+        for i, value in enumerate(_interpolate(table[priority], ram_gb)):
+            totals[i] += value
+    weights = normalize_weights(dict(zip(FEATURES, totals)))
+    return tuple(weights.items())
+
+
+def get_weights(ram_gb: float = None, priority: str = None) -> dict:
+    """
+    Pesos w1..w8 do score de custo para a RAM e a prioridade informadas,
+    interpolados na tabela local (sem chamar o LLM). Várias prioridades
+    no texto são combinadas pela média; sem RAM usa WEIGHTS_DEFAULT_RAM_GB.
+    """
+    if ram_gb is None:
+        ram_gb = float(os.getenv("WEIGHTS_DEFAULT_RAM_GB", 16))
+    if ram_gb <= 0:
+        raise ValueError("ram_gb deve ser maior que zero.")
+    return dict(_weights(float(ram_gb), match_priorities(priority)))
+
+
+def cache_info() -> dict:
+    info = _weights.cache_info()
+    return {"hits": info.hits, "misses": info.misses, "size": info.currsize}
+
+
+def parse_llm_weights(text: str) -> dict:
+    """Extrai e normaliza o objeto de pesos de uma resposta do LLM, ignorando texto ao redor."""
+    cleaned = re.sub(r"```(?:json)?", "", text)
+    match = re.search(r"\{.*\}", cleaned, re.DOTALL)
+    if not match:
+        raise ValueError(f"Resposta do LLM sem objeto JSON: {text[:50]}...")
+    return normalize_weights(json.loads(match.group()))
+
+
+async def seed_table(llm, path: str = None) -> dict:
+    """
+    Preenche a tabela pedindo ao LLM os pesos de cada faixa de RAM e
+    prioridade, e grava o resultado em path (WEIGHTS_TABLE_PATH). Roda
+    offline; células com resposta inválida mantêm os pesos padrão.
+    """
+    global _table
+    path = path or _table_path()
+    if not path:
+        raise ValueError("Informe o arquivo da tabela de pesos (WEIGHTS_TABLE_PATH).")
+    table = _default_table()
+    for priority in PRIORITIES:
+        for band in RAM_BANDS:
+            try:
+                text = await llm.get_weights(ram_gb=band, priority=_DESCRIPTIONS[priority])
+                table[priority][band] = parse_llm_weights(text)
+            except Exception as e:
+                logger.warning(f"Pesos do LLM descartados ({priority}, {band}GB): {e}")
+
+    with open(path, "w", encoding="utf-8") as handle:
+        json.dump(table, handle, indent=2)
+    with _table_lock:
+        _table = table
+    _weights.cache_clear()
+    logger.info(f"Tabela de pesos gravada em {path}.")
+    return table
+
+
+async def _seed_offline(model_name: str):
+    from services import httpClient, llmRouter
+
+    try:
+        await seed_table(llmRouter.get_llm(model_name))
+    finally:
+        await llmRouter.shutdown()
+        await httpClient.shutdown()
+
+
+if __name__ == "__main__":
+    import sys
+
+    asyncio.run(_seed_offline(sys.argv[1] if len(sys.argv) > 1 else "default"))
@@ -0,0 +1,86 @@
+import os
+import sys
+import json
+import asyncio
+
+import httpx
+import pytest
+
+# Os testes importam os módulos da raiz (services, helpers, routes) sem instalar o pacote.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("LLM_WARMUP", "false")
+
+PROVIDER_DELAY = 0.2
+
+
+class FakeProviders:
+    """
+    Groq e OpenRouter respondendo por um MockTransport: cada chamada leva
+    PROVIDER_DELAY sem bloquear o loop e devolve reply(prompt do usuário).
+    """
+
+    def __init__(self):
+        self.calls = {}
+        self.reply = lambda prompt: "ok"
+
+    async def handler(self, request: httpx.Request) -> httpx.Response:
+        body = json.loads(request.content)
+        self.calls[body["model"]] = self.calls.get(body["model"], 0) + 1
+        await asyncio.sleep(PROVIDER_DELAY)
+        content = self.reply(body["messages"][-1]["content"])
+        return httpx.Response(
+            200,
+            json={
+                "id": "chatcmpl-test",
+                "object": "chat.completion",
+                "created": 0,
+                "model": body["model"],
+                "choices": [
+                    {
+                        "index": 0,
+                        "message": {"role": "assistant", "content": content},
+                        "finish_reason": "stop",
+                    }
+                ],
+            },
+        )
+
+
+@pytest.fixture
+def fake_providers(monkeypatch):
+    """
+    Provedores falsos atrás do registro real do llmRouter; os pedidos vão
+    para o app por ASGITransport, sem o lifespan (sem Qdrant nem warmup).
+    """
+    from services import groq, httpClient, llmRouter
+
+    providers = FakeProviders()
+    transport = httpx.MockTransport(providers.handler)
+    real_groq = groq.AsyncGroq
+    monkeypatch.setenv("LLM_SCHEDULER", "false")
+    monkeypatch.setattr(llmRouter, "_registry", {})
+    monkeypatch.setattr(httpClient, "_client", None)
+    monkeypatch.setattr(
+        httpClient, "_build_client", lambda: httpx.AsyncClient(transport=transport)
+    )
+    monkeypatch.setattr(
+        groq,
+        "AsyncGroq",
+        lambda **kwargs: real_groq(**kwargs, http_client=httpx.AsyncClient(transport=transport)),
+    )
+    yield providers
+    asyncio.run(llmRouter.shutdown())
+    asyncio.run(httpClient.shutdown())
+
+
+@pytest.fixture
+def api(fake_providers, monkeypatch):
+    """Fábrica de clientes do app (criar dentro do loop de cada teste)."""
+    from main import app
+
+    monkeypatch.setenv("API_KEY", "test-key")
+    return lambda: httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app),
+        base_url="http://test",
+        headers={"X-API-Key": "test-key"},
+    )
@@ -0,0 +1,77 @@
+import time
+import asyncio
+
+import pytest
+
+from conftest import PROVIDER_DELAY
+from services.llmRouter import model_id, _provider, resolve_model
+
+N = 8
+MODELS = ["default", "groq", "mistral", "gemma", "hermes", "desconhecido"]
+
+
+def analysis_request(i: int) -> dict:
+    # Queries distintas: pedidos iguais seriam coalescidos pelo singleFlight.
+    return {
+        "original_metrics": {"execution_time_ms": 120 + i},
+        "optimized_metrics": {"execution_time_ms": 12 + i},
+        "original_query": f"SELECT * FROM orders WHERE user_id = {i}",
+        "optimized_query": f"SELECT id, total FROM orders WHERE user_id = {i}",
+        "applied_indexes": ["CREATE INDEX idx_orders_user ON orders (user_id)"],
+    }
+
+
+@pytest.mark.parametrize("model_name", MODELS)
+def test_concurrent_analyze_overlaps(api, fake_providers, model_name):
+    fake_providers.reply = lambda prompt: "Análise: o índice evita o full scan."
+
+    async def run():
+        async with api() as client:
+            started = time.perf_counter()
+            responses = await asyncio.gather(
+                *(
+                    client.post(
+                        "/optimizer/analyze",
+                        params={"model_name": model_name},
+                        json=analysis_request(i),
+                    )
+                    for i in range(N)
+                )
+            )
+            return responses, time.perf_counter() - started
+
+    responses, elapsed = asyncio.run(run())
+
+    assert [response.status_code for response in responses] == [200] * N
+    assert all(response.json()["analysis"] for response in responses)
+    # Nomes desconhecidos (e "groq") caem no modelo padrão.
+    model = model_id(_provider(resolve_model(model_name)))
+    assert fake_providers.calls == {model: N}
+    # Em série seriam N * PROVIDER_DELAY; em paralelo, perto de uma única chamada.
+    assert elapsed < PROVIDER_DELAY * 2.5
+
+
+def test_concurrent_analyze_across_all_models(api, fake_providers):
+    async def run():
+        async with api() as client:
+            started = time.perf_counter()
+            responses = await asyncio.gather(
+                *(
+                    client.post(
+                        "/optimizer/analyze",
+                        params={"model_name": model_name},
+                        json=analysis_request(position * N + i),
+                    )
+                    for position, model_name in enumerate(MODELS)
+                    for i in range(N)
+                )
+            )
+            return responses, time.perf_counter() - started
+
+    responses, elapsed = asyncio.run(run())
+
+    assert [response.status_code for response in responses] == [200] * N * len(MODELS)
+    # default, groq e o nome desconhecido caem todos no Groq.
+    assert fake_providers.calls["llama-3.1-8b-instant"] == N * 3
+    assert sum(fake_providers.calls.values()) == N * len(MODELS)
+    assert elapsed < PROVIDER_DELAY * 2.5
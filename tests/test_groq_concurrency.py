@@ -0,0 +1,47 @@
+import time
+import asyncio
+
+import pytest
+
+from conftest import PROVIDER_DELAY
+
+N = 10
+SCHEMA = (
+    "CREATE TABLE users (id INT PRIMARY KEY, email VARCHAR(80));\n"
+    "CREATE TABLE orders (id INT PRIMARY KEY, user_id INT, total DECIMAL(10,2), "
+    "FOREIGN KEY (user_id) REFERENCES users(id));"
+)
+REPLY = '["CREATE INDEX idx_orders_user ON orders (user_id);", "SELECT id, total FROM orders WHERE user_id = 1;"]'
+
+
+@pytest.mark.parametrize("model_name", ["default", "mistral"])
+def test_parallel_generate_requests_overlap(api, fake_providers, model_name):
+    fake_providers.reply = lambda prompt: REPLY
+
+    async def run():
+        async with api() as client:
+            started = time.perf_counter()
+            responses = await asyncio.gather(
+                *(
+                    client.post(
+                        "/optimizer/generate",
+                        params={"model_name": model_name},
+                        headers={"X-Cache-Bypass": "true"},
+                        json={
+                            # Queries distintas: iguais seriam coalescidas em uma chamada.
+                            "query": f"SELECT * FROM orders WHERE user_id = {i} /* {model_name} */",
+                            "database_structure": SCHEMA,
+                        },
+                    )
+                    for i in range(N)
+                )
+            )
+            return responses, time.perf_counter() - started
+
+    responses, elapsed = asyncio.run(run())
+
+    assert [response.status_code for response in responses] == [200] * N
+    assert all(len(response.json()["result"]) == 2 for response in responses)
+    assert sum(fake_providers.calls.values()) == N
+    # Em série seriam N * PROVIDER_DELAY; em paralelo, perto de uma única chamada.
+    assert elapsed < PROVIDER_DELAY * 2.5
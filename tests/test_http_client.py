@@ -0,0 +1,83 @@
+import time
+import asyncio
+
+import httpx
+import pytest
+
+from services import httpClient
+
+N = 20
+DELAY = 0.05
+
+
+@pytest.fixture
+def mock_transport(monkeypatch):
+    """Cliente compartilhado real, mas respondendo por um MockTransport com latência fixa."""
+    built = []
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        await asyncio.sleep(DELAY)
+        return httpx.Response(200, json={"path": request.url.path})
+
+    real_client = httpx.AsyncClient
+
+    def build(*args, **kwargs):
+        client = real_client(*args, transport=httpx.MockTransport(handler), **kwargs)
+        built.append(client)
+        return client
+
+    monkeypatch.setattr(httpClient.httpx, "AsyncClient", build)
+    monkeypatch.setattr(httpClient, "_client", None)
+    yield built
+    asyncio.run(httpClient.shutdown())
+
+
+def test_concurrent_calls_share_one_client(mock_transport):
+    async def call(i):
+        client = httpClient.get_http_client()
+        response = await client.get(f"https://example.test/{i}")
+        return client, response
+
+    async def run():
+        await httpClient.startup()
+        before = httpClient.pool_stats()["requests_total"]
+        started = time.perf_counter()
+        results = await asyncio.gather(*(call(i) for i in range(N)))
+        return results, time.perf_counter() - started, before
+
+    results, elapsed, before = asyncio.run(run())
+
+    assert len(mock_transport) == 1
+    assert {id(client) for client, _ in results} == {id(mock_transport[0])}
+    assert [response.json()["path"] for _, response in results] == [f"/{i}" for i in range(N)]
+    assert httpClient.pool_stats()["requests_total"] - before == N
+    # As chamadas se sobrepõem: N em paralelo levam perto do tempo de uma.
+    assert elapsed < DELAY * N / 4
+
+
+def test_shutdown_closes_shared_client(mock_transport):
+    async def run():
+        await httpClient.startup()
+        client = httpClient.get_http_client()
+        await client.get("https://example.test/")
+        await httpClient.shutdown()
+        return client
+
+    client = asyncio.run(run())
+
+    assert client.is_closed
+    assert httpClient._client is None
+    assert httpClient.pool_stats()["open"] is False
+
+
+def test_closed_client_is_rebuilt_on_demand(mock_transport):
+    async def run():
+        first = httpClient.get_http_client()
+        await httpClient.shutdown()
+        return first, httpClient.get_http_client()
+
+    first, second = asyncio.run(run())
+
+    assert first.is_closed
+    assert second is not first and not second.is_closed
+    assert len(mock_transport) == 2
@@ -0,0 +1,29 @@
+import asyncio
+
+import pytest
+
+SCHEMA = "CREATE TABLE users (id INT PRIMARY KEY, email VARCHAR(50));"
+
+
+def batch(queries, **extra):
+    return {"database_structure": SCHEMA, "queries": queries, **extra}
+
+
+@pytest.mark.parametrize(
+    "payload",
+    [
+        batch([]),
+        batch([f"SELECT * FROM users WHERE id = {i}" for i in range(101)]),
+        batch(["SELECT * FROM users"], concurrency=0),
+    ],
+    ids=["empty", "too-many", "zero-concurrency"],
+)
+def test_batch_limits_are_rejected_before_any_llm_call(api, fake_providers, payload):
+    async def post():
+        async with api() as client:
+            return await client.post("/optimizer/generate/batch", json=payload)
+
+    response = asyncio.run(post())
+
+    assert response.status_code == 422
+    assert fake_providers.calls == {}
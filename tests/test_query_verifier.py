@@ -0,0 +1,78 @@
+import pytest
+
+from services import queryVerifier
+
+DDL = [
+    "CREATE TABLE users (id INT AUTO_INCREMENT PRIMARY KEY, email VARCHAR(50), age INT)",
+    "CREATE TABLE orders (id INT AUTO_INCREMENT PRIMARY KEY, user_id INT, total DECIMAL(10,2), "
+    "FOREIGN KEY (user_id) REFERENCES users(id))",
+]
+QUERY = "SELECT id FROM orders WHERE total > 100"
+
+
+def verify(query=QUERY, indexes=None):
+    return queryVerifier.verify(DDL, query, indexes=indexes, number_insertions=200, repeat=1)
+
+
+@pytest.mark.parametrize(
+    "statement",
+    [
+        "ATTACH DATABASE '{path}' AS pwn",
+        "SELECT 1; ATTACH DATABASE '{path}' AS pwn",
+        "VACUUM INTO '{path}'",
+    ],
+)
+def test_user_sql_cannot_create_files(tmp_path, statement):
+    path = tmp_path / "pwn.db"
+    result = verify(statement.format(path=path), indexes=[statement.format(path=path)])
+
+    assert "error" in result["original_metrics"]
+    assert result["applied_indexes"] == []
+    assert not path.exists()
+
+
+@pytest.mark.parametrize(
+    "query",
+    [
+        "PRAGMA writable_schema = 1",
+        "SELECT * FROM pragma_table_info('users')",
+        "DROP TABLE orders",
+        "CREATE TABLE x (a INT)",
+        "COMMIT",
+    ],
+)
+def test_measure_allows_only_reads_and_dml(query):
+    assert "error" in verify(query)["original_metrics"]
+
+
+def test_measure_runs_reads_dml_and_recursive_ctes():
+    assert verify()["original_metrics"]["runs"] == 1
+    assert verify("UPDATE orders SET total = total + 1 WHERE id <= 10;")["original_metrics"]["rows"] == 10
+    cte = "WITH RECURSIVE r(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM r WHERE x < 5) SELECT x FROM r"
+    assert verify(cte)["original_metrics"]["rows"] == 5
+    assert "error" not in verify("SELECT ';' FROM users WHERE email <> 'a;b'")["original_metrics"]
+
+
+def test_only_create_index_statements_are_applied():
+    indexes = [
+        "CREATE INDEX idx_total ON orders (total)",
+        "ALTER TABLE orders ADD INDEX (user_id, total)",
+        "CREATE INDEX idx_email ON users (lower(email))",
+        "CREATE INDEX idx_age ON users (age); DROP TABLE users",
+        "DROP TABLE orders",
+        "REINDEX",
+    ]
+    result = verify(indexes=indexes)
+
+    assert result["applied_indexes"] == indexes[:3]
+    assert [failed["statement"] for failed in result["failed_indexes"]] == indexes[3:]
+    assert "error" not in result["runs"]["original"]["with_indexes"]
+
+
+def test_cached_database_is_reused():
+    verify("DELETE FROM orders")
+    result = verify("SELECT COUNT(*) FROM orders")
+
+    assert result["load_time_ms"] is None
+    assert result["tables"]["orders"] == 200
+    assert "error" not in result["original_metrics"]
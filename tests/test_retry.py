@@ -0,0 +1,137 @@
+import asyncio
+
+import httpx
+import pytest
+
+from services import metrics, retry
+from services.retry import ProviderError, RetryBudget, RetryError, RetryPolicy, call_with_retry
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    """asyncio.sleep do motor de retry sem esperar de verdade; guarda os atrasos."""
+    delays = []
+
+    async def fake_sleep(delay):
+        delays.append(delay)
+
+    monkeypatch.setattr(retry.asyncio, "sleep", fake_sleep)
+    monkeypatch.setattr(retry, "retry_budget", RetryBudget())
+    return delays
+
+
+class FakeBreaker:
+    def __init__(self):
+        self.records = []
+
+    def acquire(self):
+        pass
+
+    def release(self):
+        pass
+
+    def record(self, success: bool, latency: float = None):
+        self.records.append(success)
+
+
+def attempts(*outcomes):
+    """attempt_fn que levanta ou retorna cada resultado em sequência."""
+    calls = []
+
+    async def attempt_fn():
+        outcome = outcomes[len(calls)]
+        calls.append(outcome)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    return attempt_fn, calls
+
+
+def run(operation, attempt_fn, **kwargs):
+    kwargs.setdefault("policy", RetryPolicy(max_attempts=3, base_delay=0.01, max_delay=0.05))
+    return asyncio.run(call_with_retry(operation, attempt_fn, **kwargs))
+
+
+def test_rate_limit_waits_for_retry_after(sleeps):
+    attempt_fn, calls = attempts(ProviderError("limite", status_code=429, retry_after=7), "ok")
+
+    assert run("test.rate_limit", attempt_fn) == "ok"
+    assert len(calls) == 2
+    assert sleeps == [7]
+
+
+def test_transport_errors_are_retried_with_backoff(sleeps):
+    attempt_fn, calls = attempts(httpx.ConnectError("recusada"), httpx.ReadTimeout("lenta"), "ok")
+
+    assert run("test.transport", attempt_fn) == "ok"
+    assert len(calls) == 3
+    assert len(sleeps) == 2 and all(0 <= delay <= 0.05 for delay in sleeps)
+
+
+def test_client_errors_are_not_retried(sleeps):
+    error = ProviderError("requisição inválida", status_code=400)
+    attempt_fn, calls = attempts(error, "ok")
+
+    with pytest.raises(ProviderError) as raised:
+        run("test.client_error", attempt_fn)
+    assert raised.value is error
+    assert len(calls) == 1
+    assert sleeps == []
+
+
+def test_parse_failures_retry_without_hurting_breaker_health(sleeps):
+    breaker = FakeBreaker()
+    attempt_fn, calls = attempts(ValueError("saída inválida"), "ok")
+
+    assert run("test.parse", attempt_fn, breaker=breaker) == "ok"
+    assert len(calls) == 2
+    # O provedor respondeu: o erro de parsing conta como sucesso para o circuito.
+    assert breaker.records == [True, True]
+
+
+def test_provider_failures_feed_breaker_health(sleeps):
+    breaker = FakeBreaker()
+    attempt_fn, _ = attempts(ProviderError("fora do ar", status_code=503), "ok")
+
+    assert run("test.server", attempt_fn, breaker=breaker) == "ok"
+    assert breaker.records == [False, True]
+
+
+def test_exhausted_budget_stops_retrying(sleeps, monkeypatch):
+    monkeypatch.setattr(retry, "retry_budget", RetryBudget(ratio=0, capacity=1))
+    before = metrics.snapshot()["counters"].get("llm.retry.budget_exhausted", 0)
+    attempt_fn, calls = attempts(*[httpx.ConnectError("recusada")] * 5)
+
+    with pytest.raises(RetryError) as raised:
+        run("test.budget", attempt_fn, policy=RetryPolicy(max_attempts=5, base_delay=0.01))
+    assert raised.value.attempts == 2
+    assert len(calls) == 2
+    assert metrics.snapshot()["counters"]["llm.retry.budget_exhausted"] == before + 1
+
+
+def test_no_retry_after_max_attempts(sleeps):
+    attempt_fn, calls = attempts(*[ProviderError("fora do ar", status_code=502)] * 5)
+
+    with pytest.raises(RetryError) as raised:
+        run("test.max_attempts", attempt_fn)
+    assert raised.value.attempts == 3
+    assert isinstance(raised.value.last_error, ProviderError)
+    assert len(calls) == 3
+    assert len(sleeps) == 2
+
+
+def test_retry_and_error_counters_are_exported(sleeps):
+    attempt_fn, _ = attempts(
+        httpx.ConnectError("recusada"),
+        ProviderError("limite", status_code=429, retry_after=1),
+        "ok",
+    )
+
+    run("test.counters", attempt_fn)
+    counters = metrics.snapshot()["counters"]
+    assert counters["llm.calls.test.counters"] == 1
+    assert counters["llm.errors.test.counters.transport"] == 1
+    assert counters["llm.errors.test.counters.rate_limit"] == 1
+    assert counters["llm.retries.test.counters.transport"] == 1
+    assert counters["llm.retries.test.counters.rate_limit"] == 1
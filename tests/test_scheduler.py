@@ -0,0 +1,151 @@
+import asyncio
+
+import pytest
+
+from dependencies import with_priority
+from services import scheduler
+
+MODEL = "test-model"
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class ManualLimiter(scheduler.RateLimiter):
+    """O tempo só anda quando o teste chama tick(): a espera ignora o timeout real."""
+
+    async def _wait(self, timeout):
+        await self._changed.wait()
+
+
+@pytest.fixture
+def limiter(monkeypatch):
+    monkeypatch.setenv("LLM_SCHEDULER", "true")
+    monkeypatch.setenv("LLM_COMPLETION_TOKEN_ESTIMATE", "0")
+    clock = FakeClock()
+
+    def build(rpm, tpm):
+        limiter = ManualLimiter(MODEL, rpm, tpm, clock=clock)
+        monkeypatch.setitem(scheduler._limiters, MODEL, limiter)
+        return limiter
+
+    return clock, build
+
+
+def messages(tokens: int, tag: str = "") -> list:
+    # estimate_tokens = caracteres // 4 + 1 (com LLM_COMPLETION_TOKEN_ESTIMATE=0).
+    return [{"role": "user", "content": tag.ljust(4 * (tokens - 1), "x")}]
+
+
+async def settle():
+    for _ in range(200):
+        await asyncio.sleep(0)
+
+
+async def tick(limiter, clock, seconds: float):
+    clock.now += seconds
+    async with limiter._changed:
+        limiter._changed.notify_all()
+    await settle()
+
+
+async def run_load(limiter, clock, n: int, tokens: int, duration: float, step: float = 0.25):
+    dispatched = []
+
+    async def request():
+        await scheduler.acquire("test", MODEL, messages(tokens))
+        dispatched.append(clock.now)
+
+    start = clock.now
+    tasks = [asyncio.create_task(request()) for _ in range(n)]
+    await settle()
+    while clock.now - start < duration and len(dispatched) < n:
+        await tick(limiter, clock, step)
+    for task in tasks:
+        task.cancel()
+    return [t - start for t in dispatched]
+
+
+def assert_within_budget(times: list, per_minute: float, cost: float = 1):
+    # Em cada instante t, o consumo não passa da rajada inicial mais a reposição até t.
+    for count, t in enumerate(sorted(times), start=1):
+        assert count * cost <= per_minute + per_minute / 60 * t + 1e-9
+
+
+@pytest.mark.parametrize("rpm", [30, 60, 120])
+def test_requests_per_minute(limiter, rpm):
+    clock, build = limiter
+    limiter_ = build(rpm=rpm, tpm=0)
+    n = rpm + rpm // 2
+
+    times = asyncio.run(run_load(limiter_, clock, n, tokens=10, duration=120))
+
+    assert len(times) == n
+    assert_within_budget(times, rpm)
+    # A rajada sai em t=0; as demais seguem a taxa de reposição (rpm / 60 por segundo).
+    assert times.count(0) == rpm
+    assert max(times) >= (n - rpm) * 60 / rpm - 0.25
+
+
+def test_tokens_per_minute(limiter):
+    clock, build = limiter
+    limiter_ = build(rpm=1000, tpm=6000)
+
+    times = asyncio.run(run_load(limiter_, clock, 45, tokens=200, duration=120))
+
+    assert len(times) == 45
+    assert_within_budget(times, 6000, cost=200)
+    assert_within_budget(times, 1000)
+    assert times.count(0) == 30
+    assert max(times) >= 15 * 2 - 0.25
+
+
+def test_interactive_requests_dequeued_before_bulk(limiter):
+    clock, build = limiter
+    limiter_ = build(rpm=60, tpm=0)
+
+    async def run():
+        order = []
+
+        async def request(level: str, index: int):
+            await with_priority(level)()
+            await scheduler.acquire("test", MODEL, messages(10, f"{level}{index}"))
+            order.append(level)
+
+        # Esvazia o bucket para que todas as chamadas fiquem na fila.
+        limiter_.requests.tokens = 0
+        tasks = [asyncio.create_task(request("bulk", i)) for i in range(5)]
+        await settle()
+        tasks += [asyncio.create_task(request("default", i)) for i in range(3)]
+        tasks += [asyncio.create_task(request("interactive", i)) for i in range(5)]
+        await settle()
+        assert limiter_.depth == 13 and order == []
+
+        while len(order) < len(tasks):
+            await tick(limiter_, clock, 1.0)
+        return order
+
+    order = asyncio.run(run())
+
+    assert order == ["interactive"] * 5 + ["default"] * 3 + ["bulk"] * 5
+
+
+def test_cancelled_request_leaves_queue(limiter):
+    clock, build = limiter
+    limiter_ = build(rpm=60, tpm=0)
+
+    async def run():
+        limiter_.requests.tokens = 0
+        waiting = asyncio.create_task(scheduler.acquire("test", MODEL, messages(10)))
+        await settle()
+        assert limiter_.depth == 1
+        waiting.cancel()
+        await settle()
+        return limiter_.depth
+
+    assert asyncio.run(run()) == 0
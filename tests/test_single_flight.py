@@ -0,0 +1,65 @@
+import asyncio
+
+import pytest
+
+from services.singleFlight import SingleFlight
+
+
+def test_concurrent_calls_share_one_task():
+    flights = SingleFlight()
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return "ok"
+
+    async def run():
+        return await asyncio.gather(*(flights.do("k", fetch) for _ in range(5)))
+
+    assert asyncio.run(run()) == ["ok"] * 5
+    assert len(calls) == 1
+    assert len(flights) == 0
+
+
+def test_task_survives_while_someone_still_waits():
+    flights = SingleFlight()
+
+    async def fetch():
+        await asyncio.sleep(0.01)
+        return "ok"
+
+    async def run():
+        first = asyncio.ensure_future(flights.do("k", fetch))
+        second = asyncio.ensure_future(flights.do("k", fetch))
+        await asyncio.sleep(0)
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        return await second
+
+    assert asyncio.run(run()) == "ok"
+
+
+def test_caller_after_last_waiter_cancels_starts_a_new_flight():
+    flights = SingleFlight()
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return "ok"
+
+    async def run():
+        first = asyncio.ensure_future(flights.do("k", fetch))
+        await asyncio.sleep(0)
+        first.cancel()
+        # A tarefa cancelada ainda não terminou; B chega nessa janela.
+        await asyncio.sleep(0)
+        result = await flights.do("k", fetch)
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        return result
+
+    assert asyncio.run(run()) == "ok"
+    assert len(calls) == 2